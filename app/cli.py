@@ -28,18 +28,24 @@ from rich.prompt import Prompt
 from app.__metadata__ import __version__
 
 if TYPE_CHECKING:
+    import numpy as np
     from rich.console import Console
 
 
 __all__ = (
     "bulk_embed",
+    "cache_key_report",
     "clear_cache",
     "dump_data",
     "embed_new",
     "load_fixtures",
     "load_vectors",
     "model_info",
+    "reduce_embeddings",
     "truncate_tables",
+    "vector_accuracy_report",
+    "vector_dimension_report",
+    "vector_index_report",
     "version_callback",
 )
 
@@ -129,6 +135,281 @@ def embed_new(limit: int) -> None:
     anyio.run(_embed_new_products)
 
 
+@click.command()
+@click.option("--limit", default=5000, help="Number of recent user messages to analyse (default: 5000)")
+@click.option("--top", default=20, help="Number of canonical keys to show (default: 20)")
+def cache_key_report(limit: int, top: int) -> None:
+    """Show how recent chat queries collapse onto canonical cache keys."""
+
+    async def _cache_key_report() -> None:
+        from rich.table import Table
+
+        from app.config import oracle_async
+        from app.lib.canonical import get_query_canonicalizer
+
+        console = get_console()
+        async with oracle_async.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                await cursor.execute(
+                    """
+                    SELECT DBMS_LOB.SUBSTR(content, 1000, 1)
+                    FROM chat_conversation
+                    WHERE role = 'user'
+                    ORDER BY created_at DESC
+                    FETCH FIRST :limit ROWS ONLY
+                    """,
+                    {"limit": limit},
+                )
+                queries = [row[0] async for row in cursor if row[0]]
+            finally:
+                cursor.close()
+
+        if not queries:
+            console.print("[yellow]No user messages found[/yellow]")
+            return
+
+        report = get_query_canonicalizer().collapse_report(queries)
+        distinct_raw = len(set(queries))
+        console.print(
+            f"[bold]{len(queries)}[/bold] queries, [bold]{distinct_raw}[/bold] distinct raw phrasings, "
+            f"[bold]{len(report)}[/bold] canonical keys "
+            f"([green]{distinct_raw - len(report)}[/green] cache entries saved)",
+        )
+
+        table = Table(title="Top canonical keys")
+        table.add_column("Canonical key")
+        table.add_column("Phrasings", justify="right")
+        table.add_column("Queries", justify="right")
+        table.add_column("Examples", style="dim")
+        for entry in report[:top]:
+            table.add_row(
+                entry["canonical"],
+                str(entry["distinct_raw"]),
+                str(entry["total"]),
+                " | ".join(entry["examples"]),
+            )
+        console.print(table)
+
+    anyio.run(_cache_key_report)
+
+
+async def _report_vectors(synthetic: int) -> tuple[np.ndarray, str]:
+    """Vectors for the index reports: a synthetic catalog of ``synthetic`` rows, or the product embeddings."""
+    import numpy as np
+
+    from app.config import oracle_async
+    from app.lib.vector_index import synthetic_vectors
+
+    if synthetic:
+        return synthetic_vectors(synthetic), f"synthetic catalog of {synthetic} rows"
+    async with oracle_async.get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            await cursor.execute("SELECT p.embedding FROM product p WHERE p.embedding IS NOT NULL")
+            vectors = np.asarray([np.asarray(row[0], dtype=np.float32) for row in await cursor.fetchall()])
+        finally:
+            cursor.close()
+    return vectors, f"{len(vectors)} product embeddings"
+
+
+@click.command(name="vector-index-report")
+@click.option("--synthetic", default=0, help="Use a synthetic catalog of this many rows instead of the product table")
+@click.option("--queries", default=200, help="Number of sample queries (default: 200)")
+@click.option("--k", "k", default=10, help="Neighbours per query (default: 10)")
+@click.option("--lists", default=0, help="IVF centroids (default: square root of the row count)")
+@click.option("--probes", default="1,2,4,8,16,32", help="Comma-separated probe counts to measure")
+def vector_index_report(synthetic: int, queries: int, k: int, lists: int, probes: str) -> None:
+    """Report recall@k and latency of the IVF index against exact search."""
+
+    async def _vector_index_report() -> None:
+        import time
+
+        from rich.table import Table
+
+        from app.lib.vector_index import ExactVectorIndex, IVFVectorIndex, recall_report, sample_queries
+
+        console = get_console()
+        vectors, source = await _report_vectors(synthetic)
+        if not len(vectors):
+            console.print("[yellow]No embeddings to index[/yellow]")
+            return
+
+        ids = list(range(len(vectors)))
+        exact = ExactVectorIndex(ids, vectors)
+        started = time.perf_counter()
+        index = IVFVectorIndex(ids, vectors, n_lists=lists)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        sample = sample_queries(vectors, queries)
+        report = recall_report(exact, index, sample, k, [int(probe) for probe in probes.split(",") if probe])
+
+        console.print(
+            f"[bold]{source}[/bold], {index.n_lists} lists, built in {build_ms:.0f}ms, "
+            f"{index.nbytes / 1_048_576:.1f} MiB",
+        )
+        table = Table(title=f"Recall@{k} versus exact search ({len(sample)} queries)")
+        table.add_column("Mode")
+        table.add_column("Probes", justify="right")
+        table.add_column("Recall", justify="right")
+        table.add_column("Avg ms", justify="right")
+        table.add_column("P95 ms", justify="right")
+        for row in report:
+            table.add_row(
+                row["mode"],
+                str(row["n_probe"] or "-"),
+                f"{row['recall']:.3f}",
+                f"{row['avg_ms']:.2f}",
+                f"{row['p95_ms']:.2f}",
+            )
+        console.print(table)
+
+    anyio.run(_vector_index_report)
+
+
+@click.command(name="vector-accuracy-report")
+@click.option("--rows", default=20000, help="Rows in the synthetic catalog (default: 20000)")
+@click.option("--queries", default=100, help="Number of sample queries (default: 100)")
+@click.option("--k", "k", default=10, help="Neighbours per query (default: 10)")
+@click.option("--accuracies", default="50,70,80,90,95,99", help="Comma-separated target accuracies (0 = index default)")
+@click.option("--keep", is_flag=True, help="Keep the scratch table afterwards")
+def vector_accuracy_report(rows: int, queries: int, k: int, accuracies: str, keep: bool) -> None:
+    """Report recall@k and latency of Oracle APPROX search per target accuracy."""
+
+    async def _vector_accuracy_report() -> None:
+        from rich.table import Table
+
+        from app.config import oracle_async
+        from app.lib.vector_index import sample_queries, synthetic_vectors
+        from app.services.vector_benchmark import BENCHMARK_TABLE, VectorAccuracyBenchmark
+
+        console = get_console()
+        vectors = synthetic_vectors(rows)
+        sample = sample_queries(vectors, queries)
+
+        async with oracle_async.get_connection() as conn:
+            benchmark = VectorAccuracyBenchmark(conn)
+            with console.status(f"[bold green]Loading {rows} synthetic rows into {BENCHMARK_TABLE}..."):
+                await benchmark.setup(vectors)
+            try:
+                report = await benchmark.run(sample, k, [int(value) for value in accuracies.split(",") if value])
+            finally:
+                if not keep:
+                    await benchmark.teardown()
+
+        table = Table(title=f"Recall@{k} versus FETCH EXACT ({len(sample)} queries, {rows} rows)")
+        table.add_column("Mode")
+        table.add_column("Target accuracy", justify="right")
+        table.add_column("Recall", justify="right")
+        table.add_column("Avg ms", justify="right")
+        table.add_column("P95 ms", justify="right")
+        for row in report:
+            accuracy = row["target_accuracy"]
+            table.add_row(
+                row["mode"],
+                "-" if accuracy is None else str(accuracy or "index"),
+                f"{row['recall']:.3f}",
+                f"{row['avg_ms']:.2f}",
+                f"{row['p95_ms']:.2f}",
+            )
+        console.print(table)
+
+    anyio.run(_vector_accuracy_report)
+
+
+@click.command(name="vector-dimension-report")
+@click.option("--synthetic", default=0, help="Use a synthetic catalog of this many rows instead of the product table")
+@click.option("--queries", default=200, help="Number of sample queries (default: 200)")
+@click.option("--k", "k", default=10, help="Neighbours per query (default: 10)")
+@click.option("--dimensions", default="256,128", help="Comma-separated truncated dimensions to measure")
+@click.option("--candidates", default="0,20,40,100", help="Comma-separated re-scored candidates (0 = no re-scoring)")
+def vector_dimension_report(synthetic: int, queries: int, k: int, dimensions: str, candidates: str) -> None:
+    """Report recall@k, latency and memory of reduced-dimension search with full re-scoring."""
+
+    async def _vector_dimension_report() -> None:
+        from rich.table import Table
+
+        from app.lib.vector_index import rescore_report, sample_queries
+
+        console = get_console()
+        # Isotropic synthetic noise carries no Matryoshka ordering, so it is a worst case
+        vectors, source = await _report_vectors(synthetic)
+        if not len(vectors):
+            console.print("[yellow]No embeddings to index[/yellow]")
+            return
+
+        sample = sample_queries(vectors, queries)
+        report = rescore_report(
+            vectors,
+            sample,
+            k,
+            [int(value) for value in dimensions.split(",") if value],
+            [int(value) for value in candidates.split(",") if value],
+        )
+
+        console.print(f"[bold]{source}[/bold], {vectors.shape[1]} dimensions")
+        table = Table(title=f"Recall@{k} versus full-dimension exact search ({len(sample)} queries)")
+        table.add_column("Dimensions", justify="right")
+        table.add_column("Re-scored", justify="right")
+        table.add_column("Recall", justify="right")
+        table.add_column("Avg ms", justify="right")
+        table.add_column("P95 ms", justify="right")
+        table.add_column("MiB", justify="right")
+        for row in report:
+            table.add_row(
+                str(row["dimensions"]),
+                str(row["candidates"] or "-"),
+                f"{row['recall']:.3f}",
+                f"{row['avg_ms']:.2f}",
+                f"{row['p95_ms']:.2f}",
+                f"{row['bytes'] / 1_048_576:.1f}",
+            )
+        console.print(table)
+
+    anyio.run(_vector_dimension_report)
+
+
+@click.command(name="reduce-embeddings")
+@click.option("--batch-size", default=500, help="Products updated per statement (default: 500)")
+def reduce_embeddings(batch_size: int) -> None:
+    """Rewrite product.embedding_reduced from the full embeddings at VECTOR_REDUCED_DIMENSIONS.
+
+    Run after enabling or changing the reduced dimensions; with the mode off the column is cleared.
+    """
+
+    async def _reduce_embeddings() -> None:
+        from app.config import oracle_async
+        from app.lib.settings import get_settings
+        from app.services.product_vectors import reduced_embedding
+
+        console = get_console()
+        dimensions = get_settings().search.REDUCED_DIMENSIONS
+        async with oracle_async.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                await cursor.execute("SELECT p.id, p.embedding FROM product p WHERE p.embedding IS NOT NULL")
+                rows = await cursor.fetchall()
+                for start in range(0, len(rows), batch_size):
+                    await cursor.executemany(
+                        "UPDATE product SET embedding_reduced = :reduced, updated_at = SYSTIMESTAMP WHERE id = :id",
+                        [
+                            {"id": product_id, "reduced": reduced_embedding(list(embedding))}
+                            for product_id, embedding in rows[start : start + batch_size]
+                        ],
+                    )
+                await conn.commit()
+            finally:
+                cursor.close()
+        if dimensions:
+            console.print(
+                f"[bold green]✓ Reduced {len(rows)} product embeddings to {dimensions} dimensions[/bold green]"
+            )
+        else:
+            console.print(f"[yellow]Reduced-dimension search is off; cleared {len(rows)} reduced embeddings[/yellow]")
+
+    anyio.run(_reduce_embeddings)
+
+
 @click.command()
 def model_info() -> None:
     """Show information about currently configured AI models."""
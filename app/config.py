@@ -135,3 +135,41 @@ VECTOR_SEARCH_CONFIG = {
     "min_vector_threshold": 0.5,
     "final_top_k": 5,
 }
+
+# Response cache sharing policy
+# "global" responses are shared by every visitor, "user" responses are scoped to the browser
+# fingerprint. Keys are an intent or "INTENT:persona"; anything not listed is shared globally
+# unless conversation history was part of the prompt.
+RESPONSE_SHARING_POLICY: dict[str, str] = {}
+
+# Query canonicalization for cache keys (see app/lib/canonical.py)
+# Contractions are expanded before punctuation is folded; synonyms are applied to the cleaned,
+# lowercased words and may be multi-word phrases. Changing either map changes cache keys.
+QUERY_CONTRACTIONS: dict[str, str] = {
+    "what's": "what is",
+    "what're": "what are",
+    "how's": "how is",
+    "that's": "that is",
+    "there's": "there is",
+    "it's": "it is",
+    "i'm": "i am",
+    "i'd": "i would",
+    "i've": "i have",
+    "i'll": "i will",
+    "you're": "you are",
+    "let's": "let us",
+    "don't": "do not",
+    "doesn't": "does not",
+    "isn't": "is not",
+    "can't": "cannot",
+    "won't": "will not",
+}
+QUERY_SYNONYMS: dict[str, str] = {
+    "expresso": "espresso",
+    "cappucino": "cappuccino",
+    "capuccino": "cappuccino",
+    "expressos": "espressos",
+    "decaffeinated": "decaf",
+    "cold-brew": "cold brew",
+    "coldbrew": "cold brew",
+}
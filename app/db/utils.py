@@ -86,6 +86,8 @@ async def _upsert_products(conn: oracledb.AsyncConnection, data: list[dict[str,
     """Upsert product records using raw SQL."""
     import array
 
+    from app.services.product_vectors import reduced_embedding
+
     cursor = conn.cursor()
     try:
         # Get mapping of company IDs
@@ -116,12 +118,14 @@ async def _upsert_products(conn: oracledb.AsyncConnection, data: list[dict[str,
                         current_price = :current_price,
                         description = :description,
                         embedding = :embedding,
-                        embedding_generated_on = :embedding_generated_on
+                        embedding_reduced = :embedding_reduced,
+                        embedding_generated_on = :embedding_generated_on,
+                        updated_at = SYSTIMESTAMP
                 WHEN NOT MATCHED THEN
                     INSERT (company_id, name, current_price, description,
-                            embedding, embedding_generated_on)
+                            embedding, embedding_reduced, embedding_generated_on)
                     VALUES (:company_id2, :name2, :current_price2, :description2,
-                            :embedding2, :embedding_generated_on2)
+                            :embedding2, :embedding_reduced2, :embedding_generated_on2)
                 """,
                 {
                     "company_id": actual_company_id,
@@ -134,6 +138,8 @@ async def _upsert_products(conn: oracledb.AsyncConnection, data: list[dict[str,
                     "description2": product["description"],
                     "embedding": oracle_embedding,
                     "embedding2": oracle_embedding,
+                    "embedding_reduced": reduced_embedding(embedding),
+                    "embedding_reduced2": reduced_embedding(embedding),
                     "embedding_generated_on": embedding_date,
                     "embedding_generated_on2": embedding_date,
                 },
@@ -276,6 +282,7 @@ async def _load_vectors() -> None:
     import array
 
     from app import config
+    from app.services.product_vectors import reduced_embedding
     from app.services.vertex_ai import VertexAIService
 
     vertex_ai = VertexAIService()
@@ -295,7 +302,7 @@ async def _load_vectors() -> None:
             products = [{"id": row[0], "name": row[1], "description": row[2]} async for row in cursor]
             for product in products:
                 text_content = f"{product['name']}: {product['description']}"
-                embedding = await vertex_ai.create_embedding(text_content)
+                embedding = await vertex_ai.create_embedding_stored(text_content)
 
                 # Convert to Oracle VECTOR format
                 oracle_vector = array.array("f", embedding)
@@ -303,10 +310,16 @@ async def _load_vectors() -> None:
                     """
                     UPDATE product
                     SET embedding = :embedding,
-                        embedding_generated_on = SYSTIMESTAMP
+                        embedding_reduced = :embedding_reduced,
+                        embedding_generated_on = SYSTIMESTAMP,
+                        updated_at = SYSTIMESTAMP
                     WHERE id = :id
                     """,
-                    {"id": product["id"], "embedding": oracle_vector},
+                    {
+                        "id": product["id"],
+                        "embedding": oracle_vector,
+                        "embedding_reduced": reduced_embedding(embedding),
+                    },
                 )
 
                 logger.info(
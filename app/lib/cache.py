@@ -0,0 +1,240 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide in-memory cache primitives."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable, Sequence
+
+__all__ = ("MemoryCache", "SingleFlight", "is_admissible_embedding")
+
+V = TypeVar("V")
+
+
+class MemoryCache(Generic[V]):
+    """Bounded LRU cache with per-entry TTL and hit/miss/eviction counters.
+
+    Entries are evicted least-recently-used first whenever either the entry budget
+    or the byte budget is exceeded. Expired entries are dropped lazily on access.
+    Instances are safe to share between tasks and threads of one worker process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        max_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+        sizeof: Callable[[V], int] | None = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            name: Name reported in stats and logs
+            max_entries: Maximum number of entries kept
+            max_bytes: Optional maximum total size of entries, as measured by ``sizeof``
+            ttl_seconds: Default time to live for entries; ``None`` keeps entries until evicted
+            sizeof: Callable returning the size of a value in bytes (defaults to 0)
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof or (lambda _value: 0)
+        self._entries: OrderedDict[Hashable, tuple[V, float | None, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.peek(key) is not None
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached values in bytes."""
+        return self._bytes
+
+    def get(self, key: Hashable) -> V | None:
+        """Return the cached value for ``key`` and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, _size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable) -> V | None:
+        """Return the cached value without touching recency or counters."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, _size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                return None
+            return value
+
+    def set(self, key: Hashable, value: V, ttl_seconds: float | None = None) -> None:
+        """Store ``value`` under ``key``, evicting older entries if over budget.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl_seconds: Time to live for this entry, capped at the cache-wide TTL
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds or ttl_seconds)
+        if ttl is not None and ttl <= 0:
+            return
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop ``key`` from the cache, returning whether it was present."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters and occupancy for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _value, _expires_at, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _key, (_value, _expires_at, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+
+class SingleFlight(Generic[V]):
+    """Coalesce concurrent async calls for the same key into a single execution.
+
+    The first caller for a key (the leader) runs the work inline; callers arriving
+    while it is in flight await the leader's result instead of repeating the work.
+    If the leader is cancelled, one waiting caller takes over so followers never
+    inherit a cancellation that was not theirs.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> tuple[V, bool]:
+        """Run ``fn`` once per key across concurrent callers.
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument coroutine factory performing the work
+
+        Returns:
+            Tuple of (result, shared) where ``shared`` is True if the result came
+            from another caller's in-flight execution.
+        """
+        while (existing := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(existing), True
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if not existing.cancelled() or (current is not None and current.cancelling()):
+                    raise
+            # The leader was cancelled; loop to wait on (or become) the next leader
+
+        future: asyncio.Future[V] = asyncio.get_running_loop().create_future()
+        # Mark exceptions as retrieved so an unawaited failure does not log a warning
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+
+def is_admissible_embedding(embedding: Sequence[float] | None, dimensions: int = 768) -> bool:
+    """Return whether an embedding is fit to be cached.
+
+    Rejects the degenerate vectors produced when embedding generation fails: missing or
+    wrong-dimension vectors, vectors containing NaN/inf, and all-zero vectors (which have
+    no direction, so every cosine distance to them is meaningless).
+    """
+    if embedding is None or len(embedding) != dimensions:
+        return False
+    return all(math.isfinite(x) for x in embedding) and any(embedding)
@@ -0,0 +1,147 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Query canonicalization shared by the embedding and response caches."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping, Sequence
+
+__all__ = (
+    "QueryCanonicalizer",
+    "collapse_whitespace",
+    "fold_punctuation",
+    "get_query_canonicalizer",
+    "replace_terms",
+    "strip_symbols",
+    "unicode_fold",
+)
+
+# Emoji, modifier symbols and format characters (zero-width joiners, variation selectors)
+_DROPPED_CATEGORIES = frozenset({"So", "Sk", "Cf", "Co", "Cs"})
+_APOSTROPHES = str.maketrans({"\u2018": "'", "\u2019": "'", "\u02bc": "'", "`": "'"})
+# Punctuation and symbols, except decimal points and the like between two digits
+_PUNCTUATION = re.compile(r"(?<!\d)[^\w\s]|[^\w\s](?!\d)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def unicode_fold(text: str) -> str:
+    """NFKC-normalize, case-fold and unify apostrophe variants."""
+    return unicodedata.normalize("NFKC", text).casefold().translate(_APOSTROPHES)
+
+
+def strip_symbols(text: str) -> str:
+    """Drop emoji and other pictographic or invisible characters."""
+    return "".join(ch if unicodedata.category(ch) not in _DROPPED_CATEGORIES else " " for ch in text)
+
+
+def fold_punctuation(text: str) -> str:
+    """Replace punctuation with spaces, keeping it between digits (``3.5``, ``1,000``)."""
+    return _PUNCTUATION.sub(" ", text.replace("'", ""))
+
+
+def collapse_whitespace(text: str) -> str:
+    """Collapse runs of whitespace and trim the ends."""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def replace_terms(mapping: Mapping[str, str]) -> Callable[[str], str]:
+    """Build a step replacing whole words or phrases using ``mapping``.
+
+    Longer phrases win over their prefixes, and replacements are not re-scanned.
+    """
+    if not mapping:
+        return lambda text: text
+    terms = {key.casefold(): value for key, value in mapping.items()}
+    pattern = re.compile(
+        r"(?<!\w)(" + "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)) + r")(?!\w)",
+    )
+    return lambda text: pattern.sub(lambda match: terms[match.group(1)], text)
+
+
+class QueryCanonicalizer:
+    """Pipeline of text steps mapping equivalent phrasings to one canonical cache key.
+
+    Each step is a ``str -> str`` callable applied in order, so deployments can add,
+    drop or reorder steps without touching the caches that use the result.
+    """
+
+    def __init__(self, steps: Sequence[Callable[[str], str]]) -> None:
+        self.steps = tuple(steps)
+
+    def __call__(self, text: str) -> str:
+        for step in self.steps:
+            text = step(text)
+        return text
+
+    @classmethod
+    def default(
+        cls,
+        contractions: Mapping[str, str] | None = None,
+        synonyms: Mapping[str, str] | None = None,
+    ) -> QueryCanonicalizer:
+        """Build the standard pipeline.
+
+        Unicode folding, emoji removal, contraction expansion (before apostrophes are
+        dropped), punctuation folding, whitespace collapsing, then synonym replacement
+        on the cleaned words.
+        """
+        return cls(
+            [
+                unicode_fold,
+                strip_symbols,
+                replace_terms(contractions or {}),
+                fold_punctuation,
+                collapse_whitespace,
+                replace_terms(synonyms or {}),
+                collapse_whitespace,
+            ]
+        )
+
+    def collapse_report(self, queries: Iterable[str]) -> list[dict]:
+        """Group raw queries by canonical key, largest groups first.
+
+        Returns:
+            One entry per canonical key with the number of distinct raw phrasings,
+            the total number of queries and a few example phrasings.
+        """
+        groups: defaultdict[str, defaultdict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for query in queries:
+            groups[self(query)][query] += 1
+        report = [
+            {
+                "canonical": canonical,
+                "distinct_raw": len(raw),
+                "total": sum(raw.values()),
+                "examples": sorted(raw, key=raw.__getitem__, reverse=True)[:3],
+            }
+            for canonical, raw in groups.items()
+        ]
+        report.sort(key=lambda entry: (entry["distinct_raw"], entry["total"]), reverse=True)
+        return report
+
+
+@lru_cache(maxsize=1)
+def get_query_canonicalizer() -> QueryCanonicalizer:
+    """Return the process-wide canonicalizer configured in ``app.config``."""
+    from app.config import QUERY_CONTRACTIONS, QUERY_SYNONYMS
+
+    return QueryCanonicalizer.default(contractions=QUERY_CONTRACTIONS, synonyms=QUERY_SYNONYMS)
@@ -0,0 +1,88 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Circuit breaker for calls to external services."""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import structlog
+
+__all__ = ("CircuitBreaker",)
+
+logger = structlog.get_logger()
+
+
+class CircuitBreaker:
+    """Fail fast while a dependency is down.
+
+    The breaker opens after ``failure_threshold`` consecutive failures and rejects
+    calls for ``reset_seconds``. It then lets a single trial call through
+    (half-open): success closes the breaker, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0) -> None:
+        """Initialize the breaker.
+
+        Args:
+            name: Name reported in stats and logs
+            failure_threshold: Consecutive failures that open the breaker
+            reset_seconds: How long the breaker stays open before a trial call
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        """Return whether a call may proceed, counting it as rejected if not."""
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        # Open long enough, or the previous trial call never reported back: try again
+        if now - self._opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+            self._opened_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the breaker."""
+        if self.state != self.CLOSED:
+            logger.info("circuit_breaker_closed", breaker=self.name)
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the breaker once the threshold is reached."""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning("circuit_breaker_opened", breaker=self.name, failures=self.failures)
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        """Return state and counters for monitoring."""
+        return {"name": self.name, "state": self.state, "failures": self.failures, "rejected": self.rejected}
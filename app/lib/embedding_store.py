@@ -0,0 +1,158 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent on-disk embedding store for CLI commands and offline jobs."""
+
+from __future__ import annotations
+
+import array
+import fcntl
+import hashlib
+import mmap
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from app.lib.settings import get_settings
+
+__all__ = ("EmbeddingStore", "get_embedding_store")
+
+logger = structlog.get_logger()
+
+_KEY_SIZE = 16
+
+
+class EmbeddingStore:
+    """Append-only float32 matrix of embeddings with a key index, memory-mapped for reads.
+
+    The store is two files in ``path``: ``vectors.f32`` holds one row per embedding and
+    ``keys.bin`` holds the matching 16-byte key per row. Keys are digests of the model
+    name and the exact text, so a model change never serves stale vectors. A row's
+    vector is written before its key, so a crash mid-append leaves no dangling key.
+    Appends take an ``flock`` so concurrent jobs can share one store.
+    """
+
+    def __init__(self, path: str | Path, dimensions: int = 768) -> None:
+        """Open (or create) the store.
+
+        Args:
+            path: Directory holding the store files
+            dimensions: Vector dimensions of every row
+        """
+        self.path = Path(path)
+        self.dimensions = dimensions
+        self._row_bytes = dimensions * 4
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._keys_path = self.path / "keys.bin"
+        self._vectors_path = self.path / "vectors.f32"
+        self._keys_path.touch(exist_ok=True)
+        self._vectors_path.touch(exist_ok=True)
+        self._lock = threading.Lock()
+        self._index: dict[bytes, int] = {}
+        self._mmap: mmap.mmap | None = None
+        self.hits = 0
+        self.misses = 0
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @staticmethod
+    def key(model: str, text: str) -> bytes:
+        """Return the store key for ``text`` embedded with ``model``."""
+        return hashlib.blake2b(f"{model}\0{text}".encode(), digest_size=_KEY_SIZE).digest()
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        """Return the stored embedding of ``text`` for ``model``, if any."""
+        row = self._index.get(self.key(model, text))
+        if row is None:
+            self.misses += 1
+            return None
+        with self._lock:
+            view = self._map(row)
+            start = row * self._row_bytes
+            embedding = memoryview(view)[start : start + self._row_bytes].cast("f").tolist()
+        self.hits += 1
+        return embedding
+
+    def put(self, model: str, text: str, embedding: list[float]) -> None:
+        """Append the embedding of ``text`` for ``model`` (no-op if already stored)."""
+        key = self.key(model, text)
+        if key in self._index or len(embedding) != self.dimensions:
+            return
+        payload = array.array("f", embedding).tobytes()
+        with self._lock, self._vectors_path.open("r+b") as vectors, self._keys_path.open("ab") as keys:
+            fcntl.flock(vectors.fileno(), fcntl.LOCK_EX)
+            try:
+                # Another process may have appended since we loaded: rows are counted by keys
+                row = os.fstat(keys.fileno()).st_size // _KEY_SIZE
+                vectors.seek(row * self._row_bytes)
+                vectors.write(payload)
+                vectors.flush()
+                keys.write(key)
+                keys.flush()
+            finally:
+                fcntl.flock(vectors.fileno(), fcntl.LOCK_UN)
+            self._index[key] = row
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and hit/miss counters for reporting."""
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": len(self._index),
+            "bytes": len(self._index) * self._row_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Unmap the vector file."""
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+
+    def _load_index(self) -> None:
+        keys = self._keys_path.read_bytes()
+        rows = min(len(keys) // _KEY_SIZE, self._vectors_path.stat().st_size // self._row_bytes)
+        self._index = {keys[i * _KEY_SIZE : (i + 1) * _KEY_SIZE]: i for i in range(rows)}
+
+    def _map(self, row: int) -> mmap.mmap:
+        """Return a read-only mapping of the vector file covering ``row``, remapping after growth."""
+        needed = (row + 1) * self._row_bytes
+        if self._mmap is None or len(self._mmap) < needed:
+            if self._mmap is not None:
+                self._mmap.close()
+            with self._vectors_path.open("rb") as vectors:
+                self._mmap = mmap.mmap(vectors.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+
+@lru_cache(maxsize=1)
+def get_embedding_store() -> EmbeddingStore | None:
+    """Return the process-wide embedding store, or ``None`` when it is disabled or unavailable."""
+    path = get_settings().cache.EMBEDDING_STORE_PATH
+    if not path:
+        return None
+    try:
+        return EmbeddingStore(path)
+    except OSError as e:
+        logger.warning("embedding_store_unavailable", path=path, error=str(e))
+        return None
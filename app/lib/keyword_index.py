@@ -0,0 +1,106 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process keyword retrieval and rank fusion for hybrid search."""
+
+from __future__ import annotations
+
+import math
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING
+
+from app.lib.canonical import get_query_canonicalizer
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+__all__ = ("KeywordIndex", "contains_query", "reciprocal_rank_fusion", "tokenize")
+
+# Conventional RRF damping constant: dampens the weight of the very top ranks
+DEFAULT_RRF_K = 60
+
+
+def tokenize(text: str) -> list[str]:
+    """Split ``text`` into canonical search terms (same folding and synonyms as cache keys)."""
+    return get_query_canonicalizer()(text).split()
+
+
+def contains_query(text: str) -> str | None:
+    """Build an Oracle Text ``CONTAINS`` query matching any term of ``text``.
+
+    Terms are brace-escaped so user input cannot inject Oracle Text operators, and joined
+    with ``ACCUM`` so documents matching more terms score higher. Returns ``None`` when
+    ``text`` has no searchable terms.
+    """
+    terms = dict.fromkeys(term for term in tokenize(text) if "}" not in term)
+    return " ACCUM ".join(f"{{{term}}}" for term in terms) or None
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[int]], k: int = DEFAULT_RRF_K) -> list[tuple[int, float]]:
+    """Fuse ranked ID lists: each list contributes ``1 / (k + rank)`` per ID (ranks start at 1).
+
+    Returns:
+        ``(id, score)`` pairs, best first; ties keep the order of first appearance.
+    """
+    scores: dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] += 1 / (k + rank)
+    return sorted(scores.items(), key=lambda entry: entry[1], reverse=True)
+
+
+class KeywordIndex:
+    """Okapi BM25 inverted index over short documents such as product names and descriptions.
+
+    Used by the local search backend as the in-process counterpart of the Oracle Text
+    indexes. The index is immutable; build a new one when the documents change.
+    """
+
+    def __init__(self, documents: Mapping[int, str], k1: float = 1.2, b: float = 0.75) -> None:
+        """Build the index.
+
+        Args:
+            documents: Text to index per document ID
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._lengths: dict[int, int] = {}
+        for doc_id, text in documents.items():
+            terms = Counter(tokenize(text))
+            self._lengths[doc_id] = sum(terms.values())
+            for term, count in terms.items():
+                self._postings[term].append((doc_id, count))
+        self._average_length = sum(self._lengths.values()) / len(self._lengths) if self._lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def search(self, query: str, k: int) -> list[tuple[int, float]]:
+        """Return up to ``k`` ``(id, score)`` pairs matching any query term, best first."""
+        if not self._lengths:
+            return []
+        scores: dict[int, float] = defaultdict(float)
+        total = len(self._lengths)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, count in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / self._average_length)
+                scores[doc_id] += idf * count * (self.k1 + 1) / (count + norm)
+        return sorted(scores.items(), key=lambda entry: (-entry[1], entry[0]))[:k]
@@ -190,12 +190,155 @@ class AppSettings:
                 self.ALLOWED_CORS_ORIGINS = [host.strip() for host in self.ALLOWED_CORS_ORIGINS.split(",")]
 
 
+@dataclass
+class CacheSettings:
+    """In-process cache configuration."""
+
+    EMBEDDING_TTL_HOURS: int = field(default_factory=lambda: int(os.getenv("EMBEDDING_CACHE_TTL_HOURS", "24")))
+    """Time to live for cached embeddings, shared by the memory tier and the Oracle table."""
+    EMBEDDING_MEMORY_MAX_ENTRIES: int = field(
+        default_factory=lambda: int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000")),
+    )
+    """Maximum number of embeddings held in the process-wide memory tier."""
+    EMBEDDING_MEMORY_MAX_BYTES: int = field(
+        default_factory=lambda: int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    )
+    """Maximum vector payload (in bytes) held in the process-wide memory tier."""
+    EMBEDDING_SHARED_PATH: str | None = field(default_factory=lambda: os.getenv("EMBEDDING_SHARED_CACHE_PATH"))
+    """Memory-mapped file shared by all workers on a host (e.g. ``/dev/shm/coffee-embeddings``); unset disables it."""
+    EMBEDDING_SHARED_SLOTS: int = field(
+        default_factory=lambda: int(os.getenv("EMBEDDING_SHARED_CACHE_SLOTS", "16384")),
+    )
+    """Number of vector slots in the shared embedding cache (each slot holds one 768-dim vector)."""
+    EMBEDDING_NEGATIVE_TTL_SECONDS: int = field(
+        default_factory=lambda: int(os.getenv("EMBEDDING_NEGATIVE_CACHE_TTL_SECONDS", "30")),
+    )
+    """How long a text whose embedding failed is answered from the negative cache instead of retried."""
+    EMBEDDING_BREAKER_FAILURES: int = field(
+        default_factory=lambda: int(os.getenv("EMBEDDING_BREAKER_FAILURES", "5")),
+    )
+    """Consecutive Vertex AI embedding failures that open the circuit breaker."""
+    EMBEDDING_BREAKER_RESET_SECONDS: float = field(
+        default_factory=lambda: float(os.getenv("EMBEDDING_BREAKER_RESET_SECONDS", "30")),
+    )
+    """How long the embedding circuit breaker fails fast before letting a trial call through."""
+    EMBEDDING_STORE_PATH: str = field(default_factory=lambda: os.getenv("EMBEDDING_STORE_PATH", ".cache/embeddings"))
+    """Directory of the on-disk embedding store used by CLI and offline jobs; empty disables it."""
+    HIT_COUNT_FLUSH_SECONDS: float = field(
+        default_factory=lambda: float(os.getenv("CACHE_HIT_FLUSH_SECONDS", "30")),
+    )
+    """Interval between write-behind flushes of cache hit counts to Oracle."""
+    WARMUP_TOP_N: int = field(default_factory=lambda: int(os.getenv("CACHE_WARMUP_TOP_N", "200")))
+    """Number of most frequent historical queries pre-embedded after startup; 0 disables the warmer."""
+    WARMUP_CONCURRENCY: int = field(default_factory=lambda: int(os.getenv("CACHE_WARMUP_CONCURRENCY", "4")))
+    """Maximum concurrent embedding lookups made by the startup cache warmer."""
+    WARMUP_LOOKBACK_DAYS: int = field(default_factory=lambda: int(os.getenv("CACHE_WARMUP_LOOKBACK_DAYS", "30")))
+    """How far back in chat history the startup cache warmer looks for frequent queries."""
+    CATALOG_REFRESH_SECONDS: float = field(
+        default_factory=lambda: float(os.getenv("CATALOG_REFRESH_SECONDS", "15")),
+    )
+    """Interval between incremental refreshes of the in-memory product catalog snapshot."""
+    RESPONSE_MEMORY_MAX_ENTRIES: int = field(
+        default_factory=lambda: int(os.getenv("RESPONSE_CACHE_L1_MAX_ENTRIES", "2000")),
+    )
+    """Maximum number of responses held in the in-process L1 in front of Oracle."""
+    RESPONSE_MEMORY_TTL_SECONDS: int = field(
+        default_factory=lambda: int(os.getenv("RESPONSE_CACHE_L1_TTL_SECONDS", "300")),
+    )
+    """Upper bound on the L1 lifetime of a response (entries never outlive their Oracle TTL)."""
+    RESPONSE_SEMANTIC_ENABLED: bool = field(
+        default_factory=lambda: os.getenv("RESPONSE_CACHE_SEMANTIC", "False") in TRUE_VALUES,
+    )
+    """Serve cached responses for semantically similar queries when no exact key matches."""
+    RESPONSE_SEMANTIC_MAX_DISTANCE: float = field(
+        default_factory=lambda: float(os.getenv("RESPONSE_CACHE_SEMANTIC_MAX_DISTANCE", "0.05")),
+    )
+    """Maximum cosine distance between a query and a cached query for a semantic hit."""
+    RESPONSE_EXPLAIN_MISSES: bool = field(
+        default_factory=lambda: os.getenv("RESPONSE_CACHE_EXPLAIN_MISSES", "False") in TRUE_VALUES,
+    )
+    """Log which cache key component changed when a previously cached query misses."""
+    VECTOR_RESULTS_MAX_ENTRIES: int = field(
+        default_factory=lambda: int(os.getenv("VECTOR_RESULT_CACHE_MAX_ENTRIES", "5000")),
+    )
+    """Maximum number of vector search result lists held in memory; 0 disables the result cache."""
+    VECTOR_RESULTS_TTL_SECONDS: int = field(
+        default_factory=lambda: int(os.getenv("VECTOR_RESULT_CACHE_TTL_SECONDS", "600")),
+    )
+    """Upper bound on the lifetime of cached vector search results."""
+
+
+@dataclass
+class MaintenanceSettings:
+    """Background maintenance scheduler configuration."""
+
+    CLEANUP_INTERVAL_SECONDS: float = field(
+        default_factory=lambda: float(os.getenv("MAINTENANCE_CLEANUP_INTERVAL_SECONDS", "600")),
+    )
+    """Interval between expiry sweeps of the cache and session tables."""
+    DELETE_BATCH_SIZE: int = field(default_factory=lambda: int(os.getenv("MAINTENANCE_DELETE_BATCH_SIZE", "1000")))
+    """Maximum rows deleted per transaction by expiry sweeps."""
+    CHAT_HISTORY_RETENTION_DAYS: int = field(
+        default_factory=lambda: int(os.getenv("MAINTENANCE_CHAT_HISTORY_RETENTION_DAYS", "0")),
+    )
+    """Age at which chat messages are deleted; 0 (the default) keeps chat history indefinitely."""
+    JITTER: float = field(default_factory=lambda: float(os.getenv("MAINTENANCE_JITTER", "0.1")))
+    """Random spread applied to every job interval, as a fraction of the interval."""
+
+
+@dataclass
+class SearchSettings:
+    """Product vector search configuration."""
+
+    BACKEND: str = field(default_factory=lambda: os.getenv("VECTOR_SEARCH_BACKEND", "oracle"))
+    """Where product similarity search runs: ``oracle`` (VECTOR_DISTANCE in SQL) or ``local`` (in-process NumPy index)."""
+    INDEX_REFRESH_SECONDS: float = field(
+        default_factory=lambda: float(os.getenv("VECTOR_INDEX_REFRESH_SECONDS", "30")),
+    )
+    """Interval between checks for changed product embeddings when the local backend is enabled."""
+    INDEX_TYPE: str = field(default_factory=lambda: os.getenv("VECTOR_INDEX_TYPE", "exact"))
+    """Local index structure: ``exact`` (brute force) or ``ivf`` (approximate inverted file, for large catalogs)."""
+    IVF_LISTS: int = field(default_factory=lambda: int(os.getenv("VECTOR_INDEX_IVF_LISTS", "0")))
+    """Number of IVF centroids (0 = square root of the number of products)."""
+    IVF_PROBES: int = field(default_factory=lambda: int(os.getenv("VECTOR_INDEX_IVF_PROBES", "8")))
+    """IVF lists scored per query; higher improves recall at the cost of latency."""
+    INDEX_PATH: str | None = field(
+        default_factory=lambda: os.getenv("VECTOR_INDEX_PATH", ".cache/product_ivf.npz") or None,
+    )
+    """File the IVF index is persisted to, so restarts skip centroid training (empty disables)."""
+    HYBRID: bool = field(default_factory=lambda: os.getenv("VECTOR_SEARCH_HYBRID", "False") in TRUE_VALUES)
+    """Fuse keyword matches (Oracle Text, or BM25 in the local backend) with vector search by default."""
+    HYBRID_CANDIDATES: int = field(default_factory=lambda: int(os.getenv("VECTOR_SEARCH_HYBRID_CANDIDATES", "20")))
+    """Candidates taken from each of the keyword and vector rankings before fusion."""
+    RRF_K: int = field(default_factory=lambda: int(os.getenv("VECTOR_SEARCH_RRF_K", "60")))
+    """Reciprocal rank fusion constant; larger values flatten the advantage of top ranks."""
+    MMR: bool = field(default_factory=lambda: os.getenv("VECTOR_SEARCH_MMR", "False") in TRUE_VALUES)
+    """Rerank over-fetched candidates by maximal marginal relevance by default, for more varied results."""
+    MMR_CANDIDATES: int = field(default_factory=lambda: int(os.getenv("VECTOR_SEARCH_MMR_CANDIDATES", "20")))
+    """Candidates fetched (with their embeddings) before MMR picks the final results."""
+    MMR_LAMBDA: float = field(default_factory=lambda: float(os.getenv("VECTOR_SEARCH_MMR_LAMBDA", "0.5")))
+    """MMR trade-off: 1 keeps the relevance order, lower values favour variety over relevance."""
+    FETCH_MODE: str = field(default_factory=lambda: os.getenv("VECTOR_FETCH_MODE", "approx"))
+    """Oracle top-k fetch mode: ``approx`` (use the vector indexes) or ``exact`` (full scan)."""
+    TARGET_ACCURACY: int = field(default_factory=lambda: int(os.getenv("VECTOR_TARGET_ACCURACY", "0")))
+    """Target accuracy (percent) of approximate Oracle searches; 0 uses the index default (95)."""
+    REDUCED_DIMENSIONS: int = field(default_factory=lambda: int(os.getenv("VECTOR_REDUCED_DIMENSIONS", "0")))
+    """Leading embedding dimensions (256 or 128) searched in the first stage; 0 searches full vectors."""
+    RESCORE_CANDIDATES: int = field(default_factory=lambda: int(os.getenv("VECTOR_RESCORE_CANDIDATES", "40")))
+    """Reduced-dimension candidates re-scored with the full embeddings before the top k are returned."""
+    EMBEDDING_BATCH_SIZE: int = field(default_factory=lambda: int(os.getenv("EMBEDDING_BATCH_SIZE", "100")))
+    """Texts per Vertex AI embedding request in batched calls (the API accepts up to 250)."""
+
+
 @dataclass
 class Settings:
     app: AppSettings = field(default_factory=AppSettings)
     db: DatabaseSettings = field(default_factory=DatabaseSettings)
     server: ServerSettings = field(default_factory=ServerSettings)
     log: LogSettings = field(default_factory=LogSettings)
+    cache: CacheSettings = field(default_factory=CacheSettings)
+    maintenance: MaintenanceSettings = field(default_factory=MaintenanceSettings)
+    search: SearchSettings = field(default_factory=SearchSettings)
 
     @classmethod
     @lru_cache(maxsize=1, typed=True)
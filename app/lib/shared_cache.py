@@ -0,0 +1,220 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cross-process embedding cache backed by a memory-mapped file."""
+
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+__all__ = ("SharedVectorCache",)
+
+_MAGIC = b"EMBSHM01"
+# magic, vector dimensions, slot count
+_HEADER = struct.Struct("<8sII")
+_HEADER_SIZE = 64
+# Slot header: seqlock counter, then 16-byte key digest and expiry (unix epoch seconds)
+_SEQ = struct.Struct("<Q")
+_SLOT_ENTRY = struct.Struct("<16sd")
+_SLOT_HEADER = struct.Struct("<Q16sd")
+_EMPTY_KEY = bytes(16)
+# Neighbouring slots inspected per key before the home slot is overwritten
+_PROBES = 4
+# Attempts a reader makes before giving up on a slot that keeps changing under it
+_READ_RETRIES = 3
+
+T = TypeVar("T")
+
+
+class SharedVectorCache:
+    """Fixed-slot hash table of float32 vectors shared by every process on a host.
+
+    The table lives in a memory-mapped file, so all workers read the same pages
+    without copying through Oracle or a socket. Each slot is guarded by a seqlock:
+    writers (serialized with ``flock``) bump the slot counter to an odd value, write,
+    then bump it back to even; readers retry if the counter moved while they read.
+    Reads are zero-copy: the caller's ``read`` function gets a view of the slot and
+    makes the one copy it needs inside the seqlock window.
+    Keys are 16-byte digests; a full neighbourhood overwrites the key's home slot.
+    """
+
+    def __init__(self, path: str | Path, slots: int, dimensions: int = 768) -> None:
+        """Open (or create) the cache file.
+
+        Args:
+            path: Location of the backing file, typically on a tmpfs such as ``/dev/shm``
+            slots: Number of vector slots in the table
+            dimensions: Vector dimensions stored in each slot
+        """
+        self.path = Path(path)
+        self.slots = slots
+        self.dimensions = dimensions
+        self._vector_bytes = dimensions * 4
+        self._slot_size = _SLOT_HEADER.size + self._vector_bytes
+        self._size = _HEADER_SIZE + slots * self._slot_size
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = self._open_table()
+        self._mmap = mmap.mmap(self._fd, self._size)
+        self._view = memoryview(self._mmap)
+
+    def close(self) -> None:
+        """Unmap the table and close the backing file."""
+        self._view.release()
+        self._mmap.close()
+        os.close(self._fd)
+
+    def get(self, key: bytes, read: Callable[[memoryview], T]) -> tuple[T, float] | None:
+        """Return ``(read(vector), expires_at)`` for ``key``, or ``None`` on a miss or expiry.
+
+        ``read`` receives a read-only byte view of the slot's float32 payload in shared
+        memory and must copy what it keeps (e.g. ``array.array("f").frombytes``): the
+        view is released afterwards, and another process may rewrite the slot at any
+        time. A result read while a writer was active is discarded and read again.
+        """
+        for offset in self._neighbourhood(key):
+            entry = self._read_slot(offset, key, read)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self.hits += 1
+                    return entry
+                break
+        self.misses += 1
+        return None
+
+    def set(self, key: bytes, vector: list[float], expires_at: float) -> None:
+        """Store ``vector`` under ``key`` until the unix timestamp ``expires_at``."""
+        if len(vector) != self.dimensions:
+            return
+        payload = struct.pack(f"<{self.dimensions}f", *vector)
+        with self._write_lock():
+            offset = self._choose_slot(key)
+            seq = _SEQ.unpack_from(self._mmap, offset)[0]
+            _SEQ.pack_into(self._mmap, offset, seq + 1)
+            _SLOT_ENTRY.pack_into(self._mmap, offset + _SEQ.size, key, expires_at)
+            start = offset + _SLOT_HEADER.size
+            self._view[start : start + self._vector_bytes] = payload
+            _SEQ.pack_into(self._mmap, offset, seq + 2)
+            self.writes += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters and geometry for monitoring (counters are per process)."""
+        lookups = self.hits + self.misses
+        return {
+            "name": "embedding_shared",
+            "path": str(self.path),
+            "slots": self.slots,
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
+
+    def _read_slot(self, offset: int, key: bytes, read: Callable[[memoryview], T]) -> tuple[T, float] | None:
+        """Read the slot at ``offset`` through ``read`` if it holds ``key``, retrying torn reads."""
+        for _attempt in range(_READ_RETRIES):
+            seq, slot_key, expires_at = _SLOT_HEADER.unpack_from(self._mmap, offset)
+            if seq & 1:
+                continue
+            if slot_key != key:
+                return None
+            start = offset + _SLOT_HEADER.size
+            with self._view[start : start + self._vector_bytes] as payload, payload.toreadonly() as view:
+                value = read(view)
+            if _SEQ.unpack_from(self._mmap, offset)[0] == seq:
+                return value, expires_at
+        return None
+
+    def _neighbourhood(self, key: bytes) -> list[int]:
+        home = int.from_bytes(key[:8], "little") % self.slots
+        return [_HEADER_SIZE + ((home + i) % self.slots) * self._slot_size for i in range(min(_PROBES, self.slots))]
+
+    def _choose_slot(self, key: bytes) -> int:
+        """Pick the slot to write: the key's own slot, else a free or expired one, else the home slot."""
+        now = time.time()
+        candidates = self._neighbourhood(key)
+        reusable = None
+        for offset in candidates:
+            _seq, slot_key, expires_at = _SLOT_HEADER.unpack_from(self._mmap, offset)
+            if slot_key == key:
+                return offset
+            if reusable is None and (slot_key == _EMPTY_KEY or expires_at <= now):
+                reusable = offset
+        return reusable if reusable is not None else candidates[0]
+
+    def _open_table(self) -> int:
+        """Open the backing file, replacing it if it is laid out for another configuration.
+
+        A mismatched file is never truncated in place, since other processes may still
+        have it mapped and would fault on the vanished pages. A fresh table is written
+        to a temporary file and renamed over the path instead; existing mappings keep
+        the old inode until they close it.
+        """
+        header = _HEADER.pack(_MAGIC, self.dimensions, self.slots)
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            with _FileLock(fd, self._lock):
+                stat = os.fstat(fd)
+                try:
+                    current = self.path.stat()
+                except FileNotFoundError:
+                    current = None
+                if current is not None and (current.st_dev, current.st_ino) == (stat.st_dev, stat.st_ino):
+                    if stat.st_size == self._size and os.pread(fd, _HEADER.size, 0) == header:
+                        return fd
+                    # New file or one laid out for another configuration: swap in an empty table
+                    tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                    tmp_fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+                    try:
+                        os.ftruncate(tmp_fd, self._size)
+                        os.pwrite(tmp_fd, header, 0)
+                    finally:
+                        os.close(tmp_fd)
+                    tmp_path.replace(self.path)
+            # The path was replaced while we waited for the lock, or by us: open it again
+            os.close(fd)
+
+    def _write_lock(self) -> _FileLock:
+        return _FileLock(self._fd, self._lock)
+
+
+class _FileLock:
+    """Exclusive lock across threads (``threading.Lock``) and processes (``flock``)."""
+
+    def __init__(self, fd: int, lock: threading.Lock) -> None:
+        self._fd = fd
+        self._lock = lock
+
+    def __enter__(self) -> None:
+        self._lock.acquire()
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *_exc: object) -> None:
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
@@ -0,0 +1,163 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Live per-tier counters and latency histograms for the cache hierarchies."""
+
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+__all__ = ("CacheTelemetry", "LatencyHistogram", "elapsed_ms")
+
+# Upper bounds (ms) of the latency buckets; the last bucket is unbounded
+DEFAULT_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def elapsed_ms(started: float) -> float:
+    """Milliseconds since ``started`` (a ``time.perf_counter()`` value)."""
+    return (time.perf_counter() - started) * 1000
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with percentile estimates."""
+
+    def __init__(self, buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS) -> None:
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, duration_ms: float) -> None:
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.buckets_ms, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+
+    def percentile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the ``q`` quantile (0-1), or ``None`` if empty.
+
+        Observations above the last bound report that bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets_ms, self.counts, strict=False):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return self.buckets_ms[-1]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return summary statistics and the raw bucket counts."""
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {
+                **{f"le_{bound:g}": count for bound, count in zip(self.buckets_ms, self.counts, strict=False)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class CacheTelemetry:
+    """Hit/miss counters and lookup latency for each tier of one cache hierarchy.
+
+    Tiers are recorded in lookup order; the ``origin`` tier is where values are produced
+    on a full miss (e.g. Vertex AI). For the origin, a "hit" means the value was produced
+    and a "miss" that production failed. Hits on ``fallback`` tiers answer without a real
+    value (e.g. a negative cache) and do not count towards the hit rate. Counters are per
+    worker process and reset on restart.
+    """
+
+    def __init__(self, name: str, tiers: Sequence[str], origin: str, fallback: Sequence[str] = ()) -> None:
+        """Initialize the telemetry.
+
+        Args:
+            name: Cache hierarchy name reported in snapshots
+            tiers: Tier names in lookup order (further tiers are added on first use)
+            origin: Name of the tier that produces values on a full miss
+            fallback: Tiers whose hits are answered with a fallback rather than a cached value
+        """
+        self.name = name
+        self.origin = origin
+        self.fallback = frozenset(fallback)
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._tiers: dict[str, tuple[list[int], LatencyHistogram]] = {}
+        for tier in (*tiers, origin):
+            self._tier(tier)
+
+    def record(self, tier: str, hit: bool, duration_ms: float) -> None:
+        """Record one lookup against ``tier``."""
+        with self._lock:
+            counters, histogram = self._tier(tier)
+            counters[0 if hit else 1] += 1
+            histogram.observe(duration_ms)
+
+    def reset(self) -> None:
+        """Zero every counter and histogram."""
+        with self._lock:
+            tiers = list(self._tiers)
+            self._tiers = {}
+            for tier in tiers:
+                self._tier(tier)
+            self._started = time.time()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return per-tier counters, latency percentiles and the overall cache hit rate.
+
+        ``hit_rate`` is the share of requests answered by a cache tier rather than the origin.
+        """
+        with self._lock:
+            tiers = {
+                tier: {
+                    "hits": counters[0],
+                    "misses": counters[1],
+                    "hit_rate": round(counters[0] / (counters[0] + counters[1]) * 100, 1)
+                    if counters[0] + counters[1]
+                    else 0.0,
+                    "latency": histogram.snapshot(),
+                }
+                for tier, (counters, histogram) in self._tiers.items()
+            }
+            started = self._started
+        cache_hits = sum(
+            stats["hits"] for tier, stats in tiers.items() if tier != self.origin and tier not in self.fallback
+        )
+        uncached = sum(stats["hits"] for tier, stats in tiers.items() if tier in self.fallback)
+        origin_requests = tiers[self.origin]["hits"] + tiers[self.origin]["misses"]
+        requests = cache_hits + uncached + origin_requests
+        return {
+            "name": self.name,
+            "since": started,
+            "requests": requests,
+            "cache_hits": cache_hits,
+            "hit_rate": round(cache_hits / requests * 100, 1) if requests else 0.0,
+            "tiers": tiers,
+        }
+
+    def _tier(self, tier: str) -> tuple[list[int], LatencyHistogram]:
+        if tier not in self._tiers:
+            self._tiers[tier] = ([0, 0], LatencyHistogram())
+        return self._tiers[tier]
@@ -0,0 +1,676 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process vector indexes answering cosine top-k queries with NumPy, and Oracle fetch modes."""
+
+from __future__ import annotations
+
+import copy
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+    from typing import Self
+
+__all__ = (
+    "FETCH_MODES",
+    "ExactVectorIndex",
+    "IVFVectorIndex",
+    "fetch_first",
+    "latency_summary",
+    "mmr",
+    "normalize_rows",
+    "recall_at_k",
+    "recall_report",
+    "rescore_report",
+    "sample_queries",
+    "synthetic_vectors",
+    "timed_searches",
+    "top_k",
+    "train_centroids",
+    "truncate_dimensions",
+)
+
+# Oracle top-k fetch modes: ``approx`` may use a vector index, ``exact`` always scans
+FETCH_MODES = ("approx", "exact")
+
+# Rows scored per block when assigning a large matrix to centroids
+_ASSIGN_BLOCK_ROWS = 16384
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length (all-zero rows stay zero)."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def truncate_dimensions(vectors: Sequence[float] | np.ndarray, dimensions: int) -> np.ndarray:
+    """Keep the leading ``dimensions`` components of each vector and renormalize.
+
+    Matryoshka-trained models such as ``text-embedding-004`` front-load information, so
+    a renormalized prefix is a usable lower-resolution embedding: cosine rankings over it
+    approximate the full-dimension ones, at a fraction of the memory and I/O.
+    """
+    return normalize_rows(np.asarray(vectors, dtype=np.float32)[..., :dimensions])
+
+
+def fetch_first(mode: str, target_accuracy: int | None = None, limit: str = ":limit") -> str:
+    """Build the ``FETCH ... FIRST`` clause of an Oracle top-k vector query.
+
+    Without ``APPROX`` or ``EXACT`` the optimizer picks the plan, and may scan every row
+    even when a vector index exists. ``approx`` requests an index search at
+    ``target_accuracy`` percent (the index's own target when ``None`` or 0); ``exact``
+    forces exact ranking.
+
+    Args:
+        mode: One of ``FETCH_MODES``
+        target_accuracy: Approximate search accuracy in percent (1-100)
+        limit: Bind placeholder (or literal) holding the row limit
+
+    Raises:
+        ValueError: If ``mode`` or ``target_accuracy`` is out of range
+    """
+    if mode not in FETCH_MODES:
+        msg = f"Unknown vector fetch mode {mode!r}; expected one of {', '.join(FETCH_MODES)}"
+        raise ValueError(msg)
+    if mode == "exact":
+        return f"FETCH EXACT FIRST {limit} ROWS ONLY"
+    if not target_accuracy:
+        return f"FETCH APPROX FIRST {limit} ROWS ONLY"
+    if not 0 < target_accuracy <= 100:  # noqa: PLR2004
+        msg = f"Target accuracy must be between 1 and 100, got {target_accuracy}"
+        raise ValueError(msg)
+    # Validated above, so the accuracy is safe to inline as a literal
+    return f"FETCH APPROX FIRST {limit} ROWS ONLY WITH TARGET ACCURACY {int(target_accuracy)}"
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the positions of the ``k`` highest ``scores``, best first.
+
+    ``argpartition`` selects the candidates in linear time; only those ``k`` are sorted.
+    Ties are broken by position so results are deterministic.
+    """
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    candidates = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def train_centroids(
+    matrix: np.ndarray, n_lists: int, iterations: int = 10, sample_size: int = 0, seed: int = 0
+) -> np.ndarray:
+    """Cluster row-normalized ``matrix`` with spherical k-means.
+
+    Args:
+        matrix: Row-normalized vectors
+        n_lists: Number of centroids
+        iterations: Lloyd iterations
+        sample_size: Rows used for training (default: 64 per centroid)
+        seed: Random seed, so the same data trains the same centroids
+
+    Returns:
+        Row-normalized ``(n_lists, dimensions)`` float32 centroids
+    """
+    rng = np.random.default_rng(seed)
+    n_lists = max(1, min(n_lists, len(matrix)))
+    sample_size = min(len(matrix), sample_size or n_lists * 64)
+    sample = matrix[rng.choice(len(matrix), sample_size, replace=False)] if sample_size < len(matrix) else matrix
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        empty = ~sums.any(axis=1)
+        # Re-seed empty clusters from random rows instead of dropping them
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids.astype(np.float32)
+
+
+class _VectorRows:
+    """Growable row-normalized float32 matrix with an identifier-to-row map.
+
+    Rows with a zero norm have no defined cosine distance and are left out, as are
+    queries with a zero norm. Removed rows stay in the matrix but are masked out.
+    ``upsert`` and ``remove`` change the index in place; apply them to a ``copy()``
+    when other readers may be searching it.
+    """
+
+    def __init__(self, ids: Sequence[int], vectors: np.ndarray | Sequence[Sequence[float]]) -> None:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.size == 0 and matrix.ndim < 2:  # noqa: PLR2004
+            matrix = matrix.reshape(0, 0)
+        if matrix.ndim != 2 or len(matrix) != len(ids):  # noqa: PLR2004
+            msg = f"Expected {len(ids)} vectors as a 2-D array, got shape {matrix.shape}"
+            raise ValueError(msg)
+        keep = np.linalg.norm(matrix, axis=1) > 0
+        self.dimensions = matrix.shape[1]
+        self._ids = np.asarray(ids, dtype=np.int64)[keep]
+        self._matrix = np.ascontiguousarray(normalize_rows(matrix[keep]))
+        self._alive = np.ones(len(self._ids), dtype=bool)
+        self._size = len(self._ids)
+        self._positions = {int(row_id): position for position, row_id in enumerate(self._ids.tolist())}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, row_id: object) -> bool:
+        return row_id in self._positions
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Identifier of each live row."""
+        return self._ids[: self._size][self._alive[: self._size]]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Row-normalized vectors of the live rows, in ``ids`` order."""
+        return self._matrix[: self._size][self._alive[: self._size]]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the matrix and identifiers."""
+        return self._matrix.nbytes + self._ids.nbytes + self._alive.nbytes
+
+    def mask(self, ids: Iterable[int]) -> np.ndarray:
+        """Return a row bitmap selecting ``ids``, for restricting searches to a subset.
+
+        Bitmaps are tied to this index's row layout; rows inserted later are not selected.
+        """
+        selected = np.zeros(self._size, dtype=bool)
+        selected[[self._positions[row_id] for row_id in ids if row_id in self._positions]] = True
+        return selected
+
+    def distances(self, query: Sequence[float] | np.ndarray, ids: Iterable[int]) -> dict[int, float]:
+        """Return the cosine distance from ``query`` to each indexed identifier in ``ids``."""
+        vector = self._query(query)
+        positions = {row_id: self._positions[row_id] for row_id in ids if row_id in self._positions}
+        if vector is None or not positions:
+            return {}
+        scores = self._matrix[list(positions.values())] @ vector
+        return dict(zip(positions, (1.0 - scores.astype(np.float64)).tolist(), strict=True))
+
+    def vectors(self, ids: Iterable[int]) -> np.ndarray:
+        """Return the normalized vectors of ``ids`` as rows, in order; unknown identifiers get zero rows."""
+        ids = list(ids)
+        vectors = np.zeros((len(ids), self.dimensions), dtype=np.float32)
+        found = [(row, self._positions[row_id]) for row, row_id in enumerate(ids) if row_id in self._positions]
+        if found:
+            rows, positions = zip(*found, strict=True)
+            vectors[list(rows)] = self._matrix[list(positions)]
+        return vectors
+
+    def copy(self) -> Self:
+        """Return an independent copy that can be changed without affecting this index."""
+        clone = copy.copy(self)
+        clone.__dict__.update(self._detached_state())
+        return clone
+
+    def upsert(self, row_id: int, vector: Sequence[float] | np.ndarray) -> bool:
+        """Insert or replace the vector of ``row_id``; a zero vector removes it.
+
+        Returns:
+            Whether the index changed
+        """
+        normalized = normalize_rows(np.asarray(vector, dtype=np.float32))
+        if normalized.shape != (self.dimensions,):
+            return False
+        if not normalized.any():
+            return self.remove(row_id)
+        position = self._positions.get(row_id)
+        inserted = position is None
+        if position is None:
+            position = self._append(row_id)
+        self._matrix[position] = normalized
+        self._placed(position, inserted=inserted)
+        return True
+
+    def remove(self, row_id: int) -> bool:
+        """Drop ``row_id`` from the index. Returns whether it was present."""
+        position = self._positions.pop(row_id, None)
+        if position is None:
+            return False
+        self._alive[position] = False
+        self._removed(position)
+        return True
+
+    def _append(self, row_id: int) -> int:
+        if self._size == len(self._ids):
+            # Grow geometrically so repeated inserts stay amortized O(1)
+            capacity = max(16, self._size * 2)
+            self._matrix = np.resize(self._matrix, (capacity, self.dimensions))
+            self._ids = np.resize(self._ids, capacity)
+            self._alive = np.resize(self._alive, capacity)
+        position = self._size
+        self._ids[position] = row_id
+        self._alive[position] = True
+        self._size += 1
+        self._positions[row_id] = position
+        return position
+
+    def _detached_state(self) -> dict[str, Any]:
+        """Copies of the attributes ``upsert`` and ``remove`` modify, for ``copy``."""
+        return {
+            "_matrix": self._matrix.copy(),
+            "_ids": self._ids.copy(),
+            "_alive": self._alive.copy(),
+            "_positions": dict(self._positions),
+        }
+
+    def _placed(self, position: int, inserted: bool) -> None:
+        """Hook called after the vector at ``position`` was written."""
+
+    def _removed(self, position: int) -> None:
+        """Hook called after the row at ``position`` was removed."""
+
+    def _live(self, mask: np.ndarray | None) -> np.ndarray:
+        """Bitmap of the rows a search may return: live rows, restricted to ``mask``."""
+        live = self._alive[: self._size].copy()
+        if mask is not None:
+            live[: len(mask)] &= mask[: self._size]
+            live[len(mask) :] = False
+        return live
+
+    def _query(self, query: Sequence[float] | np.ndarray) -> np.ndarray | None:
+        vector = normalize_rows(np.asarray(query, dtype=np.float32))
+        if vector.shape != (self.dimensions,) or not vector.any():
+            return None
+        return vector
+
+    @staticmethod
+    def _empty() -> tuple[np.ndarray, np.ndarray]:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+
+class ExactVectorIndex(_VectorRows):
+    """Brute-force cosine index over a contiguous, row-normalized float32 matrix.
+
+    Rows are normalized once at build time, so a query costs one matrix-vector product
+    plus a partial sort. Distances match Oracle's ``VECTOR_DISTANCE(..., COSINE)``
+    (``1 - cosine similarity``) up to float32 rounding.
+    """
+
+    def search(
+        self, query: Sequence[float] | np.ndarray, k: int, mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the ``k`` nearest identifiers and their cosine distances, nearest first.
+
+        ``mask`` (from ``mask()``) restricts the search to a subset of rows before ranking.
+        """
+        vector = self._query(query)
+        if vector is None:
+            return self._empty()
+        live = self._live(mask)
+        scores = self._matrix[: self._size] @ vector
+        scores[~live] = -np.inf
+        positions = top_k(scores, min(k, int(live.sum())))
+        return self._ids[positions], 1.0 - scores[positions].astype(np.float64)
+
+    def search_many(
+        self, queries: Sequence[Sequence[float]] | np.ndarray, k: int, mask: np.ndarray | None = None
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Run ``search`` for every query with one matrix-matrix product.
+
+        Scoring the whole batch as ``queries @ matrix.T`` reads the matrix once instead of
+        once per query. Invalid (wrong-sized or all-zero) queries get empty results.
+        """
+        if not len(queries):
+            return []
+        vectors = normalize_rows(np.asarray(queries, dtype=np.float32))
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimensions:  # noqa: PLR2004
+            return [self._empty() for _ in range(len(vectors))]
+        live = self._live(mask)
+        limit = min(k, int(live.sum()))
+        scores = vectors @ self._matrix[: self._size].T
+        scores[:, ~live] = -np.inf
+        results = []
+        for vector, row in zip(vectors, scores, strict=True):
+            if not vector.any():
+                results.append(self._empty())
+                continue
+            positions = top_k(row, limit)
+            results.append((self._ids[positions], 1.0 - row[positions].astype(np.float64)))
+        return results
+
+
+class IVFVectorIndex(_VectorRows):
+    """Approximate cosine index: an inverted file over k-means centroids.
+
+    Each row is filed under its nearest centroid. A query scores the centroids, then
+    exactly scores only the rows filed under the ``n_probe`` closest ones, so the cost
+    per query is roughly ``n_lists + n_probe * rows / n_lists`` dot products instead of
+    ``rows``. More probes trade latency for recall; probing every list is exact. Inserts
+    are filed under the existing centroids, so retrain (rebuild without ``centroids``)
+    once the data has drifted or grown well beyond what the centroids were trained on.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[int],
+        vectors: np.ndarray | Sequence[Sequence[float]],
+        n_lists: int = 0,
+        n_probe: int = 8,
+        centroids: np.ndarray | None = None,
+        seed: int = 0,
+    ) -> None:
+        """Build the index.
+
+        Args:
+            ids: Identifier of each row
+            vectors: One embedding per identifier
+            n_lists: Number of centroids to train (default: square root of the row count)
+            n_probe: Lists scored per query unless overridden in ``search``
+            centroids: Previously trained centroids to reuse instead of training
+            seed: Random seed for training
+        """
+        super().__init__(ids, vectors)
+        # Rows the centroids were trained on; callers reusing centroids may carry it over
+        self.trained_rows = len(self._ids)
+        if centroids is None and len(self._ids):
+            n_lists = n_lists or round(len(self._ids) ** 0.5)
+            centroids = train_centroids(self._matrix, n_lists, seed=seed)
+        if centroids is None or centroids.shape[1:] != (self.dimensions,):
+            centroids = np.zeros((1, self.dimensions), dtype=np.float32)
+        self.centroids = normalize_rows(np.asarray(centroids, dtype=np.float32))
+        self.n_probe = n_probe
+        self._assignments = self._assign(self._matrix)
+        self._lists = [np.flatnonzero(self._assignments == c) for c in range(len(self.centroids))]
+
+    @property
+    def n_lists(self) -> int:
+        """Number of inverted lists."""
+        return len(self.centroids)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the matrix, identifiers, centroids and lists."""
+        return (
+            super().nbytes + self.centroids.nbytes + self._assignments.nbytes + sum(lst.nbytes for lst in self._lists)
+        )
+
+    def search(
+        self,
+        query: Sequence[float] | np.ndarray,
+        k: int,
+        n_probe: int | None = None,
+        mask: np.ndarray | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return approximately the ``k`` nearest identifiers and their cosine distances, nearest first.
+
+        ``mask`` (from ``mask()``) restricts the search to a subset of rows before ranking.
+        If the probed lists hold fewer than ``k`` selected rows, every selected row is
+        scored instead, so small subsets are searched exactly.
+        """
+        vector = self._query(query)
+        if vector is None or not len(self):
+            return self._empty()
+        live = self._live(mask)
+        probes = top_k(self.centroids @ vector, n_probe or self.n_probe)
+        candidates = np.concatenate([self._lists[probe] for probe in probes])
+        candidates = candidates[live[candidates]]
+        if len(candidates) < k:
+            candidates = np.flatnonzero(live)
+        scores = self._matrix[candidates] @ vector
+        best = top_k(scores, k)
+        return self._ids[candidates[best]], 1.0 - scores[best].astype(np.float64)
+
+    def search_many(
+        self,
+        queries: Sequence[Sequence[float]] | np.ndarray,
+        k: int,
+        n_probe: int | None = None,
+        mask: np.ndarray | None = None,
+    ) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Run ``search`` for every query; each probes its own lists, so queries are scored one by one."""
+        return [self.search(query, k, n_probe=n_probe, mask=mask) for query in queries]
+
+    def save(self, path: str | Path, **metadata: Any) -> None:
+        """Persist the index (and integer ``metadata`` arrays) to an ``.npz`` file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".tmp.npz")
+        np.savez(
+            partial,
+            ids=self.ids,
+            matrix=self.matrix,
+            centroids=self.centroids,
+            trained_rows=np.int64(self.trained_rows),
+            **{f"meta_{name}": np.asarray(value, dtype=np.int64) for name, value in metadata.items()},
+        )
+        # Atomic replace so readers never see a half-written file
+        partial.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path, n_probe: int = 8) -> tuple[IVFVectorIndex, dict[str, np.ndarray]]:
+        """Load an index written by ``save``, returning it with its metadata."""
+        with np.load(Path(path), allow_pickle=False) as data:
+            index = cls(data["ids"], data["matrix"], n_probe=n_probe, centroids=data["centroids"])
+            index.trained_rows = int(data["trained_rows"])
+            metadata = {name.removeprefix("meta_"): data[name] for name in data.files if name.startswith("meta_")}
+        return index, metadata
+
+    def _assign(self, matrix: np.ndarray) -> np.ndarray:
+        if not len(matrix):
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(
+            [
+                np.argmax(matrix[start : start + _ASSIGN_BLOCK_ROWS] @ self.centroids.T, axis=1)
+                for start in range(0, len(matrix), _ASSIGN_BLOCK_ROWS)
+            ]
+        )
+
+    def _detached_state(self) -> dict[str, Any]:
+        return {
+            **super()._detached_state(),
+            "_assignments": self._assignments.copy(),
+            # Lists are replaced, never modified in place, so the arrays themselves can be shared
+            "_lists": list(self._lists),
+        }
+
+    def _placed(self, position: int, inserted: bool) -> None:
+        if inserted:
+            self._assignments = np.resize(self._assignments, len(self._ids))
+        else:
+            self._removed(position)
+        target = int(np.argmax(self.centroids @ self._matrix[position]))
+        self._assignments[position] = target
+        self._lists[target] = np.append(self._lists[target], position)
+
+    def _removed(self, position: int) -> None:
+        current = self._lists[self._assignments[position]]
+        self._lists[self._assignments[position]] = current[current != position]
+
+
+def mmr(
+    query: Sequence[float] | np.ndarray,
+    candidates: Sequence[Sequence[float]] | np.ndarray,
+    k: int,
+    lambda_: float = 0.5,
+) -> np.ndarray:
+    """Pick ``k`` of ``candidates`` by maximal marginal relevance, in selection order.
+
+    Each step takes the candidate maximizing
+    ``lambda_ * sim(query, c) - (1 - lambda_) * max(sim(c, s) for s in selected)``, so
+    ``lambda_ = 1`` keeps the relevance order and lower values favour variety. The
+    pairwise similarities are one matrix product over the (small) candidate matrix, and
+    each step updates the redundancy of every candidate at once. Ties go to the earlier
+    candidate, so pass candidates in relevance order.
+
+    Returns:
+        Positions into ``candidates``
+
+    Raises:
+        ValueError: If ``query`` and ``candidates`` differ in dimensions
+    """
+    matrix = normalize_rows(np.asarray(candidates, dtype=np.float32))
+    k = min(k, len(matrix))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    vector = normalize_rows(np.asarray(query, dtype=np.float32))
+    if vector.shape != matrix.shape[1:]:
+        msg = f"Query has {vector.shape[-1]} dimensions but candidates have {matrix.shape[1]}"
+        raise ValueError(msg)
+    relevance = matrix @ vector
+    similarity = matrix @ matrix.T
+    redundancy = np.zeros(len(matrix), dtype=np.float32)
+    available = np.ones(len(matrix), dtype=bool)
+    selected = np.empty(k, dtype=np.intp)
+    for step in range(k):
+        scores = lambda_ * relevance - (1 - lambda_) * redundancy
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected[step] = pick
+        available[pick] = False
+        redundancy = similarity[pick] if step == 0 else np.maximum(redundancy, similarity[pick])
+    return selected
+
+
+def synthetic_vectors(
+    rows: int, dimensions: int = 768, clusters: int = 0, spread: float = 1.0, seed: int = 0
+) -> np.ndarray:
+    """Generate a clustered float32 catalog resembling real embeddings, for benchmarks.
+
+    Rows are drawn around ``clusters`` random centres (default: one per 1000 rows) with
+    per-dimension noise ``spread``, so nearest neighbours are meaningful but clusters
+    overlap enough that approximate indexes have to probe more than one of them.
+    """
+    rng = np.random.default_rng(seed)
+    clusters = clusters or max(1, rows // 1000)
+    centres = rng.standard_normal((clusters, dimensions), dtype=np.float32)
+    noise = rng.standard_normal((rows, dimensions), dtype=np.float32) * spread
+    return centres[rng.integers(0, clusters, rows)] + noise
+
+
+def sample_queries(vectors: np.ndarray, count: int, noise: float = 0.3, seed: int = 1) -> np.ndarray:
+    """Draw up to ``count`` benchmark queries from ``vectors``.
+
+    Queries are perturbed catalog rows (Gaussian noise at ``noise`` times the data's
+    spread), so each has real near neighbours but is not itself in the catalog.
+    """
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(len(vectors), min(count, len(vectors)), replace=False)]
+    return sample + rng.standard_normal(sample.shape, dtype=np.float32) * sample.std() * noise
+
+
+def timed_searches(
+    search: Callable[[np.ndarray], Iterable[int]], queries: Iterable[np.ndarray]
+) -> tuple[list[set[int]], np.ndarray]:
+    """Run ``search`` per query, returning the IDs found for each and per-query latencies in ms."""
+    results, timings = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(set(search(query)))
+        timings.append((time.perf_counter() - started) * 1000)
+    return results, np.asarray(timings)
+
+
+def recall_at_k(truth: Sequence[set[int]], found: Sequence[set[int]]) -> float:
+    """Fraction of the ``truth`` IDs present in ``found``, over all queries."""
+    expected = sum(len(ids) for ids in truth) or 1
+    return sum(len(a & b) for a, b in zip(truth, found, strict=True)) / expected
+
+
+def latency_summary(timings: np.ndarray) -> dict[str, float]:
+    """Average and 95th percentile of per-query latencies (0 when there are none)."""
+    if not len(timings):
+        return {"avg_ms": 0.0, "p95_ms": 0.0}
+    return {"avg_ms": float(timings.mean()), "p95_ms": float(np.percentile(timings, 95))}
+
+
+def recall_report(
+    exact: ExactVectorIndex,
+    index: IVFVectorIndex,
+    queries: Iterable[Sequence[float] | np.ndarray],
+    k: int,
+    probes: Iterable[int],
+) -> list[dict[str, Any]]:
+    """Measure recall@k and per-query latency of ``index`` against ``exact`` for each probe count.
+
+    Returns:
+        One row per probe count (plus an ``exact`` baseline row) with recall and latency.
+    """
+    queries = list(queries)
+    truth, exact_ms = timed_searches(lambda query: exact.search(query, k)[0].tolist(), queries)
+    report = [{"mode": "exact", "n_probe": None, "recall": 1.0, **latency_summary(exact_ms)}]
+    for n_probe in probes:
+        found, timings = timed_searches(
+            lambda query, n_probe=n_probe: index.search(query, k, n_probe=n_probe)[0].tolist(), queries
+        )
+        report.append(
+            {"mode": "ivf", "n_probe": n_probe, "recall": recall_at_k(truth, found), **latency_summary(timings)}
+        )
+    return report
+
+
+def rescore_report(
+    vectors: np.ndarray,
+    queries: Iterable[Sequence[float] | np.ndarray],
+    k: int,
+    dimensions: Iterable[int],
+    candidates: Iterable[int],
+) -> list[dict[str, Any]]:
+    """Measure recall@k of reduced-dimension search, with and without full-dimension re-scoring.
+
+    For each truncation in ``dimensions``, the top ``candidates`` (0 = just ``k``, no
+    re-scoring) are found among the truncated vectors, then re-ranked by their full
+    cosine distance. Recall is against exact full-dimension search; latency covers both
+    stages.
+
+    Returns:
+        One row per (dimensions, candidates) pair, plus a full-dimension baseline row.
+    """
+    queries = [np.asarray(query, dtype=np.float32) for query in queries]
+    candidates = list(candidates)
+    ids = list(range(len(vectors)))
+    full = ExactVectorIndex(ids, vectors)
+
+    truth, full_ms = timed_searches(lambda query: full.search(query, k)[0].tolist(), queries)
+    report = [
+        {
+            "dimensions": full.dimensions,
+            "candidates": 0,
+            "recall": 1.0,
+            **latency_summary(full_ms),
+            "bytes": full.nbytes,
+        }
+    ]
+    for dims in dimensions:
+        reduced = ExactVectorIndex(ids, truncate_dimensions(vectors, dims))
+        for fetch in candidates:
+
+            def _two_stage(
+                query: np.ndarray, reduced: ExactVectorIndex = reduced, dims: int = dims, fetch: int = fetch
+            ) -> list[int]:
+                found = reduced.search(truncate_dimensions(query, dims), max(k, fetch))[0].tolist()
+                if not fetch:
+                    return found
+                rescored = full.distances(query, found)
+                return sorted(rescored, key=rescored.__getitem__)[:k]
+
+            found, timings = timed_searches(_two_stage, queries)
+            report.append(
+                {
+                    "dimensions": dims,
+                    "candidates": fetch,
+                    "recall": recall_at_k(truth, found),
+                    **latency_summary(timings),
+                    "bytes": reduced.nbytes,
+                }
+            )
+    return report
@@ -32,6 +32,17 @@ from litestar.response import File, Stream
 from app import schemas
 from app.server import deps
 from app.server.exception_handlers import HTMXValidationException
+from app.services.cache_hits import cache_hits
+from app.services.embedding_cache import (
+    embedding_telemetry,
+    get_embedding_memory_cache,
+    get_embedding_negative_cache,
+    get_shared_embedding_cache,
+)
+from app.services.product_vectors import product_vector_index
+from app.services.response_cache import get_response_memory_cache, response_telemetry
+from app.services.vector_results import vector_result_cache, vector_result_telemetry
+from app.services.vertex_ai import VertexAIService
 
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
@@ -40,9 +51,8 @@ if TYPE_CHECKING:
     from litestar.params import Body
 
     from app.services.recommendation import RecommendationService
-    from app.services.response_cache import ResponseCacheService
     from app.services.search_metrics import SearchMetricsService
-    from app.services.vertex_ai import OracleVectorSearchService, VertexAIService
+    from app.services.vertex_ai import OracleVectorSearchService
 
 
 class CoffeeChatController(Controller):
@@ -238,17 +248,37 @@ class CoffeeChatController(Controller):
         except (ValueError, TypeError):
             return {"total_searches": 0, "avg_search_time_ms": 0, "avg_oracle_time_ms": 0, "avg_similarity_score": 0}
 
+    @get(path="/api/metrics/cache", name="metrics.cache")
+    async def get_cache_metrics(self) -> dict:
+        """Live per-tier cache counters and latency histograms for this worker process."""
+        shared_cache = get_shared_embedding_cache()
+        return {
+            "embedding": embedding_telemetry.snapshot(),
+            "response": response_telemetry.snapshot(),
+            "vector_results": vector_result_telemetry.snapshot(),
+            "memory": {
+                "embedding": get_embedding_memory_cache().stats(),
+                "embedding_negative": get_embedding_negative_cache().stats(),
+                "embedding_shared": shared_cache.stats() if shared_cache is not None else None,
+                "response": get_response_memory_cache().stats(),
+                "product_vectors": product_vector_index.stats(),
+                "vector_results": vector_result_cache.stats(),
+            },
+            "embedding_breaker": VertexAIService.get_embedding_breaker_stats(),
+            "pending_hit_counts": cache_hits.pending(),
+        }
+
     @get(path="/api/metrics/summary", name="metrics.summary")
     async def get_metrics_summary(
         self,
         metrics_service: SearchMetricsService,
-        cache_service: ResponseCacheService,
         request: HTMXRequest,
     ) -> HTMXTemplate:
         """Get summary metrics for dashboard cards."""
         # Get performance stats
         perf_stats = await metrics_service.get_performance_stats(hours=1)
-        cache_stats = await cache_service.get_cache_stats(hours=1)
+        # Hit rate from live response cache counters (any cache tier versus the LLM)
+        cache_stats = {"cache_hit_rate": response_telemetry.snapshot()["hit_rate"]}
 
         # Calculate trends (compare to previous hour)
         prev_stats = await metrics_service.get_performance_stats(hours=2)
@@ -106,8 +106,9 @@ class ApplicationCore(InitPluginProtocol, CLIPluginProtocol):
                 ),
             ],
         )
-        # startup hooks
+        # startup and shutdown hooks
         app_config.on_startup.append(startup.on_startup)
+        app_config.on_shutdown.append(startup.on_shutdown)
         # exception handlers
         app_config.exception_handlers.update(exception_handlers)  # type: ignore[arg-type]
         # signatures
@@ -145,13 +146,18 @@ class ApplicationCore(InitPluginProtocol, CLIPluginProtocol):
     def on_cli_init(self, cli: Group) -> None:
         from app.cli import (
             bulk_embed,
+            cache_key_report,
             clear_cache,
             dump_data,
             embed_new,
             load_fixtures,
             load_vectors,
             model_info,
+            reduce_embeddings,
             truncate_tables,
+            vector_accuracy_report,
+            vector_dimension_report,
+            vector_index_report,
         )
 
         cli.add_command(model_info, name="model-info")
@@ -160,5 +166,10 @@ class ApplicationCore(InitPluginProtocol, CLIPluginProtocol):
         cli.add_command(bulk_embed, name="bulk-embed")
         cli.add_command(embed_new, name="embed-new")
         cli.add_command(clear_cache, name="clear-cache")
+        cli.add_command(cache_key_report, name="cache-key-report")
+        cli.add_command(vector_index_report, name="vector-index-report")
+        cli.add_command(vector_accuracy_report, name="vector-accuracy-report")
+        cli.add_command(vector_dimension_report, name="vector-dimension-report")
+        cli.add_command(reduce_embeddings, name="reduce-embeddings")
         cli.add_command(truncate_tables, name="truncate-tables")
         cli.add_command(dump_data, name="dump-data")
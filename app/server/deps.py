@@ -5,6 +5,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, TypeVar
 
 from app import config
+from app.lib.settings import get_settings
 from app.services import (
     ChatConversationService,
     CompanyService,
@@ -63,13 +64,17 @@ provide_intent_exemplar_service = create_service_provider(IntentExemplarService)
 async def provide_embedding_cache(
     db_connection: AsyncConnection | None = None,
 ) -> AsyncGenerator[EmbeddingCache, None]:
-    """Provide Embedding Cache service with Oracle connection."""
+    """Provide Embedding Cache service with Oracle connection.
+
+    The in-memory tier is process-wide, so it survives across the per-request instances.
+    """
+    ttl_hours = get_settings().cache.EMBEDDING_TTL_HOURS
     if db_connection:
         # If a specific connection is provided, use it
-        yield EmbeddingCache(db_connection, ttl_hours=24)
+        yield EmbeddingCache(db_connection, ttl_hours=ttl_hours)
         return
     async with config.oracle_async.get_connection() as conn:
-        yield EmbeddingCache(conn, ttl_hours=24)
+        yield EmbeddingCache(conn, ttl_hours=ttl_hours)
 
 
 # Providers that don't require a database connection directly
@@ -2,16 +2,28 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import secrets
 from typing import TYPE_CHECKING
 
 import structlog
 
 from app import config
+from app.lib.canonical import get_query_canonicalizer
+from app.lib.settings import get_settings
 from app.server import deps
+from app.services.cache_hits import cache_hits
+from app.services.catalog import product_catalog
+from app.services.chat_conversation import ChatConversationService
+from app.services.embedding_cache import EmbeddingCache
 from app.services.intent_exemplar import IntentExemplarService
 from app.services.intent_router import INTENT_EXEMPLARS
+from app.services.maintenance import JobLeaseService, MaintenanceScheduler, ScheduledJob
 from app.services.product import ProductService
+from app.services.product_vectors import product_vector_index
+from app.services.response_cache import ResponseCacheService
+from app.services.user_session import UserSessionService
 
 if TYPE_CHECKING:
     import oracledb
@@ -65,7 +77,7 @@ async def populate_product_exemplars(
 
             if not exists:
                 # Generate embedding
-                embedding = await vertex_ai_service.create_embedding(exemplar)
+                embedding = await vertex_ai_service.create_embedding_stored(exemplar)
                 await exemplar_service.cache_exemplar("PRODUCT_RAG", exemplar, embedding)
                 count += 1
 
@@ -111,6 +123,143 @@ async def warm_up_connection_pool(app: Litestar) -> None:
     logger.info("Connection pool warmed up")
 
 
+async def warm_embedding_cache(top_n: int, concurrency: int, lookback_days: int) -> int:
+    """Pre-embed the most frequent historical user queries.
+
+    Queries are ranked by canonical cache key, so phrasings that share a cache entry
+    are counted together and embedded once. Lookups go through ``EmbeddingCache``:
+    entries already in Oracle only warm the in-process tier, the rest are generated
+    and stored in both.
+
+    Returns:
+        Number of queries warmed
+    """
+    async with config.oracle_async.get_connection() as conn:
+        # Over-fetch raw messages since several phrasings can collapse onto one key
+        messages = await ChatConversationService(conn).get_frequent_user_messages(limit=top_n * 4, days=lookback_days)
+
+    canonicalize = get_query_canonicalizer()
+    ranked: dict[str, tuple[str, int]] = {}
+    for message, frequency in messages:
+        key = canonicalize(message)
+        if not key:
+            continue
+        best, total = ranked.get(key, (message, 0))
+        ranked[key] = (best, total + frequency)
+    queries = [message for message, _total in sorted(ranked.values(), key=lambda item: item[1], reverse=True)][:top_n]
+    if not queries:
+        return 0
+
+    vertex_ai_service = await anext(deps.provide_vertex_ai_service())
+    ttl_hours = get_settings().cache.EMBEDDING_TTL_HOURS
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _warm(query: str) -> bool:
+        async with semaphore, config.oracle_async.get_connection() as conn:
+            _embedding, cache_hit = await EmbeddingCache(conn, ttl_hours=ttl_hours).get_embedding(
+                query, vertex_ai_service
+            )
+            return cache_hit
+
+    results = await asyncio.gather(*(_warm(query) for query in queries), return_exceptions=True)
+    failures = [result for result in results if isinstance(result, BaseException)]
+    logger.info(
+        "Embedding cache warmed",
+        queries=len(queries),
+        already_cached=sum(1 for result in results if result is True),
+        generated=sum(1 for result in results if result is False),
+        failed=len(failures),
+    )
+    return len(queries) - len(failures)
+
+
+async def run_cache_warmer() -> None:
+    """Background warmup stage started after the application is ready."""
+    cache_settings = get_settings().cache
+    if cache_settings.WARMUP_TOP_N <= 0:
+        return
+    try:
+        await warm_embedding_cache(
+            cache_settings.WARMUP_TOP_N,
+            cache_settings.WARMUP_CONCURRENCY,
+            cache_settings.WARMUP_LOOKBACK_DAYS,
+        )
+    except Exception:
+        logger.exception("cache_warmer_error")
+
+
+async def flush_cache_hits() -> int:
+    """Flush buffered cache hit counts to Oracle."""
+    if not cache_hits.pending():
+        return 0
+    async with config.oracle_async.get_connection() as conn:
+        return await cache_hits.flush(conn)
+
+
+async def refresh_product_catalog() -> None:
+    """Load the product catalog snapshot, or apply changes since the last refresh."""
+    async with config.oracle_async.get_connection() as conn:
+        await product_catalog.refresh(conn)
+
+
+async def refresh_product_vector_index() -> None:
+    """Build the in-process product vector index, or rebuild it if embeddings changed."""
+    async with config.oracle_async.get_connection() as conn:
+        await product_vector_index.refresh(conn)
+
+
+async def acquire_job_lease(job_name: str, holder: str, ttl_seconds: float) -> bool:
+    """Take or renew the app_config lease for an exclusive maintenance job."""
+    async with config.oracle_async.get_connection() as conn:
+        return await JobLeaseService(conn).try_acquire(job_name, holder, ttl_seconds)
+
+
+def create_maintenance_scheduler() -> MaintenanceScheduler:
+    """Build the scheduler for periodic per-worker and database-wide maintenance."""
+    settings = get_settings()
+    batch_size = settings.maintenance.DELETE_BATCH_SIZE
+
+    async def _expire_embeddings() -> int:
+        async with config.oracle_async.get_connection() as conn:
+            return await EmbeddingCache(conn).clear_expired(batch_size=batch_size)
+
+    async def _expire_responses() -> int:
+        async with config.oracle_async.get_connection() as conn:
+            return await ResponseCacheService(conn).cleanup_expired(batch_size=batch_size)
+
+    async def _expire_chat_history() -> int:
+        async with config.oracle_async.get_connection() as conn:
+            return await ChatConversationService(conn).cleanup_expired(
+                settings.maintenance.CHAT_HISTORY_RETENTION_DAYS, batch_size=batch_size
+            )
+
+    async def _expire_sessions() -> int:
+        async with config.oracle_async.get_connection() as conn:
+            return await UserSessionService(conn).cleanup_expired(batch_size=batch_size)
+
+    cleanup_interval = settings.maintenance.CLEANUP_INTERVAL_SECONDS
+    jobs = [
+        # Per-worker state: every worker runs these
+        ScheduledJob("cache_hit_flush", settings.cache.HIT_COUNT_FLUSH_SECONDS, flush_cache_hits),
+        ScheduledJob("catalog_refresh", settings.cache.CATALOG_REFRESH_SECONDS, refresh_product_catalog),
+        # Database-wide cleanup: one worker at a time
+        ScheduledJob("embedding_cache_expiry", cleanup_interval, _expire_embeddings, exclusive=True),
+        ScheduledJob("response_cache_expiry", cleanup_interval, _expire_responses, exclusive=True),
+        ScheduledJob("user_session_expiry", cleanup_interval, _expire_sessions, exclusive=True),
+    ]
+    if settings.maintenance.CHAT_HISTORY_RETENTION_DAYS > 0:
+        jobs.append(ScheduledJob("chat_history_expiry", cleanup_interval, _expire_chat_history, exclusive=True))
+    if settings.search.BACKEND == "local":
+        jobs.append(
+            ScheduledJob("vector_index_refresh", settings.search.INDEX_REFRESH_SECONDS, refresh_product_vector_index)
+        )
+    return MaintenanceScheduler(
+        jobs,
+        lease=acquire_job_lease,
+        jitter=settings.maintenance.JITTER,
+    )
+
+
 async def on_startup(app: Litestar) -> None:
     """Main startup hook that runs all initialization tasks."""
 
@@ -120,4 +269,28 @@ async def on_startup(app: Litestar) -> None:
 
     await warm_up_connection_pool(app)
     await initialize_intent_exemplar_cache(app)
+    await refresh_product_catalog()
+    if get_settings().search.BACKEND == "local":
+        await refresh_product_vector_index()
+    app.state.maintenance_scheduler = create_maintenance_scheduler()
+    app.state.maintenance_scheduler.start()
+    # Warm caches in the background so readiness does not wait on Vertex AI
+    app.state.cache_warmer = asyncio.create_task(run_cache_warmer())
     logger.info("Application startup complete")
+
+
+async def on_shutdown(app: Litestar) -> None:
+    """Main shutdown hook that stops background tasks and flushes buffered state."""
+
+    warmer: asyncio.Task | None = getattr(app.state, "cache_warmer", None)
+    if warmer is not None:
+        warmer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await warmer
+
+    scheduler: MaintenanceScheduler | None = getattr(app.state, "maintenance_scheduler", None)
+    if scheduler is not None:
+        await scheduler.stop()
+
+    flushed = await flush_cache_hits()
+    logger.info("Application shutdown complete", flushed_cache_hits=flushed)
@@ -20,7 +20,8 @@ from contextlib import asynccontextmanager
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator
+    from collections.abc import AsyncGenerator, Callable
+    from typing import Any
 
     import oracledb
 
@@ -40,3 +41,34 @@ class BaseService:
             yield cursor
         finally:
             cursor.close()
+
+    async def delete_in_batches(
+        self,
+        sql: str,
+        params: dict[str, Any] | None = None,
+        batch_size: int = 1000,
+        on_deleted: Callable[[list[str]], None] | None = None,
+    ) -> int:
+        """Run a bounded DELETE repeatedly, committing after each batch.
+
+        ``sql`` must limit itself with ``ROWNUM <= :batch_size`` so every transaction
+        touches at most ``batch_size`` rows, keeping undo, redo and lock hold times small.
+        With ``on_deleted``, ``sql`` must also end in ``RETURNING <column> INTO :deleted``;
+        the callback receives the returned values of each batch once it is committed.
+
+        Returns:
+            Total number of rows deleted
+        """
+        deleted = 0
+        async with self.get_cursor() as cursor:
+            while True:
+                binds = {**(params or {}), "batch_size": batch_size}
+                if on_deleted is not None:
+                    binds["deleted"] = cursor.var(str, arraysize=batch_size)
+                await cursor.execute(sql, binds)
+                await self.connection.commit()
+                if on_deleted is not None:
+                    on_deleted(binds["deleted"].getvalue() or [])
+                deleted += cursor.rowcount
+                if cursor.rowcount < batch_size:
+                    return deleted
@@ -12,6 +12,8 @@ import structlog
 from google.cloud import aiplatform, storage  # type: ignore[attr-defined]
 
 from app.lib.settings import get_settings
+from app.services.product_vectors import reduced_embedding
+from app.services.vector_results import vector_result_cache
 
 if TYPE_CHECKING:
     from google.cloud.aiplatform import BatchPredictionJob
@@ -174,6 +176,8 @@ class BulkEmbeddingService:
                         await self._update_product_embedding(result)
                         total_processed += 1
 
+        if total_processed:
+            vector_result_cache.invalidate("bulk_embedding")
         await logger.ainfo(f"Processed {total_processed} embedding results")
         return total_processed
 
@@ -202,10 +206,16 @@ class BulkEmbeddingService:
             await cursor.execute(
                 """
                 UPDATE product
-                SET embedding = :embedding
+                SET embedding = :embedding,
+                    embedding_reduced = :embedding_reduced,
+                    updated_at = SYSTIMESTAMP
                 WHERE id = :id
                 """,
-                {"embedding": oracle_vector, "id": int(product_id)},
+                {
+                    "embedding": oracle_vector,
+                    "embedding_reduced": reduced_embedding(embedding),
+                    "id": int(product_id),
+                },
             )
             await self.product_service.connection.commit()
 
@@ -271,7 +281,7 @@ class OnlineEmbeddingService:
         """Generate embedding for a single product using online API."""
         try:
             # Use the correct vertex AI service method
-            return await self.vertex_ai_service.create_embedding(text_content)
+            return await self.vertex_ai_service.create_embedding_stored(text_content)
 
         except Exception:
             logger.exception("Failed to generate embedding for product", product_id=product_id)
@@ -309,10 +319,16 @@ class OnlineEmbeddingService:
                         await cursor.execute(
                             """
                             UPDATE product
-                            SET embedding = :embedding
+                            SET embedding = :embedding,
+                                embedding_reduced = :embedding_reduced,
+                                updated_at = SYSTIMESTAMP
                             WHERE id = :id
                             """,
-                            {"embedding": oracle_vector, "id": product["id"]},
+                            {
+                                "embedding": oracle_vector,
+                                "embedding_reduced": reduced_embedding(embedding),
+                                "id": product["id"],
+                            },
                         )
                         await product_service.connection.commit()
                         return 1
@@ -324,6 +340,8 @@ class OnlineEmbeddingService:
 
         # Count successful updates
         success_count = sum(1 for result in results if result == 1)
+        if success_count:
+            vector_result_cache.invalidate("bulk_embedding")
 
         await logger.ainfo(f"Processed {success_count} products with online embedding API")
         return success_count
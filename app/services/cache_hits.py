@@ -0,0 +1,96 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Write-behind hit-count accounting for the Oracle cache tables."""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING
+
+import structlog
+
+if TYPE_CHECKING:
+    import oracledb
+
+logger = structlog.get_logger()
+
+# Cache tables whose hit_count column is maintained by the buffer (all keyed by cache_key)
+CACHE_TABLES = ("embedding_cache", "response_cache")
+
+
+class CacheHitBuffer:
+    """Aggregate cache hits in memory and flush them to Oracle in one batch.
+
+    Recording a hit is a dictionary increment, so cache hits stay read-only on the
+    request path. ``flush`` applies all pending increments with one ``executemany``
+    per table and a single commit.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[str, Counter[str]] = {table: Counter() for table in CACHE_TABLES}
+        self._lock = threading.Lock()
+
+    def record(self, table: str, cache_key: str, hits: int = 1) -> None:
+        """Record ``hits`` cache hits for ``cache_key`` in ``table``."""
+        with self._lock:
+            self._pending[table][cache_key] += hits
+
+    def pending(self) -> int:
+        """Number of distinct keys waiting to be flushed."""
+        return sum(len(counts) for counts in self._pending.values())
+
+    async def flush(self, connection: oracledb.AsyncConnection) -> int:
+        """Apply pending hit counts to Oracle.
+
+        Increments that fail to apply are merged back into the buffer so the next
+        flush retries them.
+
+        Returns:
+            Number of cache rows updated
+        """
+        with self._lock:
+            batch = self._pending
+            self._pending = {table: Counter() for table in CACHE_TABLES}
+
+        updated = 0
+        try:
+            cursor = connection.cursor()
+            try:
+                for table, counts in batch.items():
+                    if not counts:
+                        continue
+                    await cursor.executemany(
+                        f"UPDATE {table} SET hit_count = hit_count + :hits WHERE cache_key = :cache_key",  # noqa: S608
+                        [{"hits": hits, "cache_key": cache_key} for cache_key, hits in counts.items()],
+                    )
+                    updated += len(counts)
+                await connection.commit()
+            finally:
+                cursor.close()
+        except Exception as e:  # noqa: BLE001
+            logger.warning("cache_hit_flush_error", error=str(e))
+            with self._lock:
+                for table, counts in batch.items():
+                    self._pending[table].update(counts)
+            return 0
+
+        if updated:
+            logger.debug("cache_hit_flush", rows=updated)
+        return updated
+
+
+# Process-wide buffer shared by EmbeddingCache and ResponseCacheService
+cache_hits = CacheHitBuffer()
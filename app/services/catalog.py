@@ -0,0 +1,209 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide, read-only snapshot of the product catalog."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from app.services.product_vectors import read_inventory_signature
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    import oracledb
+
+logger = structlog.get_logger()
+
+# Rows committed late can carry an updated_at slightly older than the high-water mark,
+# so incremental refreshes re-read a short overlap window (re-applying rows is idempotent)
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+_CATALOG_COLUMNS = """
+    p.id, p.name, p.current_price, p.description, p.company_id, c.name AS company_name,
+    GREATEST(p.updated_at, c.updated_at) AS changed_at
+"""
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable view of the catalog at one version.
+
+    ``products`` maps product ID to a read-only product mapping with the same keys as
+    ``ProductService.get_by_id`` (minus the embedding columns). ``inventory_signature``
+    identifies the inventory table state the snapshot was taken at.
+    """
+
+    version: int = 0
+    products: Mapping[int, Mapping[str, Any]] = field(default_factory=lambda: MappingProxyType({}))
+    inventory_signature: tuple | None = None
+    high_water: datetime | None = None
+    loaded_at: datetime | None = None
+
+
+class ProductCatalog:
+    """Holds the current ``CatalogSnapshot`` and refreshes it from Oracle.
+
+    Readers grab ``snapshot`` once and use it without locks; refreshes build a new
+    snapshot and swap it in. ``version`` increases only when product data actually
+    changes, so dependent caches can use it in their keys. Refreshes are incremental,
+    based on ``product.updated_at`` and ``company.updated_at`` (embedding writers bump
+    ``updated_at`` too); deletions are detected by comparing row counts and trigger a
+    full reload. Stocking changes also move ``version``, since shop-scoped search
+    results depend on them; the inventory is compared by its row count and latest
+    ``ORA_ROWSCN``, as ``ProductVectorIndex`` does.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot = CatalogSnapshot()
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """The current snapshot."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Version of the current snapshot (0 until the first load)."""
+        return self._snapshot.version
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the catalog has been loaded at least once."""
+        return self._snapshot.loaded_at is not None
+
+    def get(self, product_id: int) -> Mapping[str, Any] | None:
+        """Return a product from the current snapshot."""
+        return self._snapshot.products.get(product_id)
+
+    def get_many(self, product_ids: Iterable[int]) -> list[Mapping[str, Any]]:
+        """Return the known products among ``product_ids``, in the given order."""
+        products = self._snapshot.products
+        return [products[product_id] for product_id in product_ids if product_id in products]
+
+    async def load(self, connection: oracledb.AsyncConnection) -> CatalogSnapshot:
+        """Load the full catalog, replacing the current snapshot."""
+        cursor = connection.cursor()
+        try:
+            await cursor.execute(
+                f"SELECT {_CATALOG_COLUMNS} FROM product p JOIN company c ON p.company_id = c.id"  # noqa: S608
+            )
+            rows = await cursor.fetchall()
+            inventory_signature = await read_inventory_signature(cursor)
+        finally:
+            cursor.close()
+
+        products = dict(self._to_product(row) for row in rows)
+        changed = products != dict(self._snapshot.products) or inventory_signature != self._snapshot.inventory_signature
+        self._swap(
+            products,
+            inventory_signature=inventory_signature,
+            high_water=self._high_water(rows),
+            loaded_at=datetime.now(UTC),
+            changed=changed,
+        )
+        logger.info("product_catalog_loaded", products=len(products), version=self.version)
+        return self._snapshot
+
+    async def refresh(self, connection: oracledb.AsyncConnection) -> CatalogSnapshot:
+        """Apply product and company changes since the last load or refresh."""
+        current = self._snapshot
+        if current.high_water is None:
+            return await self.load(connection)
+
+        cursor = connection.cursor()
+        try:
+            await cursor.execute(
+                f"""
+                SELECT {_CATALOG_COLUMNS}
+                FROM product p JOIN company c ON p.company_id = c.id
+                WHERE p.updated_at > :since OR c.updated_at > :since
+                """,  # noqa: S608
+                {"since": current.high_water - _REFRESH_OVERLAP},
+            )
+            rows = await cursor.fetchall()
+            await cursor.execute("SELECT COUNT(*) FROM product")
+            (total,) = await cursor.fetchone()  # type: ignore[misc]
+            inventory_signature = await read_inventory_signature(cursor)
+        finally:
+            cursor.close()
+
+        products = dict(current.products)
+        changed = inventory_signature != current.inventory_signature
+        for row in rows:
+            product_id, product = self._to_product(row)
+            if products.get(product_id) != product:
+                products[product_id] = product
+                changed = True
+
+        if len(products) != total:
+            # Products were deleted (or rows were missed); start over from a full load
+            return await self.load(connection)
+
+        high_water = max(filter(None, (current.high_water, self._high_water(rows))))
+        self._swap(
+            products,
+            inventory_signature=inventory_signature,
+            high_water=high_water,
+            loaded_at=datetime.now(UTC),
+            changed=changed,
+        )
+        if changed:
+            logger.info("product_catalog_refreshed", changed=len(rows), version=self.version)
+        return self._snapshot
+
+    def _swap(
+        self,
+        products: dict[int, Mapping[str, Any]],
+        inventory_signature: tuple,
+        high_water: datetime | None,
+        loaded_at: datetime,
+        changed: bool,
+    ) -> None:
+        current = self._snapshot
+        self._snapshot = CatalogSnapshot(
+            version=current.version + 1 if changed or current.loaded_at is None else current.version,
+            products=MappingProxyType(products) if changed else current.products,
+            inventory_signature=inventory_signature,
+            high_water=high_water,
+            loaded_at=loaded_at,
+        )
+
+    @staticmethod
+    def _to_product(row: tuple) -> tuple[int, Mapping[str, Any]]:
+        return row[0], MappingProxyType(
+            {
+                "id": row[0],
+                "name": row[1],
+                "current_price": row[2],
+                "description": row[3],
+                "company_id": row[4],
+                "company_name": row[5],
+                "updated_at": row[6],
+            }
+        )
+
+    @staticmethod
+    def _high_water(rows: list[tuple]) -> datetime | None:
+        return max((row[6] for row in rows if row[6] is not None), default=None)
+
+
+# Process-wide catalog shared by every request in the worker
+product_catalog = ProductCatalog()
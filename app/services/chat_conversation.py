@@ -16,6 +16,7 @@
 
 from __future__ import annotations
 
+from datetime import UTC, datetime, timedelta
 from typing import Any
 from uuid import UUID
 
@@ -151,3 +152,32 @@ class ChatConversationService(BaseService):
                 }
                 async for row in cursor
             ]
+
+    async def cleanup_expired(self, retention_days: int, batch_size: int = 1000) -> int:
+        """Remove messages older than ``retention_days``, at most ``batch_size`` rows per transaction."""
+        return await self.delete_in_batches(
+            """
+            DELETE FROM chat_conversation
+            WHERE created_at < :cutoff AND ROWNUM <= :batch_size
+            """,
+            {"cutoff": datetime.now(UTC) - timedelta(days=retention_days)},
+            batch_size=batch_size,
+        )
+
+    async def get_frequent_user_messages(self, limit: int = 200, days: int = 30) -> list[tuple[str, int]]:
+        """Get the most frequent user messages of the last ``days`` days with their counts."""
+        since = datetime.now(UTC) - timedelta(days=days)
+        async with self.get_cursor() as cursor:
+            # CLOBs cannot be grouped on directly; messages are short, so group on their prefix
+            await cursor.execute(
+                """
+                SELECT DBMS_LOB.SUBSTR(content, 1000, 1) AS message, COUNT(*) AS frequency
+                FROM chat_conversation
+                WHERE role = 'user' AND created_at >= :since
+                GROUP BY DBMS_LOB.SUBSTR(content, 1000, 1)
+                ORDER BY frequency DESC
+                FETCH FIRST :limit ROWS ONLY
+                """,
+                {"since": since, "limit": limit},
+            )
+            return [(row[0], row[1]) async for row in cursor if row[0]]
@@ -8,7 +8,8 @@ Key differences from response_cache:
 - Used during vector similarity search to avoid re-computing embeddings for the same text
 - Optimized for mathematical operations and vector distance calculations
 - Has longer TTL (24 hours default) since embeddings are more expensive to generate
-- Uses two-tier caching (memory + Oracle) for maximum performance
+- Uses two-tier caching (process-wide memory + Oracle) for maximum performance, optionally
+  with a host-wide memory-mapped tier in between so worker processes share warm embeddings
 
 The response_cache stores:
 - Complete LLM responses as JSON
@@ -25,20 +26,93 @@ from __future__ import annotations
 
 import array
 import hashlib
+import time
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 import structlog
 
+from app.lib.cache import MemoryCache, SingleFlight, is_admissible_embedding
+from app.lib.canonical import get_query_canonicalizer
+from app.lib.settings import get_settings
+from app.lib.shared_cache import SharedVectorCache
+from app.lib.telemetry import CacheTelemetry, elapsed_ms
 from app.services.base import BaseService
+from app.services.cache_hits import cache_hits
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
     import oracledb
 
     from app.services.vertex_ai import VertexAIService
 
 logger = structlog.get_logger()
 
+# Live per-tier counters and latencies for the embedding cache hierarchy (see /api/metrics/cache)
+embedding_telemetry = CacheTelemetry(
+    "embedding",
+    tiers=("memory", "shared", "inflight", "negative", "oracle"),
+    origin="generation",
+    fallback=("negative",),
+)
+
+# Oracle allows at most 1000 expressions in an IN list
+_IN_LIST_LIMIT = 500
+
+# In-flight Oracle lookups / Vertex AI calls keyed by cache key, shared by all requests in the process
+_inflight_embeddings: SingleFlight[tuple[list[float], bool]] = SingleFlight()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_memory_cache() -> MemoryCache[array.array]:
+    """Return the process-wide memory tier shared by every ``EmbeddingCache`` instance.
+
+    Vectors are held as float32 ``array.array`` values (the same precision Oracle stores)
+    so the byte budget reflects the real payload size.
+    """
+    settings = get_settings()
+    return MemoryCache(
+        name="embedding",
+        max_entries=settings.cache.EMBEDDING_MEMORY_MAX_ENTRIES,
+        max_bytes=settings.cache.EMBEDDING_MEMORY_MAX_BYTES,
+        ttl_seconds=settings.cache.EMBEDDING_TTL_HOURS * 3600,
+        sizeof=lambda vector: vector.itemsize * len(vector),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embedding_negative_cache() -> MemoryCache[bool]:
+    """Return the process-wide negative cache of texts whose embedding recently failed.
+
+    Entries live for a short TTL so a failing text is not retried against Vertex AI on
+    every request, while the real embedding is fetched again soon after recovery.
+    """
+    settings = get_settings()
+    return MemoryCache(
+        name="embedding_negative",
+        max_entries=settings.cache.EMBEDDING_MEMORY_MAX_ENTRIES,
+        ttl_seconds=settings.cache.EMBEDDING_NEGATIVE_TTL_SECONDS,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_shared_embedding_cache() -> SharedVectorCache | None:
+    """Return the host-wide embedding tier, or ``None`` when it is not configured.
+
+    Every worker process maps the same file, so an embedding fetched by one worker
+    is served to the others without an Oracle read or Vertex AI call.
+    """
+    settings = get_settings()
+    if not settings.cache.EMBEDDING_SHARED_PATH:
+        return None
+    try:
+        return SharedVectorCache(settings.cache.EMBEDDING_SHARED_PATH, slots=settings.cache.EMBEDDING_SHARED_SLOTS)
+    except OSError as e:
+        logger.warning("shared_embedding_cache_unavailable", path=settings.cache.EMBEDDING_SHARED_PATH, error=str(e))
+        return None
+
 
 class EmbeddingCache(BaseService):
     """Oracle-based cache for embedding vectors using dedicated embedding_cache table with VECTOR type.
@@ -48,10 +122,15 @@ class EmbeddingCache(BaseService):
     performance and uses Oracle 23AI's native VECTOR data type for efficient storage and retrieval.
 
     Cache Flow:
-    1. Check in-memory cache first (fastest)
-    2. Check Oracle embedding_cache table if memory miss
-    3. Generate new embedding via Vertex AI if both miss
-    4. Store in both memory and Oracle for future use
+    1. Check the process-wide in-memory tier first (fastest, survives across requests)
+    2. Check the host-wide shared memory tier, if configured (shared by all workers)
+    3. Check Oracle embedding_cache table if memory miss
+    4. Generate new embedding via Vertex AI if all miss
+    5. Store in memory, shared memory and Oracle for future use
+
+    Only admissible embeddings are cached (see ``is_admissible_embedding``). When Vertex AI
+    returns its zero fallback, the text goes into a short-lived negative cache instead, so
+    an outage neither poisons the cache for 24 hours nor costs a Vertex call per request.
 
     This is distinct from ResponseCacheService which caches complete LLM responses.
     """
@@ -65,25 +144,73 @@ class EmbeddingCache(BaseService):
         """
         super().__init__(connection)
         self.ttl_hours = ttl_hours
-        # Memory cache for current session
-        self._memory_cache: dict[str, list[float]] = {}
+        # Memory tier shared by all requests in this worker process
+        self._memory_cache = get_embedding_memory_cache()
+        # Optional tier shared by all worker processes on the host
+        self._shared_cache = get_shared_embedding_cache()
+        # Texts whose embedding recently failed, answered with the fallback until they expire
+        self._negative_cache = get_embedding_negative_cache()
 
     def _normalize_query(self, query: str) -> str:
-        """Normalize query for consistent caching."""
-        return query.lower().strip()
+        """Canonicalize query so equivalent phrasings share one cache entry."""
+        return get_query_canonicalizer()(query)
 
     def _cache_key(self, query: str) -> str:
         """Generate cache key for query."""
         normalized = self._normalize_query(query)
         return f"embedding:{hashlib.md5(normalized.encode(), usedforsecurity=False).hexdigest()}"
 
-    def _get_from_memory(self, normalized_query: str) -> list[float] | None:
-        """Memory cache layer for current session."""
-        return self._memory_cache.get(normalized_query)
+    def _get_from_memory(self, cache_key: str) -> list[float] | None:
+        """Process-wide memory cache layer."""
+        cached = self._memory_cache.get(cache_key)
+        return cached.tolist() if cached is not None else None
 
-    def _set_in_memory(self, normalized_query: str, embedding: list[float]) -> None:
-        """Store in memory cache."""
-        self._memory_cache[normalized_query] = embedding
+    def _set_in_memory(self, cache_key: str, embedding: list[float], ttl_seconds: float | None = None) -> None:
+        """Store in the process-wide memory cache.
+
+        Args:
+            cache_key: Cache key for the query
+            embedding: Embedding vector to store
+            ttl_seconds: Remaining lifetime of the entry; defaults to ``ttl_hours``
+        """
+        self._memory_cache.set(
+            cache_key,
+            array.array("f", embedding),
+            ttl_seconds=self.ttl_hours * 3600 if ttl_seconds is None else ttl_seconds,
+        )
+
+    def _get_from_shared(self, cache_key: str) -> list[float] | None:
+        """Host-wide shared memory layer; promotes hits into the process memory tier."""
+        if self._shared_cache is None:
+            return None
+        entry = self._shared_cache.get(self._shared_key(cache_key), read=self._copy_shared_vector)
+        if entry is None:
+            return None
+        vector, expires_at = entry
+        self._memory_cache.set(cache_key, vector, ttl_seconds=expires_at - time.time())
+        return vector.tolist()
+
+    @staticmethod
+    def _copy_shared_vector(payload: memoryview) -> array.array:
+        """Copy a shared-memory float32 payload straight into the memory tier's format."""
+        vector = array.array("f")
+        vector.frombytes(payload)
+        return vector
+
+    def _set_in_shared(self, cache_key: str, embedding: list[float], ttl_seconds: float | None = None) -> None:
+        """Store in the host-wide shared memory tier, if configured."""
+        if self._shared_cache is None:
+            return
+        ttl = self.ttl_hours * 3600 if ttl_seconds is None else ttl_seconds
+        try:
+            self._shared_cache.set(self._shared_key(cache_key), embedding, expires_at=time.time() + ttl)
+        except OSError as e:
+            logger.warning("shared_embedding_cache_write_error", error=str(e))
+
+    @staticmethod
+    def _shared_key(cache_key: str) -> bytes:
+        """16-byte digest of a cache key, as stored in the shared tier's slots."""
+        return bytes.fromhex(cache_key.removeprefix("embedding:"))
 
     async def get_embedding(self, query: str, vertex_ai_service: VertexAIService) -> tuple[list[float], bool]:
         """Get embedding with two-tier caching (memory + Oracle).
@@ -102,27 +229,206 @@ class EmbeddingCache(BaseService):
             - cache_hit_flag: True if found in cache, False if generated new
 
         Cache Strategy:
-        - Memory cache: Fastest lookup for current session
+        - Memory cache: Fastest lookup, shared by all requests in the worker process
         - Oracle cache: Persistent across sessions, uses native VECTOR type
         - Vertex AI: Fallback for cache misses, most expensive operation
+
+        Concurrent callers missing the memory tier for the same query are coalesced,
+        so a burst of identical queries costs one Oracle read, one Vertex AI call and one write.
+        Coalesced callers get the leader's ``cache_hit`` flag, so a zero-vector fallback
+        still reads as a miss for every caller that shared it.
         """
-        # Normalize query
-        normalized = self._normalize_query(query)
+        cache_key = self._cache_key(query)
+        cached = self._get_from_host(cache_key, query)
+        if cached is not None:
+            return cached
+
+        # Concurrent misses for the same query share one Oracle lookup and one Vertex AI call
+        started = time.perf_counter()
+        (embedding, cache_hit), shared = await _inflight_embeddings.do(
+            cache_key,
+            lambda: self._get_from_oracle_or_generate(cache_key, query, vertex_ai_service),
+        )
+        if shared:
+            # Followers report what the leader got, so a zero fallback is never counted as a hit
+            admissible = is_admissible_embedding(embedding)
+            embedding_telemetry.record("inflight", admissible, elapsed_ms(started))
+            if admissible:
+                logger.debug("embedding_cache_hit", layer="inflight", query=query[:50])
+            return list(embedding), cache_hit
+        return embedding, cache_hit
+
+    async def get_embeddings(
+        self, queries: Sequence[str], vertex_ai_service: VertexAIService
+    ) -> list[tuple[list[float], bool]]:
+        """Batched ``get_embedding``: one Oracle read and one batched Vertex AI call per batch.
+
+        In-process and host tiers are checked per query; the remaining queries are looked
+        up in Oracle with a single statement, and whatever is still missing is embedded
+        with ``VertexAIService.create_embeddings`` and written back with one ``executemany``.
+        Duplicate queries (after canonicalization) are embedded once.
 
+        Returns:
+            ``(embedding, cache_hit)`` per query, in input order
+        """
+        keys = [self._cache_key(query) for query in queries]
+        found: dict[str, tuple[list[float], bool]] = {}
+        pending: dict[str, str] = {}
+        for cache_key, query in zip(keys, queries, strict=True):
+            if cache_key in found or cache_key in pending:
+                continue
+            cached = self._get_from_host(cache_key, query)
+            if cached is not None:
+                found[cache_key] = cached
+            else:
+                pending[cache_key] = query
+
+        if pending:
+            started = time.perf_counter()
+            stored = await self._get_many_from_oracle(list(pending))
+            duration_ms = elapsed_ms(started)
+            # One record per key, like the generation tier, so hit ratios compare per query
+            for cache_key in pending:
+                embedding_telemetry.record("oracle", cache_key in stored, duration_ms)
+            for cache_key, embedding in stored.items():
+                found[cache_key] = (embedding, True)
+                del pending[cache_key]
+
+        if pending:
+            started = time.perf_counter()
+            generated = await vertex_ai_service.create_embeddings(list(pending.values()))
+            duration_ms = elapsed_ms(started)
+            fresh = []
+            for (cache_key, query), embedding in zip(pending.items(), generated, strict=True):
+                found[cache_key] = (embedding, False)
+                admissible = is_admissible_embedding(embedding)
+                embedding_telemetry.record("generation", admissible, duration_ms)
+                if not admissible:
+                    self._negative_cache.set(cache_key, True)
+                    continue
+                self._set_in_memory(cache_key, embedding)
+                self._set_in_shared(cache_key, embedding)
+                fresh.append((cache_key, query, embedding))
+            await self._store_many_in_oracle(fresh)
+
+        return [found[cache_key] for cache_key in keys]
+
+    def _get_from_host(self, cache_key: str, query: str) -> tuple[list[float], bool] | None:
+        """Look ``cache_key`` up in the memory, shared and negative tiers."""
         # Try memory cache first
-        cached = self._get_from_memory(normalized)
+        started = time.perf_counter()
+        cached = self._get_from_memory(cache_key)
+        embedding_telemetry.record("memory", cached is not None, elapsed_ms(started))
         if cached is not None:
             logger.debug("embedding_cache_hit", layer="memory", query=query[:50])
             return cached, True
 
+        # Then the tier shared with the other workers on this host
+        if self._shared_cache is not None:
+            started = time.perf_counter()
+            cached = self._get_from_shared(cache_key)
+            embedding_telemetry.record("shared", cached is not None, elapsed_ms(started))
+            if cached is not None:
+                logger.debug("embedding_cache_hit", layer="shared", query=query[:50])
+                return cached, True
+
+        # Recently failed texts fail fast instead of calling Vertex AI again
+        if self._negative_cache.get(cache_key):
+            embedding_telemetry.record("negative", True, 0.0)
+            logger.debug("embedding_cache_hit", layer="negative", query=query[:50])
+            return [0.0] * 768, False
+        return None
+
+    async def _get_many_from_oracle(self, cache_keys: list[str]) -> dict[str, list[float]]:
+        """Read unexpired, admissible Oracle entries for ``cache_keys`` and warm the memory tiers."""
+        found: dict[str, list[float]] = {}
+        try:
+            async with self.get_cursor() as cursor:
+                for start in range(0, len(cache_keys), _IN_LIST_LIMIT):
+                    chunk = cache_keys[start : start + _IN_LIST_LIMIT]
+                    binds = ", ".join(f":k{i}" for i in range(len(chunk)))
+                    await cursor.execute(
+                        f"""
+                        SELECT cache_key, embedding, expires_at
+                        FROM embedding_cache
+                        WHERE cache_key IN ({binds})
+                          AND expires_at > CURRENT_TIMESTAMP
+                        """,  # noqa: S608
+                        {f"k{i}": cache_key for i, cache_key in enumerate(chunk)},
+                    )
+                    async for cache_key, value, expires_at in cursor:
+                        embedding = self._to_list(value)
+                        if embedding is None or not is_admissible_embedding(embedding):
+                            continue
+                        cache_hits.record("embedding_cache", cache_key)
+                        remaining = self._remaining_ttl(expires_at)
+                        self._set_in_memory(cache_key, embedding, ttl_seconds=remaining)
+                        self._set_in_shared(cache_key, embedding, ttl_seconds=remaining)
+                        found[cache_key] = embedding
+        except Exception as e:  # noqa: BLE001
+            logger.warning("oracle_cache_read_error", error=str(e))
+        return found
+
+    async def _store_many_in_oracle(self, entries: list[tuple[str, str, list[float]]]) -> None:
+        """Upsert ``(cache_key, query, embedding)`` rows in one round trip."""
+        if not entries:
+            return
+        expires_at = datetime.now(UTC) + timedelta(hours=self.ttl_hours)
+        try:
+            async with self.get_cursor() as cursor:
+                await cursor.executemany(
+                    """
+                    MERGE INTO embedding_cache ec
+                    USING (SELECT :cache_key AS cache_key FROM dual) src
+                    ON (ec.cache_key = src.cache_key)
+                    WHEN MATCHED THEN
+                        UPDATE SET
+                            query_text = :query_text,
+                            embedding = :embedding,
+                            expires_at = :expires_at,
+                            hit_count = 0
+                    WHEN NOT MATCHED THEN
+                        INSERT (cache_key, query_text, embedding, expires_at, hit_count)
+                        VALUES (:cache_key, :query_text, :embedding, :expires_at, 0)
+                    """,
+                    [
+                        {
+                            "cache_key": cache_key,
+                            "query_text": query,
+                            "embedding": array.array("f", embedding),
+                            "expires_at": expires_at,
+                        }
+                        for cache_key, query, embedding in entries
+                    ],
+                )
+                await self.connection.commit()
+        except Exception as e:  # noqa: BLE001
+            logger.warning("oracle_cache_write_error", error=str(e), entries=len(entries))
+
+    @staticmethod
+    def _to_list(value: object) -> list[float] | None:
+        """Convert an Oracle VECTOR value to a list of floats."""
+        if value is None:
+            return None
+        if isinstance(value, array.array):
+            return value.tolist()  # type: ignore[return-value]
+        if hasattr(value, "to_array"):
+            return value.to_array().tolist()
+        # Fallback: assume it's already a list and convert to floats
+        return [float(x) for x in value]  # type: ignore[attr-defined]
+
+    async def _get_from_oracle_or_generate(
+        self, cache_key: str, query: str, vertex_ai_service: VertexAIService
+    ) -> tuple[list[float], bool]:
+        """Oracle tier lookup with Vertex AI fallback, run once per in-flight cache key."""
         # Try Oracle cache
-        cache_key = self._cache_key(query)
+        started = time.perf_counter()
         try:
             async with self.get_cursor() as cursor:
                 # Check cache with non-expired entries
                 await cursor.execute(
                     """
-                    SELECT embedding
+                    SELECT embedding, expires_at
                     FROM embedding_cache
                     WHERE cache_key = :cache_key
                       AND expires_at > CURRENT_TIMESTAMP
@@ -132,48 +438,58 @@ class EmbeddingCache(BaseService):
 
                 result = await cursor.fetchone()
                 if result:
-                    # Update hit count
-                    await cursor.execute(
-                        """
-                        UPDATE embedding_cache
-                        SET hit_count = hit_count + 1
-                        WHERE cache_key = :cache_key
-                    """,
-                        {"cache_key": cache_key},
-                    )
-                    await self.connection.commit()
+                    # Hit counts are written behind in batches to keep hits read-only
+                    cache_hits.record("embedding_cache", cache_key)
 
                     # Convert Oracle VECTOR to Python list
-                    if result[0] is not None:
-                        embedding: list[float]
-                        if isinstance(result[0], array.array):
-                            embedding = result[0].tolist()  # type: ignore[assignment]
-                        elif hasattr(result[0], "to_array"):
-                            embedding = result[0].to_array().tolist()
+                    embedding = self._to_list(result[0])
+                    if embedding is not None:
+                        if not is_admissible_embedding(embedding):
+                            # Written before the admission policy existed; regenerate it below
+                            logger.warning("embedding_cache_rejected", layer="oracle", query=query[:50])
                         else:
-                            # Fallback: assume it's already a list and convert to floats
-                            embedding = [float(x) for x in result[0]]
-
-                        # Store in memory cache
-                        self._set_in_memory(normalized, embedding)
-                        logger.debug("embedding_cache_hit", layer="oracle", query=query[:50])
-                        return embedding, True
+                            # Store in memory caches for the rest of the Oracle entry's lifetime
+                            remaining = self._remaining_ttl(result[1])
+                            self._set_in_memory(cache_key, embedding, ttl_seconds=remaining)
+                            self._set_in_shared(cache_key, embedding, ttl_seconds=remaining)
+                            embedding_telemetry.record("oracle", True, elapsed_ms(started))
+                            logger.debug("embedding_cache_hit", layer="oracle", query=query[:50])
+                            return embedding, True
 
         except Exception as e:  # noqa: BLE001
             logger.warning("oracle_cache_read_error", error=str(e))
+        embedding_telemetry.record("oracle", False, elapsed_ms(started))
 
         # Compute embedding
         logger.debug("embedding_cache_miss", query=query[:50])
+        started = time.perf_counter()
         embedding = await vertex_ai_service.create_embedding(query)
+        admissible = is_admissible_embedding(embedding)
+        embedding_telemetry.record("generation", admissible, elapsed_ms(started))
+        if not admissible:
+            logger.warning("embedding_cache_rejected", layer="vertex_ai", query=query[:50])
+            self._negative_cache.set(cache_key, True)
+            return embedding, False
 
-        # Store in memory cache
-        self._set_in_memory(normalized, embedding)
+        # Store in memory caches
+        self._set_in_memory(cache_key, embedding)
+        self._set_in_shared(cache_key, embedding)
 
         # Store in Oracle cache
         await self._store_in_oracle(cache_key, query, embedding)
 
         return embedding, False
 
+    @staticmethod
+    def _remaining_ttl(expires_at: datetime | None) -> float | None:
+        """Seconds until an Oracle entry expires, or ``None`` if unknown."""
+        if expires_at is None:
+            return None
+        if expires_at.tzinfo is None:
+            # Oracle TIMESTAMP WITH TIME ZONE might come back as naive datetime
+            expires_at = expires_at.replace(tzinfo=UTC)
+        return (expires_at - datetime.now(UTC)).total_seconds()
+
     async def _store_in_oracle(self, cache_key: str, query: str, embedding: list[float]) -> None:
         """Store embedding in Oracle cache using native VECTOR type.
 
@@ -229,23 +545,22 @@ class EmbeddingCache(BaseService):
         except Exception as e:  # noqa: BLE001
             logger.warning("oracle_cache_write_error", error=str(e))
 
-    async def clear_expired(self) -> int:
+    async def clear_expired(self, batch_size: int = 1000) -> int:
         """Clear expired cache entries from Oracle embedding_cache table.
 
         This maintenance operation removes embeddings that have exceeded their TTL,
         helping to keep the cache size manageable and ensure data freshness.
+        Rows are deleted in transactions of at most ``batch_size`` rows.
 
         Returns:
             Number of embedding cache entries cleared
         """
-        async with self.get_cursor() as cursor:
-            await cursor.execute("""
-                DELETE FROM embedding_cache
-                WHERE expires_at < CURRENT_TIMESTAMP
-            """)
-
-            deleted = cursor.rowcount
-            await self.connection.commit()
-
-            logger.info("embedding_cache_cleanup", deleted=deleted)
-            return deleted
+        deleted = await self.delete_in_batches(
+            """
+            DELETE FROM embedding_cache
+            WHERE expires_at < CURRENT_TIMESTAMP AND ROWNUM <= :batch_size
+            """,
+            batch_size=batch_size,
+        )
+        logger.info("embedding_cache_cleanup", deleted=deleted)
+        return deleted
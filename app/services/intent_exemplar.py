@@ -127,7 +127,7 @@ class IntentExemplarService(BaseService):
 
                     if not result or not result[0]:
                         # Generate embedding
-                        embedding = await vertex_ai_service.create_embedding(phrase)
+                        embedding = await vertex_ai_service.create_embedding_stored(phrase)
                         await self.cache_exemplar(intent, phrase, embedding)
                         count += 1
 
@@ -8,6 +8,8 @@ from typing import TYPE_CHECKING
 import structlog
 
 from app.config import INTENT_THRESHOLDS, VECTOR_SEARCH_CONFIG
+from app.lib.settings import get_settings
+from app.lib.vector_index import fetch_first
 from app.services.base import BaseService
 
 if TYPE_CHECKING:
@@ -163,38 +165,52 @@ class IntentRouter(BaseService):
         super().__init__(connection)
         self.vertex_ai = vertex_ai_service
         self.cache = embedding_cache
+        # Embedding of the last routed query, reused downstream (e.g. semantic response cache)
+        self.last_query_embedding: list[float] | None = None
 
-    async def route_intent(self, query: str) -> tuple[list[tuple[str, float, str]], bool]:
+    async def route_intent(
+        self, query: str, fetch_mode: str | None = None, target_accuracy: int | None = None
+    ) -> tuple[list[tuple[str, float, str]], bool]:
         """Route intent using Oracle's native vector similarity search.
 
         Args:
             query: User's input query
+            fetch_mode: ``approx`` (use idx_intent_exemplar_embedding) or ``exact``; defaults to ``VECTOR_FETCH_MODE``
+            target_accuracy: Approximate search accuracy in percent; defaults to ``VECTOR_TARGET_ACCURACY``
 
         Returns:
             Tuple of (results, embedding_cache_hit) where results is a list of tuples (intent, confidence_score, matched_phrase)
         """
+        search_settings = get_settings().search
+        fetch = fetch_first(
+            fetch_mode or search_settings.FETCH_MODE,
+            search_settings.TARGET_ACCURACY if target_accuracy is None else target_accuracy,
+            limit=":top_k",
+        )
+
         # Get embedding (with caching if available)
         embedding_cache_hit = False
         if self.cache:
             query_embedding, embedding_cache_hit = await self.cache.get_embedding(query, self.vertex_ai)
         else:
             query_embedding = await self.vertex_ai.create_embedding(query)
+        self.last_query_embedding = query_embedding
 
         oracle_vector = array.array("f", query_embedding)
 
-        # Execute pure vector similarity search
+        # Execute pure vector similarity search; APPROX needs ORDER BY VECTOR_DISTANCE to use the index
         async with self.get_cursor() as cursor:
             await cursor.execute(
-                """
+                f"""
                 SELECT
                     intent,
                     phrase,
                     1 - VECTOR_DISTANCE(embedding, :query_embedding, COSINE) AS similarity_score
                 FROM intent_exemplar
                 WHERE 1 - VECTOR_DISTANCE(embedding, :query_embedding, COSINE) > :min_threshold
-                ORDER BY similarity_score DESC
-                FETCH FIRST :top_k ROWS ONLY
-                """,
+                ORDER BY VECTOR_DISTANCE(embedding, :query_embedding, COSINE)
+                {fetch}
+                """,  # noqa: S608
                 {
                     "query_embedding": oracle_vector,
                     "min_threshold": VECTOR_SEARCH_CONFIG["min_vector_threshold"],
@@ -0,0 +1,157 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-app scheduler for periodic maintenance jobs."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import socket
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import msgspec
+import oracledb
+import structlog
+
+from app.services.base import BaseService
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+
+logger = structlog.get_logger()
+
+
+class JobLeaseService(BaseService):
+    """Time-bound job leases stored in ``app_config`` so one worker runs each exclusive job."""
+
+    async def try_acquire(self, job_name: str, holder: str, ttl_seconds: float) -> bool:
+        """Take or renew the lease for ``job_name``.
+
+        Succeeds if nobody holds the lease, ``holder`` already holds it, or the current
+        lease has expired.
+        """
+        key = f"job_lease:{job_name}"
+        value = msgspec.json.encode({"holder": holder, "expires_at": time.time() + ttl_seconds}).decode("utf-8")
+        try:
+            async with self.get_cursor() as cursor:
+                await cursor.execute(
+                    """
+                    MERGE INTO app_config ac
+                    USING (SELECT :key AS key FROM dual) src
+                    ON (ac.key = src.key)
+                    WHEN MATCHED THEN
+                        UPDATE SET value = :value
+                        WHERE JSON_VALUE(ac.value, '$.holder') = :holder
+                           OR JSON_VALUE(ac.value, '$.expires_at' RETURNING NUMBER) < :now
+                    WHEN NOT MATCHED THEN
+                        INSERT (key, value, description)
+                        VALUES (:key2, :value2, 'Maintenance job lease')
+                    """,
+                    {
+                        "key": key,
+                        "key2": key,
+                        "value": value,
+                        "value2": value,
+                        "holder": holder,
+                        "now": time.time(),
+                    },
+                )
+                acquired = cursor.rowcount > 0
+                await self.connection.commit()
+        except oracledb.IntegrityError:
+            # Another worker inserted the lease first
+            await self.connection.rollback()
+            return False
+        return acquired
+
+
+@dataclass(frozen=True)
+class ScheduledJob:
+    """A periodic job run by ``MaintenanceScheduler``."""
+
+    name: str
+    """Job name, used in logs and as the lease key."""
+    interval: float
+    """Seconds between runs (before jitter)."""
+    run: Callable[[], Awaitable[Any]]
+    """Coroutine factory doing the work; it acquires its own connections."""
+    exclusive: bool = False
+    """Run on a single worker at a time (database-wide work) rather than in every worker."""
+
+
+class MaintenanceScheduler:
+    """Run ``ScheduledJob``s periodically in the background of each worker.
+
+    Every run is delayed by the job interval plus or minus ``jitter`` (a fraction of the
+    interval) so workers started together do not hit Oracle in lockstep. Exclusive jobs
+    first take a lease slightly shorter than their interval; only the holder runs them.
+    Failures are logged and the job is retried at its next tick.
+    """
+
+    def __init__(
+        self,
+        jobs: Sequence[ScheduledJob],
+        lease: Callable[[str, str, float], Awaitable[bool]],
+        jitter: float = 0.1,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            jobs: Jobs to run
+            lease: Coroutine taking (job name, holder, TTL seconds) and returning whether the lease was acquired
+            jitter: Random spread applied to each interval, as a fraction of it
+        """
+        self.jobs = tuple(jobs)
+        self.jitter = jitter
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._lease = lease
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start one background task per job."""
+        self._tasks = [asyncio.create_task(self._run_job(job), name=f"maintenance:{job.name}") for job in self.jobs]
+
+    async def stop(self) -> None:
+        """Cancel the job tasks and wait for them to finish."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_once(self, job: ScheduledJob) -> bool:
+        """Run ``job`` now, honouring its lease. Returns whether it ran."""
+        if job.exclusive and not await self._lease(job.name, self.holder, job.interval * (1 - self.jitter)):
+            logger.debug("maintenance_job_skipped", job=job.name, reason="lease_held")
+            return False
+        started = time.perf_counter()
+        result = await job.run()
+        logger.debug(
+            "maintenance_job_completed",
+            job=job.name,
+            result=result,
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+        return True
+
+    async def _run_job(self, job: ScheduledJob) -> None:
+        while True:
+            await asyncio.sleep(job.interval * (1 + random.uniform(-self.jitter, self.jitter)))  # noqa: S311
+            try:
+                await self.run_once(job)
+            except Exception:
+                logger.exception("maintenance_job_error", job=job.name)
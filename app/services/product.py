@@ -6,6 +6,8 @@ import array
 from typing import Any
 
 from app.services.base import BaseService
+from app.services.product_vectors import product_vector_index, read_indexed_product, reduced_embedding
+from app.services.vector_results import vector_result_cache
 
 
 class ProductService(BaseService):
@@ -253,14 +255,25 @@ class ProductService(BaseService):
                 """
                 UPDATE product
                 SET embedding = :embedding,
-                    embedding_generated_on = SYSTIMESTAMP
+                    embedding_reduced = :embedding_reduced,
+                    embedding_generated_on = SYSTIMESTAMP,
+                    updated_at = SYSTIMESTAMP
                 WHERE id = :id
             """,
-                {"id": product_id, "embedding": oracle_vector},
+                {"id": product_id, "embedding": oracle_vector, "embedding_reduced": reduced_embedding(embedding)},
             )
 
             await self.connection.commit()
-            return cursor.rowcount > 0
+            updated = cursor.rowcount > 0
+            product = None
+            if updated and product_vector_index.loaded and product_id not in product_vector_index.snapshot.products:
+                # First embedding of this product: the index also needs its columns
+                product = await read_indexed_product(cursor, product_id)
+        if updated:
+            # File the new vector in this worker's local index right away
+            product_vector_index.upsert(product_id, embedding, product)
+            vector_result_cache.invalidate("embedding_updated")
+        return updated
 
     async def create_product(
         self,
@@ -279,9 +292,10 @@ class ProductService(BaseService):
             await cursor.execute(
                 """
                 INSERT INTO product (
-                    company_id, name, current_price, description, embedding, embedding_generated_on
+                    company_id, name, current_price, description, embedding, embedding_reduced,
+                    embedding_generated_on
                 ) VALUES (
-                    :company_id, :name, :current_price, :description, :embedding,
+                    :company_id, :name, :current_price, :description, :embedding, :embedding_reduced,
                     CASE WHEN :embedding2 IS NOT NULL THEN SYSTIMESTAMP ELSE NULL END
                 )
                 RETURNING id INTO :id
@@ -293,12 +307,15 @@ class ProductService(BaseService):
                     "description": description,
                     "embedding": oracle_vector,
                     "embedding2": oracle_vector,
+                    "embedding_reduced": reduced_embedding(embedding),
                     "id": cursor.var(int),
                 },
             )
 
             product_id = cursor.bindvars["id"].getvalue()  # type: ignore[call-overload]
             await self.connection.commit()
+            if oracle_vector is not None:
+                vector_result_cache.invalidate("product_created")
 
             # Return the created product
             return await self.get_by_id(product_id)
@@ -324,12 +341,16 @@ class ProductService(BaseService):
             if not set_clauses:
                 return await self.get_by_id(product_id)
 
+            # updated_at only defaults on NULL, so bump it explicitly for catalog change detection
+            set_clauses.append("updated_at = SYSTIMESTAMP")
             sql = f"UPDATE product SET {', '.join(set_clauses)} WHERE id = :id"  # noqa: S608
 
             await cursor.execute(sql, params)
             await self.connection.commit()
 
             if cursor.rowcount > 0:
+                # Cached search results carry the product columns
+                vector_result_cache.invalidate("product_updated")
                 return await self.get_by_id(product_id)
             return None
 
@@ -338,4 +359,9 @@ class ProductService(BaseService):
         async with self.get_cursor() as cursor:
             await cursor.execute("DELETE FROM product WHERE id = :id", {"id": product_id})
             await self.connection.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        if deleted:
+            # Stop returning the product from this worker's local index right away
+            product_vector_index.remove(product_id)
+            vector_result_cache.invalidate("product_deleted")
+        return deleted
@@ -0,0 +1,540 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide in-memory copy of the product embeddings for local vector search."""
+
+from __future__ import annotations
+
+import array
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from datetime import UTC, datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import structlog
+
+from app.lib.keyword_index import DEFAULT_RRF_K, KeywordIndex, reciprocal_rank_fusion
+from app.lib.settings import get_settings
+from app.lib.vector_index import ExactVectorIndex, IVFVectorIndex, truncate_dimensions
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+    import oracledb
+
+logger = structlog.get_logger()
+
+# Optional product and company columns search results can carry, by SQL expression
+# over ``product p JOIN company c``
+PRODUCT_PROJECTION: Mapping[str, str] = MappingProxyType(
+    {
+        "current_price": "p.current_price",
+        "company_id": "p.company_id",
+        "company_name": "c.name",
+    }
+)
+
+_PROJECTION_SELECT = ", ".join(f"{expression} AS {column}" for column, expression in PRODUCT_PROJECTION.items())
+
+# Retrain IVF centroids once the catalog has grown this much beyond the training set
+_RETRAIN_GROWTH = 2.0
+
+
+async def read_product_signature(cursor: oracledb.AsyncCursor) -> tuple:
+    """Embedded product count and latest change SCN; changes whenever any product row does."""
+    await cursor.execute("SELECT COUNT(p.embedding), MAX(ORA_ROWSCN) FROM product p")
+    row = await cursor.fetchone()
+    return tuple(row) if row else ()
+
+
+async def read_indexed_product(cursor: oracledb.AsyncCursor, product_id: int) -> Mapping[str, Any] | None:
+    """Read the columns the index keeps for ``product_id``, for ``ProductVectorIndex.upsert``."""
+    await cursor.execute(
+        f"""
+        SELECT p.id, p.name, p.description, {_PROJECTION_SELECT}
+        FROM product p
+        JOIN company c ON c.id = p.company_id
+        WHERE p.id = :id
+        """,  # noqa: S608
+        {"id": product_id},
+    )
+    row = await cursor.fetchone()
+    return _indexed_product(row) if row else None
+
+
+def _indexed_product(row: Sequence[Any]) -> Mapping[str, Any]:
+    """Product mapping from a ``p.id, p.name, p.description, <projection>`` row."""
+    return MappingProxyType(
+        {
+            "id": row[0],
+            "name": row[1],
+            "description": row[2],
+            **dict(zip(PRODUCT_PROJECTION, row[3:], strict=False)),
+        }
+    )
+
+
+async def read_inventory_signature(cursor: oracledb.AsyncCursor) -> tuple:
+    """Inventory row count and latest change SCN; changes whenever any inventory row does."""
+    await cursor.execute("SELECT COUNT(*), MAX(ORA_ROWSCN) FROM inventory")
+    row = await cursor.fetchone()
+    return tuple(row) if row else ()
+
+
+def reduced_embedding(embedding: Sequence[float] | None) -> array.array | None:
+    """Bind value for ``product.embedding_reduced``: ``embedding`` truncated to ``VECTOR_REDUCED_DIMENSIONS``.
+
+    ``None`` (SQL NULL) when reduced-dimension search is off or there is no embedding.
+    """
+    dimensions = get_settings().search.REDUCED_DIMENSIONS
+    if not dimensions or not embedding:
+        return None
+    return array.array("f", truncate_dimensions(embedding, dimensions).tolist())
+
+
+@dataclass(frozen=True)
+class ProductVectorSnapshot:
+    """Immutable search index over the product embeddings at one version.
+
+    ``products`` maps product ID to the columns returned alongside search results and
+    ``keywords`` indexes their names and descriptions for hybrid search. ``shops`` maps
+    shop ID to the products it stocks, and ``shop_masks`` holds the same sets as row
+    bitmaps over ``index``. ``signature`` and ``inventory_signature`` identify the
+    product and inventory table states the snapshot was built from.
+    """
+
+    version: int = 0
+    index: ExactVectorIndex | IVFVectorIndex = field(default_factory=lambda: ExactVectorIndex([], np.empty((0, 0))))
+    keywords: KeywordIndex = field(default_factory=lambda: KeywordIndex({}))
+    products: Mapping[int, Mapping[str, Any]] = field(default_factory=lambda: MappingProxyType({}))
+    shops: Mapping[int, frozenset[int]] = field(default_factory=lambda: MappingProxyType({}))
+    shop_masks: Mapping[int, np.ndarray] = field(default_factory=lambda: MappingProxyType({}))
+    signature: tuple | None = None
+    inventory_signature: tuple | None = None
+    loaded_at: datetime | None = None
+
+
+class ProductVectorIndex:
+    """Holds the current ``ProductVectorSnapshot`` and rebuilds it when embeddings change.
+
+    Change detection is one aggregate query over ``product``: the number of embedded
+    rows and the highest ``ORA_ROWSCN``, which moves on every committed change to the
+    table whatever code path wrote it. A change triggers a full rebuild, which for a
+    catalog of a few thousand rows is a single fetch and one matrix normalization.
+    Readers grab ``snapshot`` once and use it without locks. The inventory is tracked
+    the same way but separately, so stocking changes only rebuild the shop bitmaps.
+
+    With ``index_type="ivf"`` the index is approximate: rebuilds reuse the current
+    centroids (retraining only after substantial growth), ``upsert`` files changed
+    embeddings under the existing centroids, and the index is persisted to ``path`` so a restart with an
+    unchanged table skips both the embedding fetch and training.
+
+    With ``dimensions``, only the leading (renormalized) components of each embedding
+    are indexed, and queries are truncated the same way. Distances are then approximate;
+    callers re-score the top candidates against the full embeddings in Oracle.
+    """
+
+    def __init__(
+        self,
+        index_type: str = "exact",
+        n_lists: int = 0,
+        n_probe: int = 8,
+        path: str | Path | None = None,
+        dimensions: int = 0,
+    ) -> None:
+        """Initialize the index holder.
+
+        Args:
+            index_type: ``exact`` or ``ivf``
+            n_lists: IVF centroids to train (0 = square root of the product count)
+            n_probe: IVF lists scored per query
+            path: File to persist the IVF index to, if any
+            dimensions: Leading embedding dimensions to index (0 = all)
+        """
+        self.index_type = index_type
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.path = Path(path) if path else None
+        self.dimensions = dimensions
+        self._snapshot = ProductVectorSnapshot()
+
+    @property
+    def snapshot(self) -> ProductVectorSnapshot:
+        """The current snapshot."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """Version of the current snapshot (0 until the first load)."""
+        return self._snapshot.version
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index has been built at least once."""
+        return self._snapshot.loaded_at is not None
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        k: int,
+        shop_id: int | None = None,
+        columns: Sequence[str] = (),
+        exact: bool = False,
+    ) -> list[dict]:
+        """Return the ``k`` nearest products in the shape of the Oracle search results.
+
+        With ``shop_id``, only products that shop stocks are ranked. ``columns`` names
+        extra ``PRODUCT_PROJECTION`` columns to include. ``exact`` makes an IVF index
+        probe every list, matching Oracle's ``FETCH EXACT``.
+        """
+        snapshot = self._snapshot
+        ids, distances = snapshot.index.search(
+            self._reduce(query_embedding), k, **self._search_options(snapshot, shop_id, exact)
+        )
+        return [
+            self._result(snapshot, product_id, distance, columns)
+            for product_id, distance in zip(ids.tolist(), distances.tolist(), strict=True)
+        ]
+
+    def search_many(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        k: int,
+        shop_id: int | None = None,
+        columns: Sequence[str] = (),
+        exact: bool = False,
+    ) -> list[list[dict]]:
+        """Batched ``search``: one result list per query embedding, in input order."""
+        snapshot = self._snapshot
+        hits = snapshot.index.search_many(
+            self._reduce(query_embeddings), k, **self._search_options(snapshot, shop_id, exact)
+        )
+        return [
+            [
+                self._result(snapshot, product_id, distance, columns)
+                for product_id, distance in zip(ids.tolist(), distances.tolist(), strict=True)
+            ]
+            for ids, distances in hits
+        ]
+
+    def hybrid_search(
+        self,
+        query_embedding: Sequence[float],
+        query_text: str,
+        k: int,
+        candidates: int = 20,
+        rrf_k: int = DEFAULT_RRF_K,
+        shop_id: int | None = None,
+        columns: Sequence[str] = (),
+        exact: bool = False,
+    ) -> list[dict]:
+        """Fuse vector and BM25 keyword rankings with reciprocal rank fusion.
+
+        Each ranking contributes its top ``candidates`` (among the products stocked by
+        ``shop_id``, if given); results carry the fused ``score`` next to the usual
+        cosine ``distance``.
+        """
+        snapshot = self._snapshot
+        query_embedding = self._reduce(query_embedding)
+        vector_ids, _distances = snapshot.index.search(
+            query_embedding, candidates, **self._search_options(snapshot, shop_id, exact)
+        )
+        if shop_id is None:
+            keyword_hits = snapshot.keywords.search(query_text, candidates)
+        else:
+            stocked = snapshot.shops.get(shop_id, frozenset())
+            keyword_hits = [
+                hit for hit in snapshot.keywords.search(query_text, len(snapshot.keywords)) if hit[0] in stocked
+            ]
+        keyword_ids = [product_id for product_id, _score in keyword_hits[:candidates]]
+        fused = reciprocal_rank_fusion([vector_ids.tolist(), keyword_ids], k=rrf_k)[:k]
+        distances = snapshot.index.distances(query_embedding, [product_id for product_id, _score in fused])
+        return [
+            {**self._result(snapshot, product_id, distances[product_id], columns), "score": score}
+            for product_id, score in fused
+            if product_id in distances
+        ]
+
+    def vectors(self, product_ids: Sequence[int]) -> np.ndarray:
+        """Normalized embeddings of ``product_ids``, one row each (zeros for products not indexed)."""
+        return self._snapshot.index.vectors(product_ids)
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and freshness information for reporting."""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "products": len(snapshot.index),
+            "dimensions": snapshot.index.dimensions,
+            "reduced": self.dimensions > 0,
+            "shops": len(snapshot.shops),
+            "bytes": snapshot.index.nbytes + sum(mask.nbytes for mask in snapshot.shop_masks.values()),
+            "loaded_at": snapshot.loaded_at.isoformat() if snapshot.loaded_at else None,
+        }
+
+    async def load(self, connection: oracledb.AsyncConnection) -> ProductVectorSnapshot:
+        """Rebuild the index from every embedded product, and the shop bitmaps."""
+        cursor = connection.cursor()
+        try:
+            signature = await read_product_signature(cursor)
+            inventory_signature, shops = await self._fetch_inventory(cursor)
+            previous, fresh = self._read_persisted(signature) if not self.loaded else (self._snapshot.index, False)
+            if fresh:
+                # Vectors came from disk; only the display columns are needed
+                await cursor.execute(
+                    f"""
+                    SELECT p.id, p.name, p.description, {_PROJECTION_SELECT}
+                    FROM product p
+                    JOIN company c ON c.id = p.company_id
+                    WHERE p.embedding IS NOT NULL
+                    """  # noqa: S608
+                )
+                rows = await cursor.fetchall()
+            else:
+                await cursor.execute(
+                    f"""
+                    SELECT p.id, p.name, p.description, {_PROJECTION_SELECT}, p.embedding
+                    FROM product p
+                    JOIN company c ON c.id = p.company_id
+                    WHERE p.embedding IS NOT NULL
+                    ORDER BY p.id
+                    """  # noqa: S608
+                )
+                rows = await cursor.fetchall()
+        finally:
+            cursor.close()
+
+        if fresh and previous is not None:
+            index = previous
+        else:
+            ids = [row[0] for row in rows]
+            vectors = [self._reduce(row[-1]) for row in rows]
+            # Normalization and centroid training are CPU-bound; keep the event loop free
+            index = await asyncio.to_thread(self._build, ids, vectors, signature, previous)
+        products = {row[0]: _indexed_product(row) for row in rows}
+        keywords = await asyncio.to_thread(self._build_keywords, products)
+        self._snapshot = ProductVectorSnapshot(
+            version=self._snapshot.version + 1,
+            index=index,
+            keywords=keywords,
+            products=MappingProxyType(products),
+            shops=MappingProxyType(shops),
+            shop_masks=self._shop_masks(index, shops),
+            signature=signature,
+            inventory_signature=inventory_signature,
+            loaded_at=datetime.now(UTC),
+        )
+        logger.info("product_vector_index_loaded", products=len(index), index=self.index_type, version=self.version)
+        return self._snapshot
+
+    async def refresh(self, connection: oracledb.AsyncConnection) -> ProductVectorSnapshot:
+        """Rebuild the index if the product table changed, or the shop bitmaps if the inventory did."""
+        cursor = connection.cursor()
+        try:
+            signature = await read_product_signature(cursor)
+            inventory = None
+            if (
+                signature == self._snapshot.signature
+                and await read_inventory_signature(cursor) != self._snapshot.inventory_signature
+            ):
+                inventory = await self._fetch_inventory(cursor)
+        finally:
+            cursor.close()
+        if signature != self._snapshot.signature:
+            return await self.load(connection)
+        if inventory is not None:
+            inventory_signature, shops = inventory
+            snapshot = self._snapshot
+            self._snapshot = replace(
+                snapshot,
+                version=snapshot.version + 1,
+                shops=MappingProxyType(shops),
+                shop_masks=self._shop_masks(snapshot.index, shops),
+                inventory_signature=inventory_signature,
+            )
+            logger.info("product_vector_index_inventory_refreshed", shops=len(shops), version=self.version)
+        return self._snapshot
+
+    def upsert(self, product_id: int, embedding: Sequence[float], product: Mapping[str, Any] | None = None) -> bool:
+        """Apply one changed product embedding without waiting for the next rebuild.
+
+        Products not yet indexed need their columns in ``product`` (see
+        ``read_indexed_product``); without them the product waits for the next rebuild.
+        A newly indexed product joins the bitmaps of the shops that stock it, according
+        to the inventory as of the last load or refresh.
+        Only this worker sees the change immediately; other workers pick it up on their
+        next ``refresh``. Returns whether the index changed.
+        """
+        snapshot = self._snapshot
+        if not self.loaded:
+            return False
+        products = snapshot.products
+        if product_id not in products:
+            if product is None:
+                return False
+            products = MappingProxyType({**products, product_id: product})
+        # Searches may be reading the current snapshot; change a copy and swap it in
+        index = snapshot.index.copy()
+        if not index.upsert(product_id, self._reduce(embedding)):
+            return False
+        keywords = self._build_keywords(products) if products is not snapshot.products else snapshot.keywords
+        shop_masks = snapshot.shop_masks
+        if product_id not in snapshot.index:
+            # The product got a new row, which the existing bitmaps do not cover
+            shop_masks = self._shop_masks(index, snapshot.shops)
+        self._snapshot = replace(
+            snapshot,
+            version=snapshot.version + 1,
+            index=index,
+            products=products,
+            keywords=keywords,
+            shop_masks=shop_masks,
+        )
+        return True
+
+    def remove(self, product_id: int) -> bool:
+        """Drop a deleted product without waiting for the next rebuild.
+
+        Like ``upsert``, only this worker sees the change immediately. Returns whether
+        the index changed.
+        """
+        snapshot = self._snapshot
+        if product_id not in snapshot.index:
+            return False
+        index = snapshot.index.copy()
+        index.remove(product_id)
+        products = MappingProxyType({key: value for key, value in snapshot.products.items() if key != product_id})
+        self._snapshot = replace(
+            snapshot,
+            version=snapshot.version + 1,
+            index=index,
+            products=products,
+            keywords=self._build_keywords(products),
+        )
+        return True
+
+    def _reduce(self, vectors: Sequence[float] | Sequence[Sequence[float]]) -> np.ndarray:
+        """Truncate embeddings to the indexed dimensions (as float32 either way)."""
+        if self.dimensions:
+            return truncate_dimensions(vectors, self.dimensions)
+        return np.asarray(vectors, dtype=np.float32)
+
+    @classmethod
+    def _search_options(cls, snapshot: ProductVectorSnapshot, shop_id: int | None, exact: bool) -> dict[str, Any]:
+        options: dict[str, Any] = {"mask": cls._shop_mask(snapshot, shop_id)}
+        if exact and isinstance(snapshot.index, IVFVectorIndex):
+            options["n_probe"] = snapshot.index.n_lists
+        return options
+
+    @staticmethod
+    def _shop_mask(snapshot: ProductVectorSnapshot, shop_id: int | None) -> np.ndarray | None:
+        if shop_id is None:
+            return None
+        # Unknown shops stock nothing
+        return snapshot.shop_masks.get(shop_id, np.zeros(0, dtype=bool))
+
+    @staticmethod
+    def _shop_masks(
+        index: ExactVectorIndex | IVFVectorIndex, shops: Mapping[int, frozenset[int]]
+    ) -> Mapping[int, np.ndarray]:
+        return MappingProxyType({shop_id: index.mask(product_ids) for shop_id, product_ids in shops.items()})
+
+    @staticmethod
+    def _result(snapshot: ProductVectorSnapshot, product_id: int, distance: float, columns: Sequence[str] = ()) -> dict:
+        product = snapshot.products[product_id]
+        return {
+            "id": product_id,
+            "name": product["name"],
+            "description": product["description"],
+            "distance": distance,
+            **{column: product[column] for column in columns},
+            "metadata": {"id": product_id},
+        }
+
+    @staticmethod
+    def _build_keywords(products: Mapping[int, Mapping[str, Any]]) -> KeywordIndex:
+        return KeywordIndex(
+            {product_id: f"{product['name']} {product['description']}" for product_id, product in products.items()}
+        )
+
+    def _build(
+        self,
+        ids: list[int],
+        vectors: list[np.ndarray],
+        signature: tuple,
+        previous: ExactVectorIndex | IVFVectorIndex | None,
+    ) -> ExactVectorIndex | IVFVectorIndex:
+        if self.index_type != "ivf":
+            return ExactVectorIndex(ids, vectors)
+        centroids = None
+        if (
+            isinstance(previous, IVFVectorIndex)
+            and previous.dimensions == (len(vectors[0]) if vectors else 0)
+            and len(ids) <= previous.trained_rows * _RETRAIN_GROWTH
+        ):
+            centroids = previous.centroids
+        index = IVFVectorIndex(ids, vectors, n_lists=self.n_lists, n_probe=self.n_probe, centroids=centroids)
+        if centroids is not None:
+            index.trained_rows = previous.trained_rows
+        if self.path is not None and len(index):
+            try:
+                index.save(self.path, signature=self._encode_signature(signature), reduced_dimensions=self.dimensions)
+            except OSError as e:
+                logger.warning("product_vector_index_save_failed", path=str(self.path), error=str(e))
+        return index
+
+    def _read_persisted(self, signature: tuple) -> tuple[IVFVectorIndex | None, bool]:
+        """Return the persisted IVF index and whether it was built from the current table state.
+
+        A stale index is still returned so the rebuild can reuse its trained centroids.
+        """
+        if self.index_type != "ivf" or self.path is None or not self.path.exists():
+            return None, False
+        try:
+            index, metadata = IVFVectorIndex.load(self.path, n_probe=self.n_probe)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("product_vector_index_load_failed", path=str(self.path), error=str(e))
+            return None, False
+        if int(metadata.get("reduced_dimensions", 0)) != self.dimensions:
+            # Built at another truncation: neither the vectors nor the centroids apply
+            return None, False
+        stored = metadata.get("signature")
+        return index, stored is not None and stored.tolist() == self._encode_signature(signature)
+
+    @staticmethod
+    def _encode_signature(signature: tuple) -> list[int]:
+        return [-1 if value is None else int(value) for value in signature]
+
+    @staticmethod
+    async def _fetch_inventory(cursor: oracledb.AsyncCursor) -> tuple[tuple, dict[int, frozenset[int]]]:
+        signature = await read_inventory_signature(cursor)
+        await cursor.execute("SELECT shop_id, product_id FROM inventory")
+        stocked: defaultdict[int, set[int]] = defaultdict(set)
+        for shop_id, product_id in await cursor.fetchall():
+            stocked[shop_id].add(product_id)
+        return signature, {shop_id: frozenset(product_ids) for shop_id, product_ids in stocked.items()}
+
+
+# Process-wide index shared by every request in the worker
+product_vector_index = ProductVectorIndex(
+    index_type=get_settings().search.INDEX_TYPE,
+    n_lists=get_settings().search.IVF_LISTS,
+    n_probe=get_settings().search.IVF_PROBES,
+    path=get_settings().search.INDEX_PATH,
+    dimensions=get_settings().search.REDUCED_DIMENSIONS,
+)
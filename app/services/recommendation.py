@@ -127,6 +127,9 @@ class RecommendationService:
             user_id=self.user_id,
             intent=detected_intent,
             persona=persona,
+            query_embedding=chat_metadata.get("query_embedding"),
+            # Resolved by _route_products_question above: exactly the products placed in ``context``
+            product_ids=chat_metadata["context_product_ids"],
         )
         ai_time = (time.time() - ai_start) * 1000
 
@@ -209,19 +212,23 @@ class RecommendationService:
         """Route question through semantic intent detection and product matching.
 
         Returns:
-            - chat_metadata: Enhanced with routing information
+            - chat_metadata: Enhanced with routing information, including
+              ``context_product_ids`` (the products ``_format_context`` will describe)
             - matched_product_ids: List of matching product IDs
             - vector_timings: Timing data from vector search operations
         """
 
         chat_metadata = chat_metadata or {}
         vector_timings = {"embedding_ms": 0, "oracle_ms": 0, "total_ms": 0}
+        # No product context unless matches are found below; the response cache key relies on this
+        chat_metadata["context_product_ids"] = []
 
         # Use semantic intent detection with Oracle connection
         intent, confidence, exemplar, intent_embedding_cache_hit = await self.intent_router.route_intent_single(query)
 
-        # Store intent embedding cache hit status
+        # Store intent embedding cache hit status and the query embedding for response caching
         chat_metadata["intent_embedding_cache_hit"] = intent_embedding_cache_hit
+        chat_metadata["query_embedding"] = self.intent_router.last_query_embedding
 
         # Log the routing decision for analysis
         logger.info(
@@ -242,6 +249,8 @@ class RecommendationService:
         # Only perform vector search for product-related intents
         if intent == "PRODUCT_RAG":
             # Perform vector search using Oracle with embedding cache tracking
+            # Search results already carry the columns the prompt needs (add more with ``columns=``),
+            # so the matches need no follow-up product lookups
             matched_documents, embedding_cache_hit, vector_timings = await self.vector_search.similarity_search(query=query, k=4)
             matched_product_ids = [match["metadata"]["id"] for match in matched_documents]
 
@@ -249,16 +258,13 @@ class RecommendationService:
             chat_metadata["embedding_cache_hit"] = embedding_cache_hit
 
             if matched_product_ids:
-                # Get product details using our new service
-                similar_products = []
-                for product_id in matched_product_ids[:2]:  # Limit to 2 products
-                    product = await self.products_service.get_by_id(product_id)
-                    if product:
-                        similar_products.append(product)
+                # Limit to 2 products
+                similar_products = matched_documents[:2]
 
                 chat_metadata["product_matches"] = [
                     f"- {product['name']}: {product['description']}" for product in similar_products
                 ]
+                chat_metadata["context_product_ids"] = [product["id"] for product in similar_products]
 
                 return chat_metadata, matched_product_ids, vector_timings
 
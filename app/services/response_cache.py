@@ -16,28 +16,148 @@
 
 from __future__ import annotations
 
+import array
 import hashlib
+import time
 from datetime import UTC, datetime, timedelta
-from typing import Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
 import msgspec
+import structlog
 
+from app.lib.cache import MemoryCache
+from app.lib.canonical import get_query_canonicalizer
+from app.lib.settings import get_settings
+from app.lib.telemetry import CacheTelemetry, elapsed_ms
+from app.lib.vector_index import fetch_first
 from app.services.base import BaseService
+from app.services.cache_hits import cache_hits
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    import oracledb
+
+logger = structlog.get_logger()
+
+
+class ResponseCacheKey(msgspec.Struct, frozen=True, kw_only=True):
+    """Canonical components of a response cache key.
+
+    Keys are built from what actually shapes the LLM answer rather than the full prompt
+    text, so small context differences no longer produce new keys. The components are
+    stored with each cached response so a miss can report which one changed.
+    """
+
+    query: str
+    """Normalized user query."""
+    product_ids: tuple[int, ...] = ()
+    """IDs of the products whose details were placed in the prompt (sorted)."""
+    intent: str | None = None
+    persona: str | None = None
+    model: str | None = None
+    prompt_version: str | None = None
+    """Version of the prompt template; bump when system prompts change."""
+    context_digest: str | None = None
+    """Digest of free-form context, only used when the context is not described by product IDs."""
+
+    def canonical(self) -> str:
+        """Return the deterministic string form hashed into the cache key."""
+        return msgspec.json.encode(self).decode("utf-8")
+
+    def to_dict(self) -> dict[str, Any]:
+        return msgspec.to_builtins(self)  # type: ignore[no-any-return]
+
+    def diff(self, other: ResponseCacheKey) -> list[str]:
+        """Return the names of the components that differ from ``other``."""
+        return [field for field in self.__struct_fields__ if getattr(self, field) != getattr(other, field)]
+
+
+# Live per-tier counters and latencies for the response cache hierarchy (see /api/metrics/cache)
+response_telemetry = CacheTelemetry("response", tiers=("l1", "oracle", "semantic"), origin="llm")
+
+
+@lru_cache(maxsize=1)
+def get_response_memory_cache() -> MemoryCache[dict]:
+    """Return the process-wide L1 response cache that sits in front of the Oracle table."""
+    settings = get_settings()
+    return MemoryCache(
+        name="response",
+        max_entries=settings.cache.RESPONSE_MEMORY_MAX_ENTRIES,
+        ttl_seconds=settings.cache.RESPONSE_MEMORY_TTL_SECONDS,
+    )
+
+
+GLOBAL_CACHE_SCOPE = "global"
+"""Cache scope (stored in place of a user ID) for responses shared by every visitor."""
+
+
+class ResponseSharingPolicy:
+    """Decide whether a cached response may be shared across users.
+
+    Responses that depend only on the query, products, intent and persona are shared
+    globally; responses whose prompt included the user's conversation history are scoped
+    to that user. Per-intent (``"INTENT"``) or per-intent-and-persona (``"INTENT:persona"``)
+    overrides take precedence over that default.
+    """
+
+    def __init__(self, overrides: Mapping[str, str] | None = None) -> None:
+        self.overrides = dict(overrides or {})
+        invalid = {scope for scope in self.overrides.values() if scope not in {"global", "user"}}
+        if invalid:
+            msg = f"Invalid response sharing scope(s): {', '.join(sorted(invalid))}"
+            raise ValueError(msg)
+
+    def scope(self, intent: str | None, persona: str | None, history_used: bool) -> str:
+        """Return ``"global"`` or ``"user"`` for a response."""
+        for key in (f"{intent}:{persona}", f"{intent}"):
+            if key in self.overrides:
+                return self.overrides[key]
+        return "user" if history_used else "global"
+
+    def cache_scope(self, user_id: str, intent: str | None, persona: str | None, history_used: bool) -> str:
+        """Return the user ID the response should be cached under."""
+        return GLOBAL_CACHE_SCOPE if self.scope(intent, persona, history_used) == "global" else user_id
 
 
 class ResponseCacheService(BaseService):
-    """Oracle response caching using raw SQL."""
+    """Oracle response caching using raw SQL.
+
+    Exact-key lookups go through a bounded in-process L1 first, so hot answers are served
+    without touching the connection pool. The L1 is populated on Oracle reads and writes
+    and never holds an entry longer than its Oracle TTL.
+    """
+
+    def __init__(self, connection: oracledb.AsyncConnection) -> None:
+        super().__init__(connection)
+        self._memory_cache = get_response_memory_cache()
 
-    def _generate_cache_key(self, query: str, user_id: str = "default") -> str:
-        """Generate deterministic cache key."""
-        content = f"{query.strip()}:{user_id}"
-        return hashlib.sha256(content.encode()).hexdigest()  # Use SHA256 instead of MD5
+    def _generate_cache_key(self, query: str | ResponseCacheKey, user_id: str = "default") -> str:
+        """Generate deterministic cache key (plain-text queries are canonicalized first)."""
+        content = query.canonical() if isinstance(query, ResponseCacheKey) else get_query_canonicalizer()(query)
+        # 128-bit BLAKE2b keeps the unique key and its indexes compact
+        return hashlib.blake2b(f"{content}:{user_id}".encode(), digest_size=16).hexdigest()
 
-    async def get_cached_response(self, query: str, user_id: str = "default") -> dict | None:
+    async def get_cached_response(self, query: str | ResponseCacheKey, user_id: str = "default") -> dict | None:
         """Get cached response if not expired."""
         cache_key = self._generate_cache_key(query, user_id)
-        now = datetime.now(UTC)
 
+        started = time.perf_counter()
+        cached = self._memory_cache.get(cache_key)
+        response_telemetry.record("l1", cached is not None, elapsed_ms(started))
+        if cached is not None:
+            cache_hits.record("response_cache", cache_key)
+            return cached
+
+        started = time.perf_counter()
+        cached = await self._get_from_oracle(cache_key)
+        response_telemetry.record("oracle", cached is not None, elapsed_ms(started))
+        return cached
+
+    async def _get_from_oracle(self, cache_key: str) -> dict | None:
+        """Oracle tier lookup; populates the L1 on a hit."""
+        now = datetime.now(UTC)
         async with self.get_cursor() as cursor:
             await cursor.execute(
                 """
@@ -57,31 +177,140 @@ class ResponseCacheService(BaseService):
                     expires_at = expires_at.replace(tzinfo=UTC)
 
                 if expires_at > now:  # expires_at > now
-                    # Increment hit count
-                    await cursor.execute(
-                        """
-                        UPDATE response_cache
-                        SET hit_count = hit_count + 1
-                        WHERE id = :id
-                        """,
-                        {"id": row[0]},
-                    )
-                    await self.connection.commit()
+                    # Hit counts are written behind in batches to keep hits read-only
+                    cache_hits.record("response_cache", cache_key)
 
-                    return row[1] if isinstance(row[1], dict) else msgspec.json.decode(row[1]) if row[1] else {}
+                    response = row[1] if isinstance(row[1], dict) else msgspec.json.decode(row[1]) if row[1] else {}
+                    self._memory_cache.set(cache_key, response, ttl_seconds=(expires_at - now).total_seconds())
+                    return response
             return None
 
+    async def get_semantic_response(
+        self,
+        query_embedding: list[float],
+        intent: str | None,
+        persona: str | None,
+        user_id: str = "default",
+        max_distance: float = 0.05,
+        model: str | None = None,
+        prompt_version: str | None = None,
+        fetch_mode: str | None = None,
+        target_accuracy: int | None = None,
+    ) -> dict | None:
+        """Get the cached response of the closest prior query with the same intent and persona.
+
+        Every filter also matches missing values (``DECODE`` treats two NULLs as equal), so
+        entries without an intent or persona can be found too.
+
+        Args:
+            query_embedding: Embedding of the incoming query
+            intent: Detected intent the cached query must share
+            persona: Persona the cached query must share
+            user_id: Cache scope the cached query must share
+            max_distance: Maximum cosine distance for a hit
+            model: Model that must have generated the cached response
+            prompt_version: Prompt template version the cached response must come from
+            fetch_mode: ``approx`` (use idx_response_cache_embedding) or ``exact``; defaults to ``VECTOR_FETCH_MODE``
+            target_accuracy: Approximate search accuracy in percent; defaults to ``VECTOR_TARGET_ACCURACY``
+
+        Returns:
+            The cached response, or None if no close enough entry exists
+        """
+        search_settings = get_settings().search
+        fetch = fetch_first(
+            fetch_mode or search_settings.FETCH_MODE,
+            search_settings.TARGET_ACCURACY if target_accuracy is None else target_accuracy,
+            limit="1",
+        )
+        started = time.perf_counter()
+        async with self.get_cursor() as cursor:
+            # APPROX needs ORDER BY VECTOR_DISTANCE to use the index
+            await cursor.execute(
+                f"""
+                SELECT cache_key, response, VECTOR_DISTANCE(query_embedding, :query_embedding, COSINE) AS distance
+                FROM response_cache
+                WHERE DECODE(intent, :intent, 1, 0) = 1
+                  AND DECODE(persona, :persona, 1, 0) = 1
+                  AND DECODE(model, :model, 1, 0) = 1
+                  AND DECODE(prompt_version, :prompt_version, 1, 0) = 1
+                  AND user_id = :user_id
+                  AND query_embedding IS NOT NULL
+                  AND expires_at > CURRENT_TIMESTAMP
+                ORDER BY VECTOR_DISTANCE(query_embedding, :query_embedding, COSINE)
+                {fetch}
+                """,  # noqa: S608
+                {
+                    "query_embedding": array.array("f", query_embedding),
+                    "intent": intent,
+                    "persona": persona,
+                    "model": model,
+                    "prompt_version": prompt_version,
+                    "user_id": user_id,
+                },
+            )
+
+            row = await cursor.fetchone()
+            hit = bool(row and row[2] is not None and row[2] <= max_distance)
+            response_telemetry.record("semantic", hit, elapsed_ms(started))
+            if row and hit:
+                cache_hits.record("response_cache", row[0])
+                logger.debug("response_cache_hit", layer="semantic", distance=row[2])
+                return row[1] if isinstance(row[1], dict) else msgspec.json.decode(row[1]) if row[1] else {}
+            return None
+
+    async def explain_miss(self, key: ResponseCacheKey, user_id: str = "default") -> list[str] | None:
+        """Report which key components differ from the latest cached entry for the same query.
+
+        Returns:
+            Names of the differing components, or None if the query has no cached entry
+        """
+        async with self.get_cursor() as cursor:
+            await cursor.execute(
+                """
+                SELECT JSON_QUERY(response, '$.key')
+                FROM response_cache
+                WHERE query_text = :query_text
+                  AND user_id = :user_id
+                  AND expires_at > CURRENT_TIMESTAMP
+                ORDER BY created_at DESC
+                FETCH FIRST 1 ROWS ONLY
+                """,
+                {"query_text": key.query, "user_id": user_id},
+            )
+
+            row = await cursor.fetchone()
+            if not row or not row[0]:
+                return None
+            previous = row[0] if isinstance(row[0], dict) else msgspec.json.decode(row[0])
+            return key.diff(msgspec.convert(previous, ResponseCacheKey))
+
     async def cache_response(
         self,
-        query: str,
+        query: str | ResponseCacheKey,
         response: dict,
         ttl_minutes: int = 5,
         user_id: str = "default",
+        query_embedding: list[float] | None = None,
+        intent: str | None = None,
+        persona: str | None = None,
     ) -> dict[str, Any]:
-        """Cache response with TTL."""
+        """Cache response with TTL.
+
+        When ``query`` is a structured ``ResponseCacheKey``, its components are stored with the
+        response and the normalized query is used as the entry's query text.
+        When ``query_embedding`` is given, it is stored with the intent, persona and user scope
+        (and the key's model and prompt version) so the entry can also be found by
+        ``get_semantic_response``.
+        """
         cache_key = self._generate_cache_key(query, user_id)
+        query_text = query.query if isinstance(query, ResponseCacheKey) else query
+        model = prompt_version = None
+        if isinstance(query, ResponseCacheKey):
+            response = {**response, "key": query.to_dict()}
+            model, prompt_version = query.model, query.prompt_version
         expires_at = datetime.now(UTC) + timedelta(minutes=ttl_minutes)
         response_json = msgspec.json.encode(response).decode("utf-8") if isinstance(response, dict) else response
+        embedding_array = array.array("f", query_embedding) if query_embedding else None
         async with self.get_cursor() as cursor:
             # Use MERGE for upsert
             await cursor.execute(
@@ -93,25 +322,50 @@ class ResponseCacheService(BaseService):
                     UPDATE SET
                         query_text = :query_text,
                         response = :response,
+                        intent = :intent,
+                        persona = :persona,
+                        model = :model,
+                        prompt_version = :prompt_version,
+                        user_id = :user_id,
+                        query_embedding = :query_embedding,
                         expires_at = :expires_at,
                         hit_count = 0
                 WHEN NOT MATCHED THEN
-                    INSERT (cache_key, query_text, response, expires_at, hit_count)
-                    VALUES (:cache_key2, :query_text2, :response2, :expires_at2, 0)
+                    INSERT (
+                        cache_key, query_text, response, intent, persona, model, prompt_version, user_id,
+                        query_embedding, expires_at, hit_count
+                    )
+                    VALUES (
+                        :cache_key2, :query_text2, :response2, :intent2, :persona2, :model2, :prompt_version2,
+                        :user_id2, :query_embedding2, :expires_at2, 0
+                    )
                 """,
                 {
                     "cache_key": cache_key,
                     "cache_key2": cache_key,
-                    "query_text": query,
-                    "query_text2": query,
+                    "query_text": query_text,
+                    "query_text2": query_text,
                     "response": response_json,
                     "response2": response_json,
+                    "intent": intent,
+                    "intent2": intent,
+                    "persona": persona,
+                    "persona2": persona,
+                    "model": model,
+                    "model2": model,
+                    "prompt_version": prompt_version,
+                    "prompt_version2": prompt_version,
+                    "user_id": user_id,
+                    "user_id2": user_id,
+                    "query_embedding": embedding_array,
+                    "query_embedding2": embedding_array,
                     "expires_at": expires_at,
                     "expires_at2": expires_at,
                 },
             )
 
             await self.connection.commit()
+            self._memory_cache.set(cache_key, response, ttl_seconds=(expires_at - datetime.now(UTC)).total_seconds())
 
             # Return the cache entry
             await cursor.execute(
@@ -147,51 +401,24 @@ class ResponseCacheService(BaseService):
             msg = "Failed to create cache entry"
             raise RuntimeError(msg)
 
-    async def cleanup_expired(self) -> int:
-        """Remove expired cache entries."""
-        now = datetime.now(UTC)
-        async with self.get_cursor() as cursor:
-            await cursor.execute(
-                """
-                DELETE FROM response_cache
-                WHERE expires_at < :now
-                """,
-                {"now": now},
-            )
-            await self.connection.commit()
-            return cursor.rowcount
-
-    async def get_cache_stats(self, hours: int = 24) -> dict:
-        """Get cache hit rate and statistics."""
-        since = datetime.now(UTC) - timedelta(hours=hours)
+    async def cleanup_expired(self, batch_size: int = 1000) -> int:
+        """Remove expired cache entries, at most ``batch_size`` rows per transaction.
 
-        async with self.get_cursor() as cursor:
-            # Get total cache hits and entries
-            await cursor.execute(
-                """
-                SELECT
-                    COUNT(*) as total_entries,
-                    SUM(hit_count) as total_hits,
-                    AVG(hit_count) as avg_hits_per_entry
-                FROM response_cache
-                WHERE created_at > :since
-                """,
-                {"since": since},
-            )
+        Deleted entries are dropped from this worker's L1 too; other workers' copies
+        expire with their own TTL, which never outlives the Oracle row.
+        """
+        return await self.delete_in_batches(
+            """
+            DELETE FROM response_cache
+            WHERE expires_at < :now AND ROWNUM <= :batch_size
+            RETURNING cache_key INTO :deleted
+            """,
+            {"now": datetime.now(UTC)},
+            batch_size=batch_size,
+            on_deleted=self._invalidate,
+        )
 
-            row = await cursor.fetchone()
-            total_entries = row[0] or 0
-            total_hits = row[1] or 0
-
-            # Calculate hit rate
-            # Hit rate = hits / (hits + misses)
-            # Where misses = entries (each entry represents at least one miss)
-            total_requests = total_entries + total_hits
-            hit_rate = (total_hits / total_requests * 100) if total_requests > 0 else 0
-
-            return {
-                "cache_hit_rate": round(hit_rate, 1),
-                "total_cached_queries": total_entries,
-                "total_cache_hits": int(total_hits),
-                "avg_hits_per_entry": round(row[2] or 0, 1),
-            }
+    def _invalidate(self, cache_keys: list[str]) -> None:
+        """Drop responses whose Oracle rows were deleted from the in-process L1."""
+        for cache_key in cache_keys:
+            self._memory_cache.invalidate(cache_key)
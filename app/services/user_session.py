@@ -124,16 +124,20 @@ class UserSessionService(BaseService):
                 raise RuntimeError(msg)
             return result
 
-    async def cleanup_expired(self) -> int:
-        """Remove expired sessions."""
-        now = datetime.now(UTC)
-        async with self.get_cursor() as cursor:
-            await cursor.execute(
-                """
-                DELETE FROM user_session
-                WHERE expires_at < :now
-                """,
-                {"now": now},
-            )
-            await self.connection.commit()
-            return cursor.rowcount
+    async def cleanup_expired(self, batch_size: int = 1000) -> int:
+        """Remove expired sessions, at most ``batch_size`` rows per transaction.
+
+        Sessions that still own chat messages are kept: deleting them would cascade to
+        an unbounded number of messages. Their history ages out separately (see
+        ``ChatConversationService.cleanup_expired``), after which they are removed here.
+        """
+        return await self.delete_in_batches(
+            """
+            DELETE FROM user_session s
+            WHERE s.expires_at < :now
+              AND NOT EXISTS (SELECT 1 FROM chat_conversation c WHERE c.session_id = s.id)
+              AND ROWNUM <= :batch_size
+            """,
+            {"now": datetime.now(UTC)},
+            batch_size=batch_size,
+        )
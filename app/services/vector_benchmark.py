@@ -0,0 +1,114 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Recall and latency benchmark of Oracle approximate vector search."""
+
+from __future__ import annotations
+
+import array
+import time
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+import structlog
+
+from app.lib.vector_index import fetch_first, latency_summary, recall_at_k
+from app.services.base import BaseService
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+logger = structlog.get_logger()
+
+# Scratch table holding the synthetic catalog; dropped by ``teardown``
+BENCHMARK_TABLE = "vector_benchmark"
+
+
+class VectorAccuracyBenchmark(BaseService):
+    """Measure recall@k and latency of ``FETCH APPROX`` at several target accuracies.
+
+    The synthetic catalog is loaded into ``BENCHMARK_TABLE`` with a neighbor-partition
+    (IVF) vector index built like ``idx_product_embedding``. Each setting is compared
+    against ``FETCH EXACT`` results for the same queries, and latency is measured per
+    statement, round trip included.
+    """
+
+    async def setup(self, vectors: np.ndarray, batch_size: int = 1000) -> None:
+        """(Re)create the scratch table from ``vectors`` and build its vector index."""
+        await self.teardown()
+        async with self.get_cursor() as cursor:
+            await cursor.execute(
+                f"CREATE TABLE {BENCHMARK_TABLE} (id NUMBER PRIMARY KEY, embedding VECTOR({vectors.shape[1]}, FLOAT32))"
+            )
+            for start in range(0, len(vectors), batch_size):
+                await cursor.executemany(
+                    f"INSERT INTO {BENCHMARK_TABLE} (id, embedding) VALUES (:1, :2)",  # noqa: S608
+                    [
+                        (start + offset, array.array("f", row.tolist()))
+                        for offset, row in enumerate(vectors[start : start + batch_size])
+                    ],
+                )
+            await self.connection.commit()
+            await cursor.execute(
+                f"""
+                CREATE VECTOR INDEX {BENCHMARK_TABLE}_idx ON {BENCHMARK_TABLE}(embedding)
+                ORGANIZATION NEIGHBOR PARTITIONS
+                DISTANCE COSINE
+                WITH TARGET ACCURACY 95
+                """
+            )
+        logger.info("vector_benchmark_loaded", rows=len(vectors), dimensions=vectors.shape[1])
+
+    async def teardown(self) -> None:
+        """Drop the scratch table and its index."""
+        async with self.get_cursor() as cursor:
+            await cursor.execute(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE} PURGE")
+
+    async def run(self, queries: np.ndarray, k: int, accuracies: Iterable[int]) -> list[dict[str, Any]]:
+        """Measure each target accuracy (0 = index default) against exact search.
+
+        Returns:
+            One row per setting (plus an ``exact`` baseline row) with recall and latency.
+        """
+        truth, exact_ms = await self._timed(queries, k, "exact", None)
+        report = [{"mode": "exact", "target_accuracy": None, "recall": 1.0, **latency_summary(exact_ms)}]
+        for accuracy in accuracies:
+            found, timings = await self._timed(queries, k, "approx", accuracy)
+            report.append(
+                {
+                    "mode": "approx",
+                    "target_accuracy": accuracy,
+                    "recall": recall_at_k(truth, found),
+                    **latency_summary(timings),
+                }
+            )
+        return report
+
+    async def _timed(
+        self, queries: np.ndarray, k: int, mode: str, accuracy: int | None
+    ) -> tuple[list[set[int]], np.ndarray]:
+        sql = f"""
+            SELECT id FROM {BENCHMARK_TABLE}
+            ORDER BY VECTOR_DISTANCE(embedding, :query, COSINE)
+            {fetch_first(mode, accuracy, limit=":k")}
+        """  # noqa: S608
+        results, timings = [], []
+        async with self.get_cursor() as cursor:
+            for query in queries:
+                started = time.perf_counter()
+                await cursor.execute(sql, {"query": array.array("f", query.tolist()), "k": k})
+                rows = await cursor.fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+                results.append({row[0] for row in rows})
+        return results, np.asarray(timings)
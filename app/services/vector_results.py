@@ -0,0 +1,123 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide cache of vector search results."""
+
+from __future__ import annotations
+
+import copy
+import time
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from app.lib.cache import MemoryCache
+from app.lib.canonical import get_query_canonicalizer
+from app.lib.settings import get_settings
+from app.lib.telemetry import CacheTelemetry, elapsed_ms
+from app.services.catalog import product_catalog
+from app.services.product_vectors import product_vector_index
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Sequence
+
+logger = structlog.get_logger()
+
+# Live counters for result lookups; the origin is the vector search itself (see /api/metrics/cache)
+vector_result_telemetry = CacheTelemetry("vector_results", tiers=("memory",), origin="search")
+
+
+class VectorResultCache:
+    """Top-k product lists keyed by canonical query text, ``k`` and search filters.
+
+    Every key embeds a generation, so results are never served across a catalog change.
+    The generation moves when:
+
+    - ``invalidate`` is called after this process writes product embeddings or rows;
+    - the ``product_catalog`` version moves, which covers other workers, bulk embedding
+      jobs, fixture loads and stocking changes;
+    - the local vector index is reloaded or updated (its version is part of the key).
+
+    Entries of older generations are dropped as soon as a lookup sees the generation
+    move, so they do not linger in memory.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of result lists kept; 0 disables caching
+            ttl_seconds: Upper bound on the lifetime of an entry
+        """
+        self.enabled = max_entries > 0
+        self._cache: MemoryCache[tuple[dict, ...]] = MemoryCache(
+            name="vector_results", max_entries=max(max_entries, 1), ttl_seconds=ttl_seconds
+        )
+        self._generation = 0
+        self._seen = self.generation
+
+    @property
+    def generation(self) -> tuple[int, int, int]:
+        """Invalidation generation, catalog version and local index version the current keys are built from."""
+        return self._generation, product_catalog.version, product_vector_index.version
+
+    def key(self, query: str, k: int, **filters: Hashable) -> tuple:
+        """Build the cache key for a search; equivalent phrasings share a key, like embeddings do."""
+        return (*self.generation, get_query_canonicalizer()(query), k, *sorted(filters.items()))
+
+    def get(self, key: tuple) -> list[dict] | None:
+        """Return a copy of the cached results for ``key``, if any."""
+        if not self.enabled:
+            return None
+        self._current_generation()
+        started = time.perf_counter()
+        cached = self._cache.get(key)
+        vector_result_telemetry.record("memory", cached is not None, elapsed_ms(started))
+        return copy.deepcopy(list(cached)) if cached is not None else None
+
+    def set(self, key: tuple, results: Sequence[dict]) -> None:
+        """Cache ``results`` unless the generation moved while they were being computed."""
+        if self.enabled and key[:3] == self._current_generation():
+            self._cache.set(key, tuple(copy.deepcopy(list(results))))
+
+    def invalidate(self, reason: str) -> None:
+        """Start a new generation and drop every cached result."""
+        self._generation += 1
+        self._cache.clear()
+        logger.debug("vector_result_cache_invalidated", reason=reason, generation=self._generation)
+
+    def _current_generation(self) -> tuple[int, int, int]:
+        """Return ``generation``, first dropping every entry if it moved since the last call."""
+        generation = self.generation
+        if generation != self._seen:
+            # The catalog or index moved on: no older key can be looked up again
+            self._cache.clear()
+            self._seen = generation
+        return generation
+
+    def stats(self) -> dict[str, Any]:
+        """Return memory cache statistics, the current generation and the catalog version."""
+        return {
+            **self._cache.stats(),
+            "enabled": self.enabled,
+            "generation": self._generation,
+            "catalog_version": product_catalog.version,
+        }
+
+
+# Process-wide result cache shared by every request in the worker
+vector_result_cache = VectorResultCache(
+    max_entries=get_settings().cache.VECTOR_RESULTS_MAX_ENTRIES,
+    ttl_seconds=get_settings().cache.VECTOR_RESULTS_TTL_SECONDS,
+)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import array
+import hashlib
 import time
 import uuid
 from typing import TYPE_CHECKING, Any, cast
@@ -12,20 +13,42 @@ from google import genai
 from google.api_core import exceptions as google_exceptions
 from google.genai import types
 
+from app.config import RESPONSE_SHARING_POLICY
+from app.lib.cache import is_admissible_embedding
+from app.lib.canonical import get_query_canonicalizer
+from app.lib.circuit_breaker import CircuitBreaker
+from app.lib.embedding_store import get_embedding_store
+from app.lib.keyword_index import contains_query
 from app.lib.settings import get_settings
+from app.lib.vector_index import fetch_first, mmr, truncate_dimensions
 from app.schemas import SearchMetricsCreate
 from app.services.persona_manager import PersonaManager
+from app.services.product_vectors import PRODUCT_PROJECTION, product_vector_index
+from app.services.response_cache import ResponseCacheKey, ResponseSharingPolicy, response_telemetry
+from app.services.vector_results import vector_result_cache, vector_result_telemetry
 
 logger = structlog.get_logger()
 
+# Version of the system prompt templates; bump it whenever create_system_message or the
+# persona prompts change so cached responses built from the old prompts stop matching.
+PROMPT_TEMPLATE_VERSION = "1"
+
 if TYPE_CHECKING:
-    from collections.abc import AsyncGenerator
+    from collections.abc import AsyncGenerator, Sequence
 
     from app.services.embedding_cache import EmbeddingCache
     from app.services.response_cache import ResponseCacheService
     from app.services.search_metrics import SearchMetricsService
 
 
+# Shared by every VertexAIService in the process so an outage is detected once
+_embedding_breaker = CircuitBreaker(
+    "vertex_ai_embedding",
+    failure_threshold=get_settings().cache.EMBEDDING_BREAKER_FAILURES,
+    reset_seconds=get_settings().cache.EMBEDDING_BREAKER_RESET_SECONDS,
+)
+
+
 class VertexAIService:
     """Native Vertex AI service without LangChain."""
 
@@ -45,6 +68,12 @@ class VertexAIService:
 
         logger.info("Initialized model", model=self.model_name)
 
+        # Semantic response cache lookup (reuses the query embedding from intent routing)
+        self.semantic_cache_enabled = settings.cache.RESPONSE_SEMANTIC_ENABLED
+        self.semantic_cache_max_distance = settings.cache.RESPONSE_SEMANTIC_MAX_DISTANCE
+        self.explain_cache_misses = settings.cache.RESPONSE_EXPLAIN_MISSES
+        self.sharing_policy = ResponseSharingPolicy(RESPONSE_SHARING_POLICY)
+
         # Oracle services for metrics and caching
         self.metrics_service: SearchMetricsService | None = None
         self.cache_service: ResponseCacheService | None = None
@@ -76,23 +105,39 @@ class VertexAIService:
     async def generate_content_with_cache_key(
         self,
         prompt: str,
-        cache_key: str,
+        cache_key: str | ResponseCacheKey,
         user_id: str = "default",
         use_cache: bool = True,
         temperature: float = 0.7,
+        query_embedding: list[float] | None = None,
+        intent: str | None = None,
+        persona: str | None = None,
+        cache_scope: str | None = None,
     ) -> tuple[str, bool]:
-        """Generate content with custom cache key, returning cache status."""
+        """Generate content with custom cache key, returning cache status.
+
+        When ``query_embedding`` is provided and semantic response caching is enabled, an exact
+        cache miss falls back to the closest cached query with the same intent and persona.
+        ``cache_scope`` overrides the user ID the response is cached under (e.g. a global scope
+        for responses shared by every visitor).
+        """
+        cache_user_id = cache_scope or user_id
+        # A fallback embedding has no direction, so it can neither find nor index semantic matches
+        if not is_admissible_embedding(query_embedding):
+            query_embedding = None
 
         # Try cache first
         if use_cache and self.cache_service:
-            cached = await self.cache_service.get_cached_response(cache_key, user_id)
-            if cached is not None:
-                content = cached.get("content", "")
-                if content:  # Only return cache hit if there's actual content
-                    return str(content), True  # Cache hit
+            cached_content = await self._get_cached_content(
+                self.cache_service, cache_key, cache_user_id, query_embedding, intent, persona
+            )
+            if cached_content:
+                return cached_content, True  # Cache hit
 
         # Record timing
         start_time = time.time()
+        # The LLM is the origin tier of the response cache hierarchy
+        track_origin = use_cache and self.cache_service is not None
 
         try:
             # Configure generation with temperature
@@ -102,6 +147,8 @@ class VertexAIService:
                 config=types.GenerateContentConfig(temperature=temperature),
             )
             content = response.text
+            if track_origin:
+                response_telemetry.record("llm", True, (time.time() - start_time) * 1000)
 
             # Cache successful response
             if use_cache and self.cache_service:
@@ -110,12 +157,17 @@ class VertexAIService:
                         cache_key,
                         {"content": content, "model": self.model_name},
                         ttl_minutes=5,
-                        user_id=user_id,
+                        user_id=cache_user_id,
+                        query_embedding=query_embedding,
+                        intent=intent,
+                        persona=persona,
                     )
                 except Exception as cache_error:  # noqa: BLE001
-                    logger.warning("oracle_cache_write_error", error=str(cache_error), cache_key=cache_key[:50])
+                    logger.warning("oracle_cache_write_error", error=str(cache_error), cache_key=str(cache_key)[:50])
 
         except google_exceptions.GoogleAPIError as e:
+            if track_origin:
+                response_telemetry.record("llm", False, (time.time() - start_time) * 1000)
             # Handle API errors gracefully
             return f"I apologize, but I'm experiencing technical difficulties. Please try again. Error: {e!s}", False
         else:
@@ -136,6 +188,37 @@ class VertexAIService:
                     ),
                 )
 
+    async def _get_cached_content(
+        self,
+        cache_service: ResponseCacheService,
+        cache_key: str | ResponseCacheKey,
+        cache_user_id: str,
+        query_embedding: list[float] | None,
+        intent: str | None,
+        persona: str | None,
+    ) -> str | None:
+        """Exact lookup, then semantic fallback; logs which key components changed on a miss if enabled."""
+        cached = await cache_service.get_cached_response(cache_key, cache_user_id)
+        if cached is None and query_embedding and self.semantic_cache_enabled:
+            cached = await cache_service.get_semantic_response(
+                query_embedding,
+                intent,
+                persona,
+                user_id=cache_user_id,
+                max_distance=self.semantic_cache_max_distance,
+                # Answers from another model or prompt template must not be served
+                model=cache_key.model if isinstance(cache_key, ResponseCacheKey) else None,
+                prompt_version=cache_key.prompt_version if isinstance(cache_key, ResponseCacheKey) else None,
+            )
+        if cached is not None:
+            content = cached.get("content", "")
+            if content:  # Only return cache hit if there's actual content
+                return str(content)
+        if self.explain_cache_misses and isinstance(cache_key, ResponseCacheKey):
+            changed = await cache_service.explain_miss(cache_key, cache_user_id)
+            logger.info("response_cache_miss", query=cache_key.query[:50], changed_components=changed)
+        return None
+
     async def stream_content(
         self,
         prompt: str,
@@ -157,7 +240,15 @@ class VertexAIService:
             yield f"Error: {e!s}"
 
     async def create_embedding(self, text: str) -> list[float]:
-        """Create embeddings using Google GenAI."""
+        """Create embeddings using Google GenAI.
+
+        Returns an all-zero fallback vector when generation fails, or immediately while
+        the embedding circuit breaker is open. Callers that cache embeddings must check
+        results with ``is_admissible_embedding``.
+        """
+        if not _embedding_breaker.allow():
+            logger.warning("Embedding circuit breaker open, using fallback")
+            return [0.0] * 768
         try:
             # Use the Google GenAI embedding model
             response = await self.client.aio.models.embed_content(
@@ -166,16 +257,77 @@ class VertexAIService:
             )
 
             if response.embeddings and len(response.embeddings) > 0:
-                return cast("list[float]", response.embeddings[0].values)
+                embedding = cast("list[float]", response.embeddings[0].values)
+                if is_admissible_embedding(embedding):
+                    _embedding_breaker.record_success()
+                    return embedding
             # Fallback to mock embedding for development
+            _embedding_breaker.record_failure()
 
         except Exception:
             # Log the error and fallback to mock embedding
             logger.exception("Embedding generation failed, using fallback")
+            _embedding_breaker.record_failure()
             return [0.0] * 768  # Standard embedding dimension
         else:
             return [0.0] * 768
 
+    async def create_embeddings(self, texts: Sequence[str]) -> list[list[float]]:
+        """Create embeddings for many texts with one Vertex AI call per ``EMBEDDING_BATCH_SIZE`` texts.
+
+        Results are in input order. Like ``create_embedding``, texts that could not be
+        embedded get an all-zero fallback vector.
+        """
+        embeddings: list[list[float]] = []
+        batch_size = get_settings().search.EMBEDDING_BATCH_SIZE
+        for start in range(0, len(texts), batch_size):
+            batch = list(texts[start : start + batch_size])
+            if not _embedding_breaker.allow():
+                logger.warning("Embedding circuit breaker open, using fallback", texts=len(batch))
+                embeddings.extend([0.0] * 768 for _ in batch)
+                continue
+            try:
+                response = await self.client.aio.models.embed_content(model=self.embedding_model, contents=batch)
+            except Exception:
+                logger.exception("Batch embedding generation failed, using fallback", texts=len(batch))
+                _embedding_breaker.record_failure()
+                embeddings.extend([0.0] * 768 for _ in batch)
+                continue
+            values = [cast("list[float]", embedding.values) for embedding in response.embeddings or []]
+            if len(values) != len(batch):
+                _embedding_breaker.record_failure()
+                embeddings.extend([0.0] * 768 for _ in batch)
+                continue
+            _embedding_breaker.record_success()
+            embeddings.extend(value if is_admissible_embedding(value) else [0.0] * 768 for value in values)
+        return embeddings
+
+    @staticmethod
+    def get_embedding_breaker_stats() -> dict[str, Any]:
+        """Return the state of the process-wide embedding circuit breaker."""
+        return _embedding_breaker.stats()
+
+    async def create_embedding_stored(self, text: str) -> list[float]:
+        """Create an embedding, consulting the local on-disk embedding store first.
+
+        Meant for CLI commands and offline jobs that embed the same fixture texts run
+        after run; request handling goes through ``EmbeddingCache`` instead. Fallback
+        (all-zero) embeddings are never stored.
+        """
+        store = get_embedding_store()
+        if store is not None:
+            embedding = store.get(self.embedding_model, text)
+            if embedding is not None:
+                return embedding
+
+        embedding = await self.create_embedding(text)
+        if store is not None and is_admissible_embedding(embedding):
+            try:
+                store.put(self.embedding_model, text, embedding)
+            except OSError as e:
+                logger.warning("embedding_store_write_error", error=str(e))
+        return embedding
+
     def create_system_message(
         self, message: str | None = None, intent: str | None = None, persona: str = "enthusiast"
     ) -> str:
@@ -211,6 +363,29 @@ Keep responses SHORT and conversational - this is a chat interface:
         # Enhance with persona-specific context
         return PersonaManager.get_system_prompt(persona, base_message)
 
+    def build_cache_key(
+        self,
+        query: str,
+        context: str = "",
+        intent: str | None = None,
+        persona: str | None = None,
+        product_ids: Sequence[int] | None = None,
+    ) -> ResponseCacheKey:
+        """Build the structured response cache key for a chat turn."""
+        return ResponseCacheKey(
+            query=get_query_canonicalizer()(query),
+            product_ids=tuple(sorted(product_ids or ())),
+            intent=intent,
+            persona=persona,
+            model=self.model_name,
+            prompt_version=PROMPT_TEMPLATE_VERSION,
+            context_digest=(
+                hashlib.blake2b(context.encode(), digest_size=8).hexdigest()
+                if context and product_ids is None
+                else None
+            ),
+        )
+
     async def chat_with_history(
         self,
         query: str,
@@ -219,8 +394,16 @@ Keep responses SHORT and conversational - this is a chat interface:
         user_id: str = "default",
         intent: str | None = None,
         persona: str = "enthusiast",
+        query_embedding: list[float] | None = None,
+        product_ids: Sequence[int] | None = None,
     ) -> tuple[str, bool]:
-        """Chat with conversation history and context, returning cache status."""
+        """Chat with conversation history and context, returning cache status.
+
+        ``query_embedding`` (already computed during intent routing) enables semantic
+        response cache lookups for near-identical phrasings. ``product_ids`` lists the
+        products described in ``context``; when given, the response cache key is built from
+        them instead of the context text.
+        """
 
         # Build prompt with system message, history, and context
         system_msg = self.create_system_message(intent=intent, persona=persona)
@@ -247,22 +430,60 @@ Keep responses SHORT and conversational - this is a chat interface:
         # Get temperature from persona
         temperature = PersonaManager.get_temperature(persona)
 
-        # Create a cache key based on query, context, and persona instead of full prompt
-        # This allows caching responses for similar queries with same context/persona
-        # but avoids false cache hits from different conversation histories
-        cache_key = f"{query}|{context}|{intent}|{persona}"
-
-        # TEMP DEBUG: Check for cache key collisions
-        logger.info(
-            "cache_key_debug",
-            cache_key=cache_key,
-            query=query,
-            context_len=len(context),
+        # Build the cache key from canonical components instead of the full prompt. This allows
+        # caching responses for the same query/products/persona, but avoids false cache hits
+        # from different conversation histories
+        cache_key = self.build_cache_key(query, context, intent, persona, product_ids)
+        # Share the response across users unless the policy (by default: conversation history
+        # shaped the prompt) scopes it to this user
+        cache_scope = self.sharing_policy.cache_scope(user_id, intent, persona, bool(conversation_history))
+        logger.debug("response_cache_key", cache_scope=cache_scope, **cache_key.to_dict())
+
+        return await self.generate_content_with_cache_key(
+            prompt,
+            cache_key,
+            user_id,
+            temperature=temperature,
+            query_embedding=query_embedding,
             intent=intent,
             persona=persona,
+            cache_scope=cache_scope,
         )
 
-        return await self.generate_content_with_cache_key(prompt, cache_key, user_id, temperature=temperature)
+
+# Queries bound into one lateral-join statement by ``similarity_search_many``
+_QUERIES_PER_STATEMENT = 100
+
+
+def _shop_scope(shop_id: int | None) -> tuple[str, dict[str, Any]]:
+    """SQL predicate (and binds) limiting ``product p`` to the inventory of ``shop_id``.
+
+    A semi-join on ``uq_shop_product`` (shop_id, product_id) filters candidates before
+    they are ranked, so a vector index scan can apply it as a pre-filter.
+    """
+    if shop_id is None:
+        return "", {}
+    return (
+        "AND EXISTS (SELECT 1 FROM inventory i WHERE i.shop_id = :shop_id AND i.product_id = p.id)",
+        {"shop_id": shop_id},
+    )
+
+
+def _projection(columns: Sequence[str]) -> tuple[str, str]:
+    """Extra select-list items and the company join for the ``PRODUCT_PROJECTION`` ``columns``.
+
+    Raises:
+        ValueError: If a column is not in ``PRODUCT_PROJECTION``
+    """
+    unknown = [column for column in columns if column not in PRODUCT_PROJECTION]
+    if unknown:
+        msg = f"Unsupported product columns: {', '.join(unknown)}"
+        raise ValueError(msg)
+    select = "".join(f", {PRODUCT_PROJECTION[column]} AS {column}" for column in columns)
+    join = (
+        "JOIN company c ON c.id = p.company_id" if any(PRODUCT_PROJECTION[c].startswith("c.") for c in columns) else ""
+    )
+    return select, join
 
 
 class OracleVectorSearchService:
@@ -278,82 +499,529 @@ class OracleVectorSearchService:
         self.vertex_ai_service = vertex_ai_service
         self.embedding_cache = embedding_cache
 
-    async def similarity_search(self, query: str, k: int = 4) -> tuple[list[dict], bool, dict]:
-        """Perform Oracle vector similarity search.
+    @property
+    def use_local_index(self) -> bool:
+        """Whether searches run against the in-process product index instead of Oracle.
+
+        Falls back to Oracle until the index has been loaded.
+        """
+        return get_settings().search.BACKEND == "local" and product_vector_index.loaded
+
+    async def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        hybrid: bool | None = None,
+        shop_id: int | None = None,
+        columns: Sequence[str] = (),
+        fetch_mode: str | None = None,
+        target_accuracy: int | None = None,
+        diversify: bool | None = None,
+    ) -> tuple[list[dict], bool, dict]:
+        """Perform vector similarity search over the product catalog.
+
+        Runs in Oracle, or against the in-process index when ``VECTOR_SEARCH_BACKEND=local``.
+        Both rank by cosine distance and return the same products. In hybrid mode (default
+        from ``VECTOR_SEARCH_HYBRID``) keyword matches on product names and descriptions are
+        fused with the vector ranking by reciprocal rank fusion, so exact product names
+        rank first; results then also carry the fused ``score``. With ``shop_id``, only
+        products in that shop's inventory are ranked (filtered before ranking, not after).
+        ``columns`` adds ``PRODUCT_PROJECTION`` product and company columns to each result,
+        so callers need no follow-up lookups. ``fetch_mode`` (``approx`` or ``exact``) and
+        ``target_accuracy`` (percent, 0 for the index default) override ``VECTOR_FETCH_MODE``
+        and ``VECTOR_TARGET_ACCURACY``; in the local backend ``exact`` probes every IVF list.
+        With ``diversify`` (default from ``VECTOR_SEARCH_MMR``), ``VECTOR_SEARCH_MMR_CANDIDATES``
+        candidates are fetched with their embeddings and reranked by maximal marginal
+        relevance, so near-duplicate products do not crowd out the top ``k``.
+        With ``VECTOR_REDUCED_DIMENSIONS``, vector-mode searches rank
+        ``VECTOR_RESCORE_CANDIDATES`` candidates on truncated embeddings and re-score them
+        with the full ones, so reported distances are always full-dimension.
 
         Returns:
             - list of matched products
             - boolean indicating embedding cache hit
-            - dict with timing data: {"embedding_ms": float, "oracle_ms": float, "total_ms": float}
+            - dict with timing data: {"embedding_ms": float, "oracle_ms": float, "total_ms": float},
+              plus "local_ms" when the in-process index answered, "rerank_ms" when diversified
+              and "result_cache_hit"; for a reduced local index "oracle_ms" is the re-scoring
+
+        Repeated searches are answered from ``vector_result_cache`` without embedding the
+        query or ranking products again; such hits report an embedding cache hit.
         """
         start_time = time.time()
+        _projection(columns)
+        search_settings = get_settings().search
+        use_hybrid = search_settings.HYBRID if hybrid is None else hybrid
+        fetch_mode = fetch_mode or search_settings.FETCH_MODE
+        target_accuracy = search_settings.TARGET_ACCURACY if target_accuracy is None else target_accuracy
+        fetch_first(fetch_mode, target_accuracy)
+        use_mmr = search_settings.MMR if diversify is None else diversify
+        # MMR picks k of a larger candidate pool
+        fetch_k = max(k, search_settings.MMR_CANDIDATES) if use_mmr else k
+        # Truncated first stage, re-scored at full dimension
+        rescore_k = max(fetch_k, search_settings.RESCORE_CANDIDATES)
+        result_key = vector_result_cache.key(
+            query,
+            k,
+            hybrid=use_hybrid,
+            shop_id=shop_id,
+            columns=tuple(columns),
+            fetch_mode=fetch_mode,
+            target_accuracy=target_accuracy,
+            mmr=(fetch_k, search_settings.MMR_LAMBDA) if use_mmr else None,
+            reduced=(search_settings.REDUCED_DIMENSIONS, rescore_k),
+        )
+        cached = vector_result_cache.get(result_key)
+        if cached is not None:
+            return (
+                cached,
+                True,
+                {
+                    "embedding_ms": 0.0,
+                    "oracle_ms": 0.0,
+                    "total_ms": (time.time() - start_time) * 1000,
+                    "result_cache_hit": True,
+                },
+            )
 
         try:
             # Create embedding for query (with caching if available)
             embedding_start = time.time()
+            query_embedding, embedding_cache_hit = await self._embed(query)
+            embedding_time = (time.time() - embedding_start) * 1000
+            text_query = contains_query(query) if use_hybrid else None
 
-            embedding_cache_hit = False
-            if self.embedding_cache:
-                logger.debug("product_search_using_cache", query=query[:50])
-                query_embedding, embedding_cache_hit = await self.embedding_cache.get_embedding(
-                    query, self.vertex_ai_service
-                )
+            if self.use_local_index:
+                # Rank in-process against the product vector snapshot, skipping the round trip
+                local_start = time.time()
+                if text_query is not None:
+                    products = product_vector_index.hybrid_search(
+                        query_embedding,
+                        query,
+                        fetch_k,
+                        search_settings.HYBRID_CANDIDATES,
+                        search_settings.RRF_K,
+                        shop_id=shop_id,
+                        columns=columns,
+                        exact=fetch_mode == "exact",
+                    )
+                else:
+                    products = product_vector_index.search(
+                        query_embedding,
+                        rescore_k if product_vector_index.dimensions else fetch_k,
+                        shop_id=shop_id,
+                        columns=columns,
+                        exact=fetch_mode == "exact",
+                    )
+                timing_data = {
+                    "embedding_ms": embedding_time,
+                    "oracle_ms": 0.0,
+                    "local_ms": (time.time() - local_start) * 1000,
+                }
+                if product_vector_index.dimensions:
+                    rescore_start = time.time()
+                    products = await self._rescore(
+                        query_embedding, products, fetch_k if text_query is None else None, with_embeddings=use_mmr
+                    )
+                    timing_data["oracle_ms"] = (time.time() - rescore_start) * 1000
             else:
-                logger.debug("product_search_no_cache", query=query[:50])
-                query_embedding = await self.vertex_ai_service.create_embedding(query)
+                # Perform Oracle vector search
+                oracle_start = time.time()
+                if text_query is not None:
+                    products = await self._oracle_hybrid_search(
+                        query_embedding,
+                        text_query,
+                        fetch_k,
+                        search_settings.HYBRID_CANDIDATES,
+                        search_settings.RRF_K,
+                        shop_id=shop_id,
+                        columns=columns,
+                        fetch_mode=fetch_mode,
+                        target_accuracy=target_accuracy,
+                        with_embeddings=use_mmr,
+                    )
+                else:
+                    products = await self._oracle_search(
+                        query_embedding,
+                        fetch_k,
+                        shop_id=shop_id,
+                        columns=columns,
+                        fetch_mode=fetch_mode,
+                        target_accuracy=target_accuracy,
+                        with_embeddings=use_mmr,
+                        reduced_dimensions=search_settings.REDUCED_DIMENSIONS,
+                        candidates=rescore_k,
+                    )
+                timing_data = {
+                    "embedding_ms": embedding_time,
+                    "oracle_ms": (time.time() - oracle_start) * 1000,
+                }
+
+            if use_mmr:
+                rerank_start = time.time()
+                products = self._diversify(query_embedding, products, k, search_settings.MMR_LAMBDA)
+                timing_data["rerank_ms"] = (time.time() - rerank_start) * 1000
+
+            search_ms = timing_data.get("local_ms", timing_data["oracle_ms"])
+            vector_result_telemetry.record("search", True, search_ms)
+            # Fallback (zero) embeddings rank nothing meaningful; let the next call retry
+            if is_admissible_embedding(query_embedding):
+                vector_result_cache.set(result_key, products)
+
+            # Calculate total time and return timing data
+            timing_data["total_ms"] = (time.time() - start_time) * 1000
+            timing_data["result_cache_hit"] = False
+
+        except (KeyError, AttributeError) as e:
+            # Return empty results on error, but log it
+            logger.exception("Vector search error", error=str(e))
+            return [], False, {"embedding_ms": 0, "oracle_ms": 0, "total_ms": 0}
+        else:
+            return products, embedding_cache_hit, timing_data
+
+    async def _embed(self, query: str) -> tuple[list[float], bool]:
+        """Embed ``query`` through the embedding cache when available; returns the cache hit flag too."""
+        if self.embedding_cache:
+            logger.debug("product_search_using_cache", query=query[:50])
+            return await self.embedding_cache.get_embedding(query, self.vertex_ai_service)
+        logger.debug("product_search_no_cache", query=query[:50])
+        return await self.vertex_ai_service.create_embedding(query), False
+
+    @staticmethod
+    def _diversify(query_embedding: Sequence[float], products: list[dict], k: int, lambda_: float) -> list[dict]:
+        """Keep the ``k`` of the over-fetched ``products`` chosen by maximal marginal relevance.
+
+        Oracle results (and re-scored local ones) carry their full ``embedding``, removed
+        here; otherwise vectors come from the product vector index, and a reduced index
+        needs the query truncated the same way.
+        """
+        if products and all("embedding" in product for product in products):
+            embeddings = [product.pop("embedding") for product in products]
+        else:
+            for product in products:
+                product.pop("embedding", None)
+            embeddings = product_vector_index.vectors([product["id"] for product in products])
+            if product_vector_index.dimensions:
+                query_embedding = truncate_dimensions(query_embedding, product_vector_index.dimensions)
+        return [products[position] for position in mmr(query_embedding, embeddings, k, lambda_).tolist()]
+
+    async def _rescore(
+        self, query_embedding: Sequence[float], products: list[dict], k: int | None, with_embeddings: bool = False
+    ) -> list[dict]:
+        """Replace the reduced-dimension distances of local ``products`` with full-dimension ones from Oracle.
+
+        With ``k``, products are re-ranked by full distance and cut to ``k``; otherwise
+        (hybrid results, ranked by fused score) their order is kept. ``with_embeddings``
+        adds each product's full ``embedding`` (for reranking).
+        """
+        if not products:
+            return products
+        binds = {f"id{position}": product["id"] for position, product in enumerate(products)}
+        async with self.products_service.get_cursor() as cursor:
+            await cursor.execute(
+                f"""
+                SELECT p.id, VECTOR_DISTANCE(p.embedding, :query_vector, COSINE){", p.embedding" if with_embeddings else ""}
+                FROM product p
+                WHERE p.id IN ({", ".join(f":{name}" for name in binds)})
+                """,  # noqa: S608
+                {"query_vector": array.array("f", query_embedding), **binds},
+            )
+            rescored = {row[0]: row[1:] for row in await cursor.fetchall()}
+        for product in products:
+            if product["id"] in rescored:
+                product["distance"] = rescored[product["id"]][0]
+                if with_embeddings:
+                    product["embedding"] = rescored[product["id"]][1]
+        if k is None:
+            return products
+        return sorted(products, key=lambda product: product["distance"])[:k]
+
+    async def similarity_search_many(
+        self,
+        queries: Sequence[str],
+        k: int = 4,
+        shop_id: int | None = None,
+        columns: Sequence[str] = (),
+        fetch_mode: str | None = None,
+        target_accuracy: int | None = None,
+    ) -> tuple[list[list[dict]], dict]:
+        """Vector similarity search for many queries at once.
+
+        Embeddings are looked up and generated in batches, then all queries are ranked
+        together: with one matrix-matrix product against the in-process index, or with a
+        lateral join in Oracle (one statement per ``_QUERIES_PER_STATEMENT`` queries)
+        instead of one round trip per query. Results match ``similarity_search`` in
+        vector mode, including the ``columns`` projection and fetch mode; hybrid fusion is
+        not applied.
+
+        Returns:
+            - one list of matched products per query, in input order
+            - dict with timing data as in ``similarity_search``, plus "embedding_cache_hits"
+        """
+        start_time = time.time()
+        _projection(columns)
+        search_settings = get_settings().search
+        fetch_mode = fetch_mode or search_settings.FETCH_MODE
+        target_accuracy = search_settings.TARGET_ACCURACY if target_accuracy is None else target_accuracy
+        fetch_first(fetch_mode, target_accuracy)
+        if not queries:
+            return [], {"embedding_ms": 0.0, "oracle_ms": 0.0, "total_ms": 0.0, "embedding_cache_hits": 0}
 
+        try:
+            embedding_start = time.time()
+            if self.embedding_cache:
+                cached = await self.embedding_cache.get_embeddings(queries, self.vertex_ai_service)
+                query_embeddings = [embedding for embedding, _hit in cached]
+                cache_hits = sum(hit for _embedding, hit in cached)
+            else:
+                query_embeddings = await self.vertex_ai_service.create_embeddings(queries)
+                cache_hits = 0
             embedding_time = (time.time() - embedding_start) * 1000
 
-            # Perform Oracle vector search
-            oracle_start = time.time()
+            if self.use_local_index:
+                local_start = time.time()
+                results = product_vector_index.search_many(
+                    query_embeddings, k, shop_id=shop_id, columns=columns, exact=fetch_mode == "exact"
+                )
+                timing_data = {
+                    "embedding_ms": embedding_time,
+                    "oracle_ms": 0.0,
+                    "local_ms": (time.time() - local_start) * 1000,
+                }
+            else:
+                oracle_start = time.time()
+                results = await self._oracle_search_many(
+                    query_embeddings,
+                    k,
+                    shop_id=shop_id,
+                    columns=columns,
+                    fetch_mode=fetch_mode,
+                    target_accuracy=target_accuracy,
+                )
+                timing_data = {
+                    "embedding_ms": embedding_time,
+                    "oracle_ms": (time.time() - oracle_start) * 1000,
+                }
 
-            # Convert embedding to Oracle VECTOR format
+            timing_data["total_ms"] = (time.time() - start_time) * 1000
+            timing_data["embedding_cache_hits"] = cache_hits
 
-            # Convert to float32 array for Oracle VECTOR
-            vector_array = array.array("f", query_embedding)
+        except (KeyError, AttributeError) as e:
+            logger.exception("Batch vector search error", error=str(e), queries=len(queries))
+            return [[] for _ in queries], {"embedding_ms": 0, "oracle_ms": 0, "total_ms": 0, "embedding_cache_hits": 0}
+        else:
+            return results, timing_data
 
-            # Execute search using raw Oracle SQL
-            async with self.products_service.get_cursor() as cursor:
-                await cursor.execute(
-                    """
-                    SELECT p.id, p.name, p.description,
-                           VECTOR_DISTANCE(p.embedding, :query_vector, COSINE) as distance
+    async def _oracle_hybrid_search(
+        self,
+        query_embedding: list[float],
+        text_query: str,
+        k: int,
+        candidates: int,
+        rrf_k: int,
+        shop_id: int | None = None,
+        columns: Sequence[str] = (),
+        fetch_mode: str = "approx",
+        target_accuracy: int = 0,
+        with_embeddings: bool = False,
+    ) -> list[dict]:
+        """Fuse vector and Oracle Text rankings with reciprocal rank fusion in one statement."""
+        vector_array = array.array("f", query_embedding)
+        scope, scope_params = _shop_scope(shop_id)
+        projection, join = _projection(columns)
+        if with_embeddings:
+            projection += ", p.embedding"
+
+        async with self.products_service.get_cursor() as cursor:
+            await cursor.execute(
+                f"""
+                WITH vector_hits AS (
+                    SELECT p.id,
+                           ROW_NUMBER() OVER (ORDER BY VECTOR_DISTANCE(p.embedding, :query_vector, COSINE)) AS rnk
                     FROM product p
-                    WHERE p.embedding IS NOT NULL
+                    WHERE p.embedding IS NOT NULL {scope}
                     ORDER BY VECTOR_DISTANCE(p.embedding, :query_vector, COSINE)
-                    FETCH FIRST :limit ROWS ONLY
-                    """,
-                    {
-                        "query_vector": vector_array,
-                        "limit": k,
-                    },
+                    {fetch_first(fetch_mode, target_accuracy, limit=":candidates")}
+                ),
+                text_hits AS (
+                    SELECT p.id, ROW_NUMBER() OVER (ORDER BY SCORE(1) + SCORE(2) DESC, p.id) AS rnk
+                    FROM product p
+                    WHERE p.embedding IS NOT NULL {scope}
+                      AND (CONTAINS(p.name, :text_query, 1) > 0 OR CONTAINS(p.description, :text_query, 2) > 0)
+                    ORDER BY SCORE(1) + SCORE(2) DESC, p.id
+                    FETCH FIRST :candidates ROWS ONLY
+                ),
+                fused AS (
+                    SELECT id, SUM(1 / (:rrf_k + rnk)) AS score
+                    FROM (SELECT id, rnk FROM vector_hits UNION ALL SELECT id, rnk FROM text_hits)
+                    GROUP BY id
                 )
+                SELECT p.id, p.name, p.description,
+                       VECTOR_DISTANCE(p.embedding, :query_vector, COSINE) AS distance,
+                       f.score{projection}
+                FROM fused f
+                JOIN product p ON p.id = f.id
+                {join}
+                ORDER BY f.score DESC, distance
+                FETCH FIRST :limit ROWS ONLY
+                """,  # noqa: S608
+                {
+                    "query_vector": vector_array,
+                    "text_query": text_query,
+                    "candidates": candidates,
+                    "rrf_k": rrf_k,
+                    "limit": k,
+                    **scope_params,
+                },
+            )
 
-                oracle_time = (time.time() - oracle_start) * 1000
+            return [
+                {
+                    "id": row[0],
+                    "name": row[1],
+                    "description": row[2],
+                    "distance": row[3],
+                    "score": row[4],
+                    **dict(zip(columns, row[5 : 5 + len(columns)], strict=True)),
+                    **({"embedding": row[-1]} if with_embeddings else {}),
+                    "metadata": {"id": row[0]},
+                }
+                async for row in cursor
+            ]
 
-                # Format results
-                products = [
-                    {
-                        "id": row[0],
-                        "name": row[1],
-                        "description": row[2],
-                        "distance": row[3],
-                        "metadata": {"id": row[0]},
-                    }
-                    async for row in cursor
-                ]
+    async def _oracle_search(
+        self,
+        query_embedding: list[float],
+        k: int,
+        shop_id: int | None = None,
+        columns: Sequence[str] = (),
+        fetch_mode: str = "approx",
+        target_accuracy: int = 0,
+        with_embeddings: bool = False,
+        reduced_dimensions: int = 0,
+        candidates: int = 0,
+    ) -> list[dict]:
+        """Rank products by cosine distance to ``query_embedding`` in Oracle.
 
-            # Calculate total time and return timing data
-            total_time = (time.time() - start_time) * 1000
-            timing_data = {
-                "embedding_ms": embedding_time,
-                "oracle_ms": oracle_time,
-                "total_ms": total_time,
+        ``with_embeddings`` adds each product's ``embedding`` to its result (for reranking).
+        With ``reduced_dimensions``, the top ``candidates`` are first taken from the
+        ``embedding_reduced`` column (and its vector index), then ranked by full distance.
+        """
+        # Convert to float32 array for Oracle VECTOR
+        vector_array = array.array("f", query_embedding)
+        scope, scope_params = _shop_scope(shop_id)
+        projection, join = _projection(columns)
+        if with_embeddings:
+            projection += ", p.embedding"
+        if reduced_dimensions:
+            # Inner ``p`` is the candidate scan; the outer one re-reads the chosen rows by primary key
+            source = f"""(
+                    SELECT p.id FROM product p
+                    WHERE p.embedding_reduced IS NOT NULL {scope}
+                    ORDER BY VECTOR_DISTANCE(p.embedding_reduced, :reduced_vector, COSINE)
+                    {fetch_first(fetch_mode, target_accuracy, limit=":candidates")}
+                ) candidate
+                JOIN product p ON p.id = candidate.id"""  # noqa: S608
+            where = ""
+            ranking = "ORDER BY distance FETCH FIRST :limit ROWS ONLY"
+            reduced_params = {
+                "reduced_vector": array.array("f", truncate_dimensions(query_embedding, reduced_dimensions).tolist()),
+                "candidates": max(k, candidates),
             }
-
-        except (KeyError, AttributeError) as e:
-            # Return empty results on error, but log it
-            logger.exception("Vector search error", error=str(e))
-            return [], False, {"embedding_ms": 0, "oracle_ms": 0, "total_ms": 0}
         else:
-            return products, embedding_cache_hit, timing_data
+            source = "product p"
+            where = f"WHERE p.embedding IS NOT NULL {scope}"
+            ranking = f"""ORDER BY VECTOR_DISTANCE(p.embedding, :query_vector, COSINE)
+                {fetch_first(fetch_mode, target_accuracy)}"""
+            reduced_params = {}
+
+        # Execute search using raw Oracle SQL
+        async with self.products_service.get_cursor() as cursor:
+            await cursor.execute(
+                f"""
+                SELECT p.id, p.name, p.description,
+                       VECTOR_DISTANCE(p.embedding, :query_vector, COSINE) as distance{projection}
+                FROM {source}
+                {join}
+                {where}
+                {ranking}
+                """,  # noqa: S608
+                {
+                    "query_vector": vector_array,
+                    "limit": k,
+                    **scope_params,
+                    **reduced_params,
+                },
+            )
+
+            # Format results
+            return [
+                {
+                    "id": row[0],
+                    "name": row[1],
+                    "description": row[2],
+                    "distance": row[3],
+                    **dict(zip(columns, row[4 : 4 + len(columns)], strict=True)),
+                    **({"embedding": row[-1]} if with_embeddings else {}),
+                    "metadata": {"id": row[0]},
+                }
+                async for row in cursor
+            ]
+
+    async def _oracle_search_many(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        k: int,
+        shop_id: int | None = None,
+        columns: Sequence[str] = (),
+        fetch_mode: str = "approx",
+        target_accuracy: int = 0,
+    ) -> list[list[dict]]:
+        """Rank products for many query embeddings with one lateral-join statement per chunk.
+
+        Query vectors are bound into an inline ``q`` row source and ``CROSS APPLY`` runs
+        the top-``k`` search once per row, so the statement returns every query's hits.
+        All-zero (fallback) embeddings have no meaningful neighbours and get no results.
+        """
+        results: list[list[dict]] = [[] for _ in query_embeddings]
+        valid = [qid for qid, embedding in enumerate(query_embeddings) if any(embedding)]
+        scope, scope_params = _shop_scope(shop_id)
+        projection, join = _projection(columns)
+
+        async with self.products_service.get_cursor() as cursor:
+            for start in range(0, len(valid), _QUERIES_PER_STATEMENT):
+                chunk = valid[start : start + _QUERIES_PER_STATEMENT]
+                rows = " UNION ALL ".join(f"SELECT {qid} AS qid, :v{qid} AS qv FROM dual" for qid in chunk)  # noqa: S608
+                await cursor.execute(
+                    f"""
+                    WITH q AS ({rows})
+                    SELECT q.qid, hit.*
+                    FROM q
+                    CROSS APPLY (
+                        SELECT p.id, p.name, p.description,
+                               VECTOR_DISTANCE(p.embedding, q.qv, COSINE) AS distance{projection}
+                        FROM product p
+                        {join}
+                        WHERE p.embedding IS NOT NULL {scope}
+                        ORDER BY VECTOR_DISTANCE(p.embedding, q.qv, COSINE)
+                        {fetch_first(fetch_mode, target_accuracy)}
+                    ) hit
+                    ORDER BY q.qid, hit.distance
+                    """,  # noqa: S608
+                    {
+                        **{f"v{qid}": array.array("f", query_embeddings[qid]) for qid in chunk},
+                        "limit": k,
+                        **scope_params,
+                    },
+                )
+                async for row in cursor:
+                    results[row[0]].append(
+                        {
+                            "id": row[1],
+                            "name": row[2],
+                            "description": row[3],
+                            "distance": row[4],
+                            **dict(zip(columns, row[5:], strict=True)),
+                            "metadata": {"id": row[1]},
+                        }
+                    )
+        return results
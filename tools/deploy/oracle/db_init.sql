@@ -31,6 +31,7 @@ ALTER USER coffee QUOTA UNLIMITED ON data;
 PROMPT Granting privileges to COFFEE user...
 GRANT CONNECT, RESOURCE TO coffee;
 GRANT CREATE MINING MODEL TO coffee;
+GRANT CTXAPP TO coffee;
 
 -- Switch to the new user's schema to create objects
 PROMPT Switching to schema COFFEE...
@@ -96,6 +97,12 @@ CREATE TABLE response_cache (
     cache_key VARCHAR2(256 CHAR) NOT NULL,
     query_text VARCHAR2(4000 CHAR),
     response JSON NOT NULL,
+    intent VARCHAR2(50 CHAR),
+    persona VARCHAR2(50 CHAR),
+    model VARCHAR2(100 CHAR),
+    prompt_version VARCHAR2(20 CHAR),
+    user_id VARCHAR2(128 CHAR),
+    query_embedding VECTOR(768, FLOAT32),
     expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
     hit_count NUMBER(10) DEFAULT 0 NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT ON NULL CURRENT_TIMESTAMP NOT NULL,
@@ -108,6 +115,12 @@ CREATE TABLE response_cache (
 -- Create indexes for response_cache
 CREATE INDEX ix_cache_expires ON response_cache (expires_at);
 CREATE INDEX ix_cache_key_expires ON response_cache (cache_key, expires_at);
+CREATE INDEX ix_cache_semantic_scope ON response_cache (intent, persona, user_id, expires_at);
+-- Create vector index for semantic lookups on response_cache
+CREATE VECTOR INDEX idx_response_cache_embedding ON response_cache(query_embedding)
+ORGANIZATION NEIGHBOR PARTITIONS
+DISTANCE COSINE
+WITH TARGET ACCURACY 95;
 
 -- Create embedding_cache table with Oracle 23AI vector support
 CREATE TABLE embedding_cache (
@@ -195,6 +208,8 @@ CREATE TABLE chat_conversation (
 CREATE INDEX ix_chat_conversation_user_id ON chat_conversation (user_id);
 CREATE INDEX ix_chat_session_time ON chat_conversation (session_id, created_at);
 CREATE INDEX ix_chat_user_time ON chat_conversation (user_id, created_at);
+-- Retention sweeps delete by age
+CREATE INDEX ix_chat_conversation_created ON chat_conversation (created_at);
 
 -- Create product table with Oracle 23AI vector support
 CREATE TABLE product (
@@ -204,6 +219,8 @@ CREATE TABLE product (
     current_price NUMBER NOT NULL,
     description VARCHAR2(2000 CHAR) NOT NULL,
     embedding VECTOR(768, FLOAT32),
+    -- Leading VECTOR_REDUCED_DIMENSIONS of embedding, renormalized (NULL when the mode is off)
+    embedding_reduced VECTOR(*, FLOAT32),
     embedding_generated_on TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT ON NULL CURRENT_TIMESTAMP NOT NULL,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT ON NULL FOR INSERT AND UPDATE CURRENT_TIMESTAMP NOT NULL,
@@ -217,6 +234,18 @@ ORGANIZATION NEIGHBOR PARTITIONS
 DISTANCE COSINE
 WITH TARGET ACCURACY 95;
 
+-- First-stage index for reduced-dimension search (candidates are re-scored on embedding)
+CREATE VECTOR INDEX idx_product_embedding_reduced ON product(embedding_reduced)
+ORGANIZATION NEIGHBOR PARTITIONS
+DISTANCE COSINE
+WITH TARGET ACCURACY 95;
+
+-- Oracle Text indexes for keyword matching in hybrid product search
+CREATE INDEX idx_product_name_text ON product(name)
+INDEXTYPE IS CTXSYS.CONTEXT PARAMETERS ('SYNC (ON COMMIT)');
+CREATE INDEX idx_product_description_text ON product(description)
+INDEXTYPE IS CTXSYS.CONTEXT PARAMETERS ('SYNC (ON COMMIT)');
+
 -- Create inventory table (junction table between shop and product)
 CREATE TABLE inventory (
     id RAW(16) DEFAULT SYS_GUID() NOT NULL,